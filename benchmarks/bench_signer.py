@@ -0,0 +1,45 @@
+"""
+Micro-benchmark of private request signing throughput.
+
+Compares KrakenRequestSigner against signing from scratch on every call
+(decoding the key and building a new HMAC), which is what private requests
+did before the signer existed.
+
+    python benchmarks/bench_signer.py [iterations]
+"""
+import base64
+import hmac
+import sys
+import timeit
+from hashlib import sha256, sha512
+from krakencli.kraken_signer import KrakenRequestSigner
+
+PRIVATE_KEY = ("kQH5HW/8p1uGOVjbgWA7FunAmGO8lsSUXNsu3eow76sz84Q18fWxnyRzB"
+               "HCd3pd5nE9qa99HAZtuZuj6F1huXg==")
+NONCE = 1616492376594
+POST_DATA = ("nonce=1616492376594&ordertype=limit&pair=XBTUSD"
+             "&price=37500&type=buy&volume=1.25")
+
+
+def sign_from_scratch(endpoint, nonce, encoded_post_data):
+    private_key = base64.b64decode(PRIVATE_KEY)
+    uri = f"/0/private/{endpoint}".encode()
+    msg = uri + sha256((str(nonce) + encoded_post_data).encode()).digest()
+    return base64.b64encode(hmac.new(private_key, msg, sha512).digest()).decode()
+
+
+def main(iterations):
+    signer = KrakenRequestSigner(PRIVATE_KEY, "/0/private/")
+    assert signer.sign("AddOrder", NONCE, POST_DATA) == \
+        sign_from_scratch("AddOrder", NONCE, POST_DATA)
+
+    for name, func in [("from scratch", sign_from_scratch),
+                       ("KrakenRequestSigner", signer.sign)]:
+        elapsed = min(timeit.repeat(lambda: func("AddOrder", NONCE, POST_DATA),
+                                    number=iterations,
+                                    repeat=5))
+        print(f"{name:>20}: {iterations / elapsed:12,.0f} signatures/sec")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
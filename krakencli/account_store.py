@@ -0,0 +1,233 @@
+import sqlite3
+import threading
+
+DEFAULT_SYNC_BATCH_SIZE = 1000
+# Kraken's 'start' is exclusive, so syncs resume this many seconds before the
+# high-water mark to pick up rows sharing its timestamp. Rows already stored
+# are ignored by their primary key.
+DEFAULT_SYNC_OVERLAP = 1
+# QueryLedgers accepts at most this many ids per request
+KRAKEN_QUERY_LEDGERS_MAX_IDS = 20
+
+# Entry fields stored in each table, in column order
+LEDGER_FIELDS = (
+    'refid',
+    'time',
+    'type',
+    'subtype',
+    'aclass',
+    'asset',
+    'amount',
+    'fee',
+    'balance',
+)
+TRADE_FIELDS = (
+    'ordertxid',
+    'postxid',
+    'pair',
+    'time',
+    'type',
+    'ordertype',
+    'price',
+    'cost',
+    'fee',
+    'vol',
+    'margin',
+    'misc',
+)
+
+# Amounts are kept as the decimal strings Kraken sends so nothing is rounded
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    account TEXT NOT NULL,
+    id TEXT NOT NULL,
+    refid TEXT,
+    time REAL NOT NULL,
+    type TEXT,
+    subtype TEXT,
+    aclass TEXT,
+    asset TEXT,
+    amount TEXT,
+    fee TEXT,
+    balance TEXT,
+    PRIMARY KEY (account, id)
+);
+CREATE INDEX IF NOT EXISTS ledger_time ON ledger (account, time);
+CREATE INDEX IF NOT EXISTS ledger_asset_time ON ledger (account, asset, time);
+CREATE INDEX IF NOT EXISTS ledger_type_time ON ledger (account, type, time);
+CREATE TABLE IF NOT EXISTS trades (
+    account TEXT NOT NULL,
+    id TEXT NOT NULL,
+    ordertxid TEXT,
+    postxid TEXT,
+    pair TEXT,
+    time REAL NOT NULL,
+    type TEXT,
+    ordertype TEXT,
+    price TEXT,
+    cost TEXT,
+    fee TEXT,
+    vol TEXT,
+    margin TEXT,
+    misc TEXT,
+    PRIMARY KEY (account, id)
+);
+CREATE INDEX IF NOT EXISTS trades_time ON trades (account, time);
+CREATE INDEX IF NOT EXISTS trades_pair_time ON trades (account, pair, time);
+CREATE INDEX IF NOT EXISTS trades_type_time ON trades (account, type, time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    last_time REAL,
+    last_id TEXT,
+    PRIMARY KEY (account, kind)
+);
+"""
+
+
+class KrakenAccountStore(object):
+    """
+    Local SQLite index of an account's ledger entries and trade history.
+
+    Each sync resumes from the newest entry stored by the last complete sync
+    (the high-water mark), so a steady state sync costs a request or two.
+    Rows are written in bulk transactions and the mark only advances once a
+    walk finishes, so an interrupted sync is simply repeated. The connection
+    is shared by every thread using the store, one statement or transaction
+    at a time.
+    """
+
+    def __init__(self,
+                 path,
+                 session,
+                 account='default',
+                 batch_size=DEFAULT_SYNC_BATCH_SIZE,
+                 overlap=DEFAULT_SYNC_OVERLAP):
+        self._session = session
+        self._account = account
+        self._batch_size = batch_size
+        self._overlap = overlap
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def high_water_mark(self, kind):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT last_time, last_id FROM sync_state "
+                "WHERE account = ? AND kind = ?",
+                (self._account, kind)
+            ).fetchone()
+        return (None, None) if row is None else (row['last_time'], row['last_id'])
+
+    def _insert(self, table, fields, rows):
+        columns = ('account', 'id') + fields
+        statement = (f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join('?' * len(columns))})")
+        with self._lock, self._connection:
+            cursor = self._connection.executemany(statement, rows)
+        return cursor.rowcount
+
+    def _store(self, table, fields, kind, entries):
+        # Kraken returns newest entries first, so the first one seen is the
+        # new high-water mark
+        inserted = 0
+        newest = None
+        batch = []
+        for entry_id, entry in entries:
+            if newest is None or float(entry['time']) > newest[0]:
+                newest = (float(entry['time']), entry_id)
+            values = [self._account, entry_id]
+            values.extend(_column_value(entry.get(field)) for field in fields)
+            batch.append(values)
+            if len(batch) >= self._batch_size:
+                inserted += self._insert(table, fields, batch)
+                batch = []
+        if batch:
+            inserted += self._insert(table, fields, batch)
+        if newest is not None and kind is not None:
+            with self._lock:
+                last_time, last_id = self.high_water_mark(kind)
+                if last_time is None or newest[0] >= last_time:
+                    with self._connection:
+                        self._connection.execute(
+                            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                            (self._account, kind, newest[0], newest[1])
+                        )
+        return inserted
+
+    def _sync_start(self, kind, start):
+        last_time, last_id = self.high_water_mark(kind)
+        if last_time is None:
+            return start
+        return last_time - self._overlap
+
+    def sync_ledgers(self, start=None):
+        entries = self._session.iter_ledgers_info(start=self._sync_start('ledger',
+                                                                         start))
+        return self._store('ledger', LEDGER_FIELDS, 'ledger', entries)
+
+    def sync_trades(self, start=None):
+        entries = self._session.iter_trades_history(start=self._sync_start('trades',
+                                                                           start))
+        return self._store('trades', TRADE_FIELDS, 'trades', entries)
+
+    def sync(self, start=None):
+        return {'ledger': self.sync_ledgers(start), 'trades': self.sync_trades(start)}
+
+    def fetch_ledgers(self, ids):
+        # Stores specific entries (e.g. ones referenced by a trade), without
+        # moving the high-water mark
+        inserted = 0
+        for i in range(0, len(ids), KRAKEN_QUERY_LEDGERS_MAX_IDS):
+            result = self._session.query_ledgers(
+                ','.join(ids[i:i + KRAKEN_QUERY_LEDGERS_MAX_IDS])
+            )
+            inserted += self._store('ledger', LEDGER_FIELDS, None, result.items())
+        return inserted
+
+    def _query(self, table, filters, start, end):
+        clauses = ["account = ?"]
+        values = [self._account]
+        for name, value in filters:
+            if value is not None:
+                clauses.append(f"{name} = ?")
+                values.append(value)
+        if start is not None:
+            clauses.append("time >= ?")
+            values.append(start)
+        if end is not None:
+            clauses.append("time < ?")
+            values.append(end)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM {table} WHERE {' AND '.join(clauses)} "
+                f"ORDER BY time, id",
+                values
+            )
+            return [dict(row) for row in rows]
+
+    def ledger_entries(self, asset=None, type=None, start=None, end=None):
+        return self._query('ledger', (('asset', asset), ('type', type)), start, end)
+
+    def trades(self, pair=None, type=None, start=None, end=None):
+        return self._query('trades', (('pair', pair), ('type', type)), start, end)
+
+
+def _column_value(value):
+    # Lists (such as a trade's 'trades' ids) are stored comma delimited
+    if isinstance(value, (list, tuple)):
+        return ','.join(str(item) for item in value)
+    return value
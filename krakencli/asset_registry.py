@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+from .kraken_api_values import (
+    KRAKEN_ASSETS,
+    KRAKEN_ASSET_PAIRS
+)
+from .kraken_session import KrakenRequestManager
+from .validation import (
+    KRAKEN_REQUEST_SCHEMAS,
+    compile_schemas
+)
+
+DEFAULT_REGISTRY_MAX_AGE = 24 * 60 * 60
+# Wait after a failed refresh before the next attempt, doubled on each
+# consecutive failure up to the maximum
+DEFAULT_REGISTRY_RETRY_INTERVAL = 60
+DEFAULT_REGISTRY_MAX_RETRY_INTERVAL = 60 * 60
+
+# Fields of each AssetPairs and Assets entry kept in the registry and its cache
+REGISTRY_PAIR_FIELDS = (
+    'altname',
+    'wsname',
+    'base',
+    'quote',
+    'pair_decimals',
+    'lot_decimals',
+    'ordermin',
+)
+REGISTRY_ASSET_FIELDS = (
+    'altname',
+    'decimals',
+    'display_decimals',
+)
+
+
+class _RegistryIndex(object):
+
+    def __init__(self, pairs, assets, loaded_at):
+        self.pairs = pairs
+        self.assets = assets
+        self.loaded_at = loaded_at
+        self.pair_names = {}
+        self.pairs_by_base = {}
+        self.pairs_by_quote = {}
+        self.pairs_by_base_quote = {}
+        for name, info in pairs.items():
+            for alias in (name, info.get('altname'), info.get('wsname')):
+                if alias is not None:
+                    self.pair_names[alias] = name
+            base = info.get('base')
+            quote = info.get('quote')
+            if base is not None and quote is not None:
+                self.pairs_by_base.setdefault(base, []).append(name)
+                self.pairs_by_quote.setdefault(quote, []).append(name)
+                self.pairs_by_base_quote[(base, quote)] = name
+        # Names the REST API accepts as a 'pair' or 'asset' parameter
+        self.request_pair_names = frozenset(
+            alias for name, info in pairs.items()
+            for alias in (name, info.get('altname')) if alias is not None
+        )
+        self.request_asset_names = frozenset(
+            alias for name, info in assets.items()
+            for alias in (name, info.get('altname')) if alias is not None
+        )
+
+
+class _RegistryNames(object):
+    # Live membership view used as the valid options of validators
+
+    def __init__(self, registry, attribute):
+        self._registry = registry
+        self._attribute = attribute
+
+    def _names(self):
+        return getattr(self._registry._current_index(), self._attribute)
+
+    def __contains__(self, name):
+        return name in self._names()
+
+    def __iter__(self):
+        return iter(sorted(self._names()))
+
+    def __len__(self):
+        return len(self._names())
+
+    def __repr__(self):
+        return repr(sorted(self._names()))
+
+
+class KrakenAssetRegistry(object):
+    """
+    Registry of tradable assets and pairs loaded from the Assets and AssetPairs
+    endpoints.
+
+    A compact JSON cache file makes startup instant. Once the data is older
+    than max_age, lookups trigger a refresh on a background thread and keep
+    answering from the current data meanwhile. Until anything has been
+    loaded, the static lists in kraken_api_values are used.
+    """
+
+    def __init__(self,
+                 request_manager=None,
+                 cache_path=None,
+                 max_age=DEFAULT_REGISTRY_MAX_AGE,
+                 retry_interval=DEFAULT_REGISTRY_RETRY_INTERVAL,
+                 max_retry_interval=DEFAULT_REGISTRY_MAX_RETRY_INTERVAL,
+                 clock=time.time):
+        if request_manager is None:
+            request_manager = KrakenRequestManager()
+        self._request_manager = request_manager
+        self._cache_path = cache_path
+        self._max_age = max_age
+        self._retry_interval = retry_interval
+        self._max_retry_interval = max_retry_interval
+        self._retry_wait = 0
+        self._last_attempt = None
+        self._clock = clock
+        self._index = None
+        self._load_lock = threading.Lock()
+        self._refresh_thread = None
+        self.pairs = _RegistryNames(self, 'request_pair_names')
+        self.assets = _RegistryNames(self, 'request_asset_names')
+
+    def _static_index(self):
+        return _RegistryIndex({name: {} for name in KRAKEN_ASSET_PAIRS},
+                              {name: {} for name in KRAKEN_ASSETS},
+                              None)
+
+    def _current_index(self):
+        index = self._index
+        if index is None:
+            with self._load_lock:
+                if self._index is None:
+                    self._index = self.load_cache() or self._static_index()
+                index = self._index
+        now = self._clock()
+        stale = index.loaded_at is None or now - index.loaded_at > self._max_age
+        last_attempt = self._last_attempt
+        backing_off = last_attempt is not None and now - last_attempt < self._retry_wait
+        if stale and not backing_off:
+            self.refresh_in_background()
+        return index
+
+    def load_cache(self):
+        if self._cache_path is None:
+            return None
+        try:
+            with open(self._cache_path, 'r') as f:
+                cache = json.load(f)
+            return _RegistryIndex(cache['pairs'], cache['assets'], cache['loaded_at'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_cache(self, index):
+        if self._cache_path is None:
+            return
+        temp_path = self._cache_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'loaded_at': index.loaded_at,
+                       'pairs': index.pairs,
+                       'assets': index.assets},
+                      f,
+                      separators=(',', ':'))
+        os.replace(temp_path, self._cache_path)
+
+    def refresh(self):
+        asset_pairs = self._request_manager.make_blocking_public_request('AssetPairs')
+        assets = self._request_manager.make_blocking_public_request('Assets')
+        index = _RegistryIndex(
+            {name: {field: info[field] for field in REGISTRY_PAIR_FIELDS
+                    if field in info}
+             for name, info in asset_pairs.items()},
+            {name: {field: info[field] for field in REGISTRY_ASSET_FIELDS
+                    if field in info}
+             for name, info in assets.items()},
+            self._clock()
+        )
+        self._index = index
+        self._save_cache(index)
+        return index
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception:
+            # Keep serving the current data and back off before the next
+            # stale lookup retries
+            self._retry_wait = min(max(self._retry_wait * 2, self._retry_interval),
+                                   self._max_retry_interval)
+        else:
+            self._retry_wait = 0
+
+    def refresh_in_background(self):
+        with self._load_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return self._refresh_thread
+            self._last_attempt = self._clock()
+            self._refresh_thread = threading.Thread(target=self._refresh_quietly,
+                                                    name="krakencli-registry",
+                                                    daemon=True)
+            self._refresh_thread.start()
+            return self._refresh_thread
+
+    @property
+    def loaded_at(self):
+        return self._current_index().loaded_at
+
+    def resolve_pair(self, name):
+        return self._current_index().pair_names.get(name)
+
+    def pair_info(self, name):
+        index = self._current_index()
+        return index.pairs.get(index.pair_names.get(name))
+
+    def asset_info(self, name):
+        return self._current_index().assets.get(name)
+
+    def pair_names(self):
+        return list(self._current_index().pairs.keys())
+
+    def pairs_for_base(self, base):
+        return list(self._current_index().pairs_by_base.get(base, []))
+
+    def pairs_for_quote(self, quote):
+        return list(self._current_index().pairs_by_quote.get(quote, []))
+
+    def pair_for(self, base, quote):
+        return self._current_index().pairs_by_base_quote.get((base, quote))
+
+    def compile_validators(self):
+        return compile_schemas(KRAKEN_REQUEST_SCHEMAS,
+                               {'asset_pairs': self.pairs, 'assets': self.assets})
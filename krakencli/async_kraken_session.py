@@ -0,0 +1,224 @@
+import asyncio
+import collections
+import functools
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .exceptions import KrakenApiErrorException
+from .kraken_session import (
+    KrakenSession,
+    KrakenRequestManager,
+    _split_rejected_chunk,
+    _merge_chunk_parts,
+)
+from .response_cache import KrakenResponseCache
+from .single_flight import AsyncSingleFlight
+from .pagination import (
+    page_window,
+    split_offset_page,
+    page_offsets,
+    unseen_rows
+)
+
+
+DEFAULT_STREAM_BATCH_SIZE = 512
+
+
+def _next_batch(items, size):
+    return list(itertools.islice(items, size))
+
+
+class AsyncKrakenRequestManager(KrakenRequestManager):
+    """
+    Request manager whose make_*_request methods are coroutines.
+
+    The blocking transport (and its keep-alive connection pool) is shared
+    by a worker pool sized to the connection pool, so one event loop can
+    keep up to pool_maxsize requests in flight at once. Private requests are
+    the exception: they are sent one at a time in nonce order unless the
+    session was created with nonce_window=True.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._executor = None
+        self._async_single_flight = None
+        if self._single_flight is not None:
+            self._async_single_flight = AsyncSingleFlight()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._pool_maxsize,
+                thread_name_prefix="krakencli"
+            )
+        return self._executor
+
+    async def _run_in_executor(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor,
+                                          functools.partial(func, *args))
+
+    async def make_public_request(self, endpoint, request_data={}):
+        if self._async_single_flight is not None:
+            return await self._async_single_flight.do(
+                KrakenResponseCache.make_key(endpoint, request_data),
+                functools.partial(self._run_in_executor,
+                                  self.make_blocking_public_request,
+                                  endpoint,
+                                  request_data)
+            )
+        return await self._run_in_executor(
+            self.make_blocking_public_request,
+            endpoint,
+            request_data
+        )
+
+    async def make_private_request(self, endpoint, request_data={}):
+        return await self._run_in_executor(
+            super().make_private_request,
+            endpoint,
+            request_data
+        )
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        super().close()
+
+
+class AsyncKrakenSession(KrakenSession):
+    """
+    KrakenSession whose public and private API methods return coroutines.
+
+    Parameter validation runs eagerly when a method is called, so invalid
+    arguments raise immediately rather than when the result is awaited.
+    """
+
+    _request_manager_class = AsyncKrakenRequestManager
+
+    async def _transform(self, result, func):
+        return func(await result)
+
+    async def _timed_call(self, func, *args):
+        start = time.perf_counter()
+        result = await func(*args)
+        return result, time.perf_counter() - start
+
+    async def _snapshot_chunk(self, chunk):
+        try:
+            return await self.get_ticker_information(chunk), {}
+        except KrakenApiErrorException as e:
+            halves = _split_rejected_chunk(chunk, e)
+            if not halves:
+                return {}, {chunk: e}
+        return _merge_chunk_parts(await asyncio.gather(
+            *(self._snapshot_chunk(half) for half in halves)))
+
+    def _stream_public_request(self, request_type, **params):
+        # Validates eagerly, then pulls the blocking stream through the executor
+        # a batch of items at a time so the event loop never touches the socket
+        endpoint, request_data = self._validate(request_type, params)
+        items = self._request_manager.stream_public_request(endpoint, request_data)
+        return self._iter_in_executor(items)
+
+    async def _iter_in_executor(self, items):
+        try:
+            while True:
+                batch = await self._request_manager._run_in_executor(
+                    _next_batch,
+                    items,
+                    DEFAULT_STREAM_BATCH_SIZE
+                )
+                if not batch:
+                    return
+                for item in batch:
+                    yield item
+        finally:
+            await self._request_manager._run_in_executor(items.close)
+
+    async def _iter_pages(self,
+                          method,
+                          since,
+                          end,
+                          time_index,
+                          prefetch,
+                          *args,
+                          **kwargs):
+        task = asyncio.ensure_future(method(*args, since=since, **kwargs))
+        try:
+            while True:
+                rows, next_since, done = page_window(await task,
+                                                     since,
+                                                     end,
+                                                     time_index)
+                if not done and prefetch:
+                    task = asyncio.ensure_future(
+                        method(*args, since=next_since, **kwargs)
+                    )
+                for row in rows:
+                    yield row
+                if done:
+                    return
+                if not prefetch:
+                    task = asyncio.ensure_future(
+                        method(*args, since=next_since, **kwargs)
+                    )
+                since = next_since
+        finally:
+            task.cancel()
+
+    async def _iter_offsets(self, method, result_key, max_workers, **kwargs):
+        rows, count = split_offset_page(await method(**kwargs), result_key)
+        seen = set()
+        for row in unseen_rows(rows, seen):
+            yield row
+
+        offsets = iter(page_offsets(count))
+        pending = collections.deque(
+            asyncio.ensure_future(method(ofs=ofs, **kwargs))
+            for ofs in itertools.islice(offsets, max_workers)
+        )
+        try:
+            while pending:
+                result = await pending.popleft()
+                for ofs in itertools.islice(offsets, 1):
+                    pending.append(asyncio.ensure_future(method(ofs=ofs, **kwargs)))
+                rows, count = split_offset_page(result, result_key)
+                for row in unseen_rows(rows, seen):
+                    yield row
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fan_out(self, method, pairs, max_workers=None, **kwargs):
+        if max_workers is None:
+            max_workers = self._request_manager._pool_maxsize
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def run(pair):
+            async with semaphore:
+                return await method(pair, **kwargs)
+
+        outcomes = await asyncio.gather(*[run(pair) for pair in pairs],
+                                        return_exceptions=True)
+
+        results = {}
+        errors = {}
+        for pair, outcome in zip(pairs, outcomes):
+            if isinstance(outcome, Exception):
+                errors[pair] = outcome
+            else:
+                results[pair] = outcome
+
+        return {'result': results, 'error': errors}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # close() waits for requests still in flight, so it runs off the loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,74 @@
+import array
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+NUMPY_DTYPES = {
+    'b': 'int8',
+    'i': 'int32',
+    'q': 'int64',
+    'd': 'float64',
+}
+
+
+def _side_is_buy(side):
+    return 1 if side == 'b' else 0
+
+
+def _ordertype_is_market(ordertype):
+    return 1 if ordertype == 'm' else 0
+
+
+# (column name, row index, array typecode, converter)
+OHLC_COLUMNS = (
+    ('time', 0, 'q', int),
+    ('open', 1, 'd', float),
+    ('high', 2, 'd', float),
+    ('low', 3, 'd', float),
+    ('close', 4, 'd', float),
+    ('vwap', 5, 'd', float),
+    ('volume', 6, 'd', float),
+    ('count', 7, 'i', int),
+)
+
+TRADES_COLUMNS = (
+    ('price', 0, 'd', float),
+    ('volume', 1, 'd', float),
+    ('time', 2, 'd', float),
+    ('buy', 3, 'b', _side_is_buy),
+    ('market', 4, 'b', _ordertype_is_market),
+)
+
+SPREAD_COLUMNS = (
+    ('time', 0, 'q', int),
+    ('bid', 1, 'd', float),
+    ('ask', 2, 'd', float),
+)
+
+
+def make_column(typecode, values):
+    if np is not None:
+        return np.fromiter(values, dtype=NUMPY_DTYPES[typecode])
+    return array.array(typecode, values)
+
+
+def rows_to_columns(rows, columns):
+    """
+    Decodes a page of row lists into a dict of typed columns.
+
+    Columns are NumPy arrays when NumPy is installed and array.array
+    otherwise.
+    """
+    fields = list(zip(*rows))
+    return {name: make_column(typecode,
+                              map(convert, fields[index]) if fields else ())
+            for name, index, typecode, convert in columns}
+
+
+def result_to_columns(result, columns):
+    # Every list in the result is a page of rows, other members such as
+    # 'last' are passed through unchanged.
+    return {key: rows_to_columns(value, columns) if isinstance(value, list) else value
+            for key, value in result.items()}
@@ -1,6 +1,7 @@
 from .kraken_api_values import (
     KRAKEN_VALID_PUBLIC_ENDPOINTS,
-    KRAKEN_VALID_PRIVATE_ENDPOINTS
+    KRAKEN_VALID_PRIVATE_ENDPOINTS,
+    KRAKEN_RATE_LIMIT_TIERS
 )
 
 
@@ -85,3 +86,31 @@ class InvalidTimestampException(Exception):
         self.request_type = request_type
         super().__init__(f"'{self.param_value}' is not a valid timestamp for "
                          f"{self.param_name} in a(n) {self.request_type} request.")
+
+
+class InvalidRateLimitTierException(Exception):
+
+    def __init__(self, tier):
+        self.tier = tier
+        super().__init__(f"'{self.tier}' is not a valid rate limit tier. Please "
+                         f"use one of the following tiers: "
+                         f"{list(KRAKEN_RATE_LIMIT_TIERS.keys())}")
+
+
+class KrakenApiErrorException(Exception):
+
+    def __init__(self, errors, endpoint=None):
+        self.errors = errors
+        self.endpoint = endpoint
+        super().__init__(f"Kraken returned the following errors for a(n) "
+                         f"'{self.endpoint}' request: {self.errors}")
+
+
+class InvalidOrderBookChecksumException(Exception):
+
+    def __init__(self, pair, expected, actual):
+        self.pair = pair
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"The local order book for '{self.pair}' has checksum "
+                         f"{self.actual}, expected {self.expected}.")
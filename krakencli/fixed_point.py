@@ -0,0 +1,194 @@
+import decimal
+from . import columnar
+from .columnar import (
+    make_column,
+    OHLC_COLUMNS,
+    TRADES_COLUMNS,
+    SPREAD_COLUMNS
+)
+
+_POWERS_OF_TEN = [10 ** i for i in range(20)]
+# Byte values in a NumPy bytes column of plain decimal strings, 0 is padding
+_PLAIN_DECIMAL_CODES = tuple(b'0123456789.-\x00')
+
+# Which decimals each market data column is scaled by, columns not listed
+# are decoded as in columnar.
+OHLC_FIXED_SCALES = {
+    'open': 'price',
+    'high': 'price',
+    'low': 'price',
+    'close': 'price',
+    'vwap': 'price',
+    'volume': 'lot',
+}
+TRADES_FIXED_SCALES = {
+    'price': 'price',
+    'volume': 'lot',
+}
+SPREAD_FIXED_SCALES = {
+    'bid': 'price',
+    'ask': 'price',
+}
+
+
+def decode_fixed(value, decimals):
+    """
+    Converts a decimal string to an integer count of 10**-decimals units.
+
+    Digits beyond decimals are rounded half away from zero.
+    """
+    if isinstance(value, int):
+        return value * _POWERS_OF_TEN[decimals]
+    if not isinstance(value, str):
+        # repr gives the shortest round-tripping digits but may use exponent
+        # notation (5e-05, 1e+16), which Decimal expands
+        value = format(decimal.Decimal(repr(value)), 'f')
+    whole, dot, fraction = value.partition('.')
+    extra = len(fraction) - decimals
+    if extra <= 0:
+        return int(whole + fraction) * _POWERS_OF_TEN[-extra]
+    scaled = int(whole + fraction[:decimals])
+    if fraction[decimals] >= '5':
+        scaled += -1 if whole.startswith('-') else 1
+    return scaled
+
+
+def decode_fixed_exact(value, decimals):
+    # Like decode_fixed, but raises ValueError rather than rounding away
+    # non-zero digits beyond decimals
+    if isinstance(value, int):
+        return value * _POWERS_OF_TEN[decimals]
+    if not isinstance(value, str):
+        value = format(decimal.Decimal(repr(value)), 'f')
+    whole, dot, fraction = value.partition('.')
+    if fraction[decimals:].strip('0'):
+        raise ValueError(f"{value} has more than {decimals} decimal places")
+    return decode_fixed(value, decimals)
+
+
+def format_fixed(value, decimals):
+    sign = '-' if value < 0 else ''
+    whole, fraction = divmod(abs(int(value)), _POWERS_OF_TEN[decimals])
+    if decimals == 0:
+        return f"{sign}{whole}"
+    return f"{sign}{whole}.{fraction:0{decimals}d}"
+
+
+def _decode_fixed_strings(strings, decimals):
+    # decode_fixed over a NumPy bytes array, one character position at a
+    # time across every string: digits up to decimals past the point are
+    # accumulated, short fractions are scaled up and the next digit rounds
+    np = columnar.np
+    codes = strings.view(np.uint8).reshape(len(strings), strings.itemsize)
+    rows = np.arange(len(strings))
+    lengths = np.count_nonzero(codes, axis=1)
+    is_dot = codes == ord('.')
+    dots = np.where(is_dot.any(axis=1), is_dot.argmax(axis=1), lengths)
+    last_kept = dots + decimals
+    scaled = np.zeros(len(strings), dtype=np.int64)
+    for position in range(strings.itemsize):
+        digits = codes[:, position].astype(np.int64) - ord('0')
+        keep = (digits >= 0) & (digits <= 9) & (position <= last_kept)
+        scaled = np.where(keep, scaled * 10 + digits, scaled)
+    kept_fraction = np.clip(np.minimum(lengths - 1, last_kept) - dots, 0, decimals)
+    scaled *= np.array(_POWERS_OF_TEN[:19], dtype=np.int64)[decimals - kept_fraction]
+    rounding = last_kept + 1
+    round_digits = codes[rows, np.minimum(rounding, strings.itemsize - 1)]
+    scaled += (rounding < lengths) & (round_digits >= ord('5'))
+    return np.where(codes[:, 0] == ord('-'), -scaled, scaled)
+
+
+def decode_fixed_column(values, decimals):
+    # Decodes a column of decimal strings into an int64 column, vectorized
+    # with NumPy. Anything else, including floats and exponent notation, goes
+    # through decode_fixed one value at a time.
+    np = columnar.np
+    if np is not None:
+        strings = np.asarray(values, dtype='S')
+        if strings.ndim == 1 and len(strings) and \
+                np.isin(strings.view(np.uint8), _PLAIN_DECIMAL_CODES).all():
+            return _decode_fixed_strings(strings, decimals)
+    return make_column('q', [decode_fixed(value, decimals) for value in values])
+
+
+def format_fixed_column(values, decimals):
+    np = columnar.np
+    if np is None or not len(values):
+        return [format_fixed(value, decimals) for value in values]
+    values = np.asarray(values, dtype=np.int64)
+    whole, fraction = np.divmod(np.abs(values), _POWERS_OF_TEN[decimals])
+    strings = whole.astype(str)
+    if decimals:
+        strings = np.char.add(np.char.add(strings, '.'),
+                              np.char.zfill(fraction.astype(str), decimals))
+    strings = np.where(values < 0, np.char.add('-', strings), strings)
+    return strings.tolist()
+
+
+class FixedPointCodec(object):
+    """
+    Exact fixed-point conversion of one pair's prices and volumes.
+
+    Prices are scaled by the pair's pair_decimals and volumes by its
+    lot_decimals, as reported by get_tradable_asset_pairs.
+    """
+
+    __slots__ = ('pair_decimals', 'lot_decimals')
+
+    def __init__(self, pair_decimals, lot_decimals):
+        self.pair_decimals = pair_decimals
+        self.lot_decimals = lot_decimals
+
+    @classmethod
+    def from_asset_pair(cls, asset_pair_info):
+        return cls(asset_pair_info['pair_decimals'], asset_pair_info['lot_decimals'])
+
+    def _decimals(self, scale):
+        return self.pair_decimals if scale == 'price' else self.lot_decimals
+
+    def decode_prices(self, values):
+        return decode_fixed_column(values, self.pair_decimals)
+
+    def decode_volumes(self, values):
+        return decode_fixed_column(values, self.lot_decimals)
+
+    def format_prices(self, values):
+        return format_fixed_column(values, self.pair_decimals)
+
+    def format_volumes(self, values):
+        return format_fixed_column(values, self.lot_decimals)
+
+    def rows_to_columns(self, rows, columns, scales):
+        fields = list(zip(*rows))
+        decoded = {}
+        for name, index, typecode, convert in columns:
+            values = fields[index] if fields else ()
+            if name in scales:
+                decoded[name] = decode_fixed_column(values,
+                                                    self._decimals(scales[name]))
+            else:
+                decoded[name] = make_column(typecode, map(convert, values))
+        return decoded
+
+    def result_to_columns(self, result, columns, scales):
+        return {key: (self.rows_to_columns(value, columns, scales)
+                      if isinstance(value, list) else value)
+                for key, value in result.items()}
+
+    def decode_ohlc_data(self, ohlc_data):
+        return self.result_to_columns(ohlc_data, OHLC_COLUMNS, OHLC_FIXED_SCALES)
+
+    def decode_recent_trades(self, recent_trades):
+        return self.result_to_columns(recent_trades,
+                                      TRADES_COLUMNS,
+                                      TRADES_FIXED_SCALES)
+
+    def decode_recent_spread_data(self, spread_data):
+        return self.result_to_columns(spread_data,
+                                      SPREAD_COLUMNS,
+                                      SPREAD_FIXED_SCALES)
+
+
+def codecs_from_asset_pairs(asset_pairs):
+    return {pair: FixedPointCodec.from_asset_pair(info)
+            for pair, info in asset_pairs.items()}
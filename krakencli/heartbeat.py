@@ -0,0 +1,197 @@
+import threading
+import time
+import warnings
+from .exceptions import NoApiKeysException
+from .kraken_session import KrakenRequestManager
+
+DEFAULT_HEARTBEAT_TIMEOUT = 60
+DEFAULT_HEARTBEAT_RETRY_INTERVAL = 1.0
+HEARTBEAT_REQUEST_TYPE = 'CancelAllOrdersAfter'
+
+
+class KrakenDeadMansSwitch(object):
+    """
+    Keeps re-arming CancelAllOrdersAfter from a dedicated background thread.
+
+    Beats go out every interval seconds (a quarter of the timeout by default)
+    on their own connection, signed with a separate API key with its own
+    nonces, and they never wait on the rate limiter, so traffic on the
+    session cannot delay them. Each beat gives up after request_timeout
+    seconds (half the interval by default). Beats are scheduled against
+    absolute deadlines so they do not drift, and failed beats are retried
+    after retry_interval.
+
+    Passing share_session_key=True signs beats with the session's key and
+    nonce generator instead. Beats then race the session's own requests to
+    Kraken, so the key needs a nonce window.
+
+    on_alert(kind, details) is called when:
+    - 'late': re-arming is more than late_tolerance seconds overdue
+    - 'failed': a beat raises an exception
+    - 'expired': the timeout has passed since the last successful beat, so
+      Kraken has probably cancelled every open order
+    'late' and 'expired' come from a watchdog thread, once per outage, so
+    they are raised even while a beat is stuck waiting on the network.
+    """
+
+    def __init__(self,
+                 session,
+                 timeout=DEFAULT_HEARTBEAT_TIMEOUT,
+                 interval=None,
+                 on_alert=None,
+                 late_tolerance=None,
+                 retry_interval=DEFAULT_HEARTBEAT_RETRY_INTERVAL,
+                 api_key=None,
+                 private_key=None,
+                 share_session_key=False,
+                 request_timeout=None,
+                 clock=time.monotonic):
+        if interval is None:
+            interval = timeout / 4
+        if late_tolerance is None:
+            late_tolerance = interval / 2
+        if request_timeout is None:
+            request_timeout = interval / 2
+        session_manager = session._request_manager
+        nonce_generator = None
+        if share_session_key:
+            warnings.warn("The heartbeat shares the session's API key, which "
+                          "needs a nonce window on the key to avoid invalid "
+                          "nonce errors", RuntimeWarning)
+            api_key = session_manager._api_key
+            private_key = session_manager._private_key
+            nonce_generator = session_manager._nonce_generator
+        elif api_key is None or private_key is None:
+            raise NoApiKeysException()
+        self._validator = session._validators[HEARTBEAT_REQUEST_TYPE]
+        self._request_manager = KrakenRequestManager(session_manager._api_domain,
+                                                     session_manager._api_version,
+                                                     api_key,
+                                                     private_key,
+                                                     pool_connections=1,
+                                                     pool_maxsize=1,
+                                                     nonce_generator=nonce_generator,
+                                                     request_timeout=request_timeout)
+        self._timeout = timeout
+        self._interval = interval
+        self._on_alert = on_alert
+        self._late_tolerance = late_tolerance
+        self._retry_interval = retry_interval
+        self._clock = clock
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._watchdog = None
+        self._started_at = None
+        self.beats = 0
+        self.failures = 0
+        self.max_lateness = 0.0
+        self.last_armed_at = None
+        self.last_result = None
+
+    def _arm(self, timeout):
+        request_data = self._validator(timeout=timeout)
+        return self._request_manager.make_private_request(self._validator.endpoint,
+                                                          request_data)
+
+    def _alert(self, kind, details):
+        if self._on_alert is not None:
+            try:
+                self._on_alert(kind, details)
+            except Exception:
+                pass
+
+    def beat(self):
+        # Sends one beat, returning whether it re-armed the switch
+        try:
+            self.last_result = self._arm(self._timeout)
+        except Exception as e:
+            self.failures += 1
+            self._alert('failed', {'error': e})
+            return False
+        self.beats += 1
+        self.last_armed_at = self._clock()
+        return True
+
+    def _run(self):
+        next_beat = self._clock()
+        while not self._stop_event.is_set():
+            if self._clock() - next_beat > self._late_tolerance:
+                next_beat = self._clock()
+            if self.beat():
+                next_beat += self._interval
+            else:
+                next_beat = self._clock() + self._retry_interval
+            self._stop_event.wait(max(0.0, next_beat - self._clock()))
+
+    def _watch(self):
+        # Runs apart from the beats, so a beat stuck on the network cannot
+        # hold up the alerts. Each is raised once until the switch re-arms.
+        poll = min(self._interval, self._late_tolerance) / 2
+        reference = None
+        alerted = set()
+        while not self._stop_event.wait(poll):
+            armed_at = self.last_armed_at
+            since_time = self._started_at if armed_at is None else armed_at
+            if since_time != reference:
+                reference = since_time
+                alerted.clear()
+            since = self._clock() - since_time
+            lateness = since - self._interval
+            self.max_lateness = max(self.max_lateness, lateness)
+            if lateness > self._late_tolerance and 'late' not in alerted:
+                alerted.add('late')
+                self._alert('late', {'lateness': lateness})
+            if armed_at is not None and since >= self._timeout and \
+                    'expired' not in alerted:
+                alerted.add('expired')
+                self._alert('expired', {'since_armed': since})
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._started_at = self._clock()
+        self._thread = threading.Thread(target=self._run,
+                                        name="krakencli-heartbeat",
+                                        daemon=True)
+        self._watchdog = threading.Thread(target=self._watch,
+                                          name="krakencli-heartbeat-watchdog",
+                                          daemon=True)
+        self._thread.start()
+        self._watchdog.start()
+
+    def stop(self, disarm=True):
+        # A timeout of 0 disarms the switch, leaving open orders in place
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._watchdog.join()
+            self._thread = None
+            self._watchdog = None
+        if disarm:
+            self._arm(0)
+
+    def close(self):
+        self._request_manager.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.stop()
+        finally:
+            self.close()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self):
+        return {'running': self.running,
+                'beats': self.beats,
+                'failures': self.failures,
+                'max_lateness': self.max_lateness,
+                'last_armed_at': self.last_armed_at,
+                'last_result': self.last_result}
@@ -0,0 +1,275 @@
+import array
+import bisect
+import contextlib
+import functools
+import mmap
+import os
+import threading
+import time
+from . import columnar
+from .columnar import (
+    rows_to_columns,
+    OHLC_COLUMNS,
+    TRADES_COLUMNS,
+    NUMPY_DTYPES
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+DEFAULT_APPEND_BATCH_SIZE = 1000
+# Trade syncs resume this many seconds before the newest stored trade, so
+# trades sharing its timestamp that were not stored yet are served again
+TRADES_RESUME_OVERLAP = 1
+
+
+class ColumnarSeries(object):
+    """
+    Append-only time series stored as one fixed-width binary file per column.
+
+    Column files hold raw machine values, so reads memory-map them and
+    return zero-copy views (NumPy arrays when NumPy is installed, typed
+    memoryviews otherwise). A write interrupted part way is repaired on open
+    by truncating every column to the shortest one.
+
+    Writers take an exclusive flock on the series' lock file, so processes
+    sharing the store never interleave appends or sync the same tail twice.
+    """
+
+    def __init__(self, path, columns):
+        self._path = path
+        self._columns = columns
+        self._typecodes = {name: typecode for name, index, typecode, convert in columns}
+        self._itemsizes = {name: array.array(typecode).itemsize
+                           for name, typecode in self._typecodes.items()}
+        self.time_index = next(index for name, index, typecode, convert in columns
+                               if name == 'time')
+        self._thread_lock = threading.RLock()
+        self._lock_fd = None
+        self._lock_depth = 0
+        os.makedirs(path, exist_ok=True)
+        with self.locked():
+            self._repair()
+
+    def _column_path(self, name):
+        return os.path.join(self._path, f"{name}.col")
+
+    @contextlib.contextmanager
+    def locked(self):
+        # Reentrant, so a sync can hold it around its own appends. The flock
+        # is only taken by the outermost holder in this process.
+        with self._thread_lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                self._lock_fd = os.open(os.path.join(self._path, ".lock"),
+                                        os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_fd is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                    os.close(self._lock_fd)
+                    self._lock_fd = None
+
+    def _column_length(self, name):
+        try:
+            return os.path.getsize(self._column_path(name)) // self._itemsizes[name]
+        except FileNotFoundError:
+            return 0
+
+    def __len__(self):
+        return min(self._column_length(name) for name in self._typecodes)
+
+    def _repair(self):
+        length = len(self)
+        for name in self._typecodes:
+            with open(self._column_path(name), 'ab') as f:
+                f.truncate(length * self._itemsizes[name])
+
+    def append(self, rows):
+        if not rows:
+            return
+        columns = rows_to_columns(rows, self._columns)
+        with self.locked():
+            for name, values in columns.items():
+                with open(self._column_path(name), 'ab') as f:
+                    f.write(values.tobytes())
+
+    def rewrite(self, rows):
+        # Replaces the whole series, used when rows must be merged into the
+        # middle of it.
+        columns = rows_to_columns(rows, self._columns)
+        with self.locked():
+            for name, values in columns.items():
+                temp_path = self._column_path(name) + '.tmp'
+                with open(temp_path, 'wb') as f:
+                    f.write(values.tobytes())
+                os.replace(temp_path, self._column_path(name))
+
+    def column(self, name):
+        length = len(self)
+        typecode = self._typecodes[name]
+        if length == 0:
+            return columnar.make_column(typecode, ())
+        with open(self._column_path(name), 'rb') as f:
+            mapped = mmap.mmap(f.fileno(),
+                               length * self._itemsizes[name],
+                               access=mmap.ACCESS_READ)
+        if columnar.np is not None:
+            return columnar.np.frombuffer(mapped, dtype=NUMPY_DTYPES[typecode])
+        return memoryview(mapped).cast(typecode)
+
+    def last_time(self):
+        length = len(self)
+        if length == 0:
+            return None
+        itemsize = self._itemsizes['time']
+        with open(self._column_path('time'), 'rb') as f:
+            f.seek((length - 1) * itemsize)
+            return array.array(self._typecodes['time'], f.read(itemsize))[0]
+
+    def count_at_end(self, time_value):
+        # Number of trailing rows stamped time_value
+        times = self.column('time')
+        count = 0
+        for i in range(len(times) - 1, -1, -1):
+            if times[i] != time_value:
+                break
+            count += 1
+        return count
+
+    def read(self, start=None, end=None):
+        times = self.column('time')
+        if columnar.np is not None:
+            search = functools.partial(columnar.np.searchsorted, times, side='left')
+        else:
+            search = functools.partial(bisect.bisect_left, times)
+        lo = 0 if start is None else int(search(start))
+        hi = len(times) if end is None else int(search(end))
+        return {name: self.column(name)[lo:hi] for name in self._typecodes}
+
+    def rows(self):
+        return list(zip(*(self.column(name) for name, index, typecode, convert
+                          in self._columns)))
+
+
+class KrakenHistoryStore(object):
+    """
+    Local on-disk store of OHLC and trade history per pair.
+
+    Reads fetch only the tail that is missing locally from Kraken, append it,
+    and then answer from the memory-mapped column files.
+    """
+
+    def __init__(self, root, session, clock=time.time):
+        self._root = root
+        self._session = session
+        self._clock = clock
+        self._series = {}
+
+    def _get_series(self, pair, name, columns):
+        key = (pair, name)
+        if key not in self._series:
+            self._series[key] = ColumnarSeries(os.path.join(self._root, pair, name),
+                                               columns)
+        return self._series[key]
+
+    def ohlc_series(self, pair, interval):
+        return self._get_series(pair, f"ohlc_{interval}", OHLC_COLUMNS)
+
+    def trades_series(self, pair):
+        return self._get_series(pair, "trades", TRADES_COLUMNS)
+
+    def _append_newer(self, series, rows, last_time):
+        # Rows stamped last_time are deduplicated by how many of them are
+        # already stored, since several trades can share a timestamp and a
+        # sync may have stopped part way through them
+        stored_at_last = 0 if last_time is None else series.count_at_end(last_time)
+        appended = 0
+        batch = []
+        for row in rows:
+            if last_time is not None:
+                row_time = row[series.time_index]
+                if row_time < last_time:
+                    continue
+                if row_time == last_time and stored_at_last:
+                    stored_at_last -= 1
+                    continue
+            batch.append(row)
+            if len(batch) >= DEFAULT_APPEND_BATCH_SIZE:
+                series.append(batch)
+                appended += len(batch)
+                batch = []
+        series.append(batch)
+        return appended + len(batch)
+
+    def sync_ohlc(self, pair, interval, start=None):
+        # Holds the series lock from reading the tail to the last append, so a
+        # concurrent sync waits and then starts from the rows stored here
+        series = self.ohlc_series(pair, interval)
+        with series.locked():
+            last_time = series.last_time()
+            since = start if last_time is None else last_time
+            # The newest bar is still forming until its interval has passed
+            committed_before = self._clock() - interval * 60
+            rows = self._session.iter_ohlc_data(pair,
+                                                interval=interval,
+                                                start=since,
+                                                end=committed_before)
+            return self._append_newer(series, rows, last_time)
+
+    def sync_trades(self, pair, start=None):
+        series = self.trades_series(pair)
+        with series.locked():
+            last_time = series.last_time()
+            since = start if last_time is None else last_time - TRADES_RESUME_OVERLAP
+            rows = self._session.iter_trades(pair, start=since)
+            return self._append_newer(series, rows, last_time)
+
+    def get_ohlc(self, pair, interval, start=None, end=None, sync=True):
+        series = self.ohlc_series(pair, interval)
+        last_time = series.last_time()
+        if sync and (last_time is None or end is None or end > last_time):
+            self.sync_ohlc(pair, interval, start)
+        return series.read(start, end)
+
+    def get_trades(self, pair, start=None, end=None, sync=True):
+        series = self.trades_series(pair)
+        last_time = series.last_time()
+        if sync and (last_time is None or end is None or end > last_time):
+            self.sync_trades(pair, start)
+        return series.read(start, end)
+
+    def find_ohlc_gaps(self, pair, interval):
+        step = interval * 60
+        times = self.ohlc_series(pair, interval).column('time')
+        return [(int(times[i - 1]), int(times[i]))
+                for i in range(1, len(times))
+                if times[i] - times[i - 1] > step]
+
+    def repair_ohlc_gaps(self, pair, interval):
+        # Kraken only serves recent OHLC history, so gaps older than that
+        # cannot be filled and are returned.
+        gaps = self.find_ohlc_gaps(pair, interval)
+        if not gaps:
+            return gaps
+
+        missing = []
+        for gap_start, gap_end in gaps:
+            missing.extend(self._session.iter_ohlc_data(pair,
+                                                        interval=interval,
+                                                        start=gap_start,
+                                                        end=gap_end))
+        if missing:
+            series = self.ohlc_series(pair, interval)
+            with series.locked():
+                rows = {row[0]: row for row in series.rows()}
+                for row in missing:
+                    rows.setdefault(int(row[0]), row)
+                series.rewrite([rows[bar_time] for bar_time in sorted(rows)])
+
+        return self.find_ohlc_gaps(pair, interval)
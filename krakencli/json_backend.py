@@ -0,0 +1,16 @@
+import json
+
+# Use the fastest JSON decoder that is installed, falling back to the
+# standard library.
+try:
+    import orjson
+    JSON_BACKEND = "orjson"
+    json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    try:
+        import ujson
+        JSON_BACKEND = "ujson"
+        json_loads = ujson.loads
+    except ImportError:
+        JSON_BACKEND = "json"
+        json_loads = json.loads
@@ -0,0 +1,120 @@
+import codecs
+import json
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _StreamReader(object):
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            chunk = b''
+        if isinstance(chunk, bytes):
+            text = self._text_decoder.decode(chunk, final=self._eof)
+        else:
+            text = chunk
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at position {self._pos} of the "
+                             f"response stream")
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value that ends exactly at the end of the buffer may be a
+                # number cut off by the chunk boundary.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def members(self):
+        # Iterates over the keys of an object, leaving the reader at the start
+        # of each member's value.
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Unexpected '{char}' in the response stream")
+
+    def elements(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Unexpected '{char}' in the response stream")
+
+
+def iter_result_items(chunks):
+    """
+    Incrementally decodes the 'result' of a Kraken response.
+
+    Yields (key, row) for every element of each array in the result, such
+    as the rows of an OHLC or Trades page, as soon as the row has arrived.
+    Other result members, such as 'last', are yielded whole as (key, value).
+    Returns the response's error list when the response has no result.
+    """
+    reader = _StreamReader(chunks)
+    errors = []
+    for top_level_key in reader.members():
+        if top_level_key != 'result':
+            value = reader.value()
+            if top_level_key == 'error':
+                errors = value
+            continue
+        errors = None
+        for key in reader.members():
+            if reader.peek() == '[':
+                for row in reader.elements():
+                    yield key, row
+            else:
+                yield key, reader.value()
+    return errors
@@ -30,6 +30,8 @@ KRAKEN_VALID_PRIVATE_ENDPOINTS = [
     "CancelOrder",
     "CancelAll",
     "CancelAllOrdersAfter",
+    "AddOrderBatch",
+    "CancelOrderBatch",
     "DepositMethods",
     "DepositAddresses",
     "DepositStatus",
@@ -40,6 +42,37 @@ KRAKEN_VALID_PRIVATE_ENDPOINTS = [
     "WalletTransfer",
 ]
 
+# (maximum call counter, counter decay per second) for each verification tier
+KRAKEN_RATE_LIMIT_TIERS = {
+    "starter": (15, 0.33),
+    "intermediate": (20, 0.5),
+    "pro": (20, 1.0),
+}
+
+# Amount each private endpoint adds to the call counter, endpoints not listed
+# here cost 1. Order placement and cancellation are metered separately by the
+# trading engine and do not touch the call counter.
+KRAKEN_ENDPOINT_CALL_COSTS = {
+    "Ledgers": 2,
+    "QueryLedgers": 2,
+    "TradesHistory": 2,
+    "AddOrder": 0,
+    "CancelOrder": 0,
+    "AddOrderBatch": 0,
+    "CancelOrderBatch": 0,
+}
+
+# Private endpoints that take a JSON body (with nested order lists) rather than
+# form encoded data
+KRAKEN_JSON_BODY_ENDPOINTS = [
+    "AddOrderBatch",
+    "CancelOrderBatch",
+]
+# Most orders one AddOrderBatch (all for the same pair) or CancelOrderBatch
+# request takes
+KRAKEN_ADD_ORDER_BATCH_MAX = 15
+KRAKEN_CANCEL_ORDER_BATCH_MAX = 50
+
 KRAKEN_ASSETS = [
     "AAVE",
     "ADA",
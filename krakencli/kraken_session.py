@@ -1,23 +1,48 @@
 import requests
-import hmac
-import base64
-import urllib.parse
-from hashlib import sha256, sha512
+from requests.adapters import HTTPAdapter
+import collections
+import contextlib
+import functools
+import itertools
+import json
+import threading
 import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from .exceptions import (
     InvalidPublicEndpointException,
     InvalidPrivateEndpointException,
     InvalidKeyFileException,
-    MissingRequiredParameterException,
     InvalidRequestParameterException,
-    InvalidRequestParameterOptionsException,
-    InvalidTimestampException,
     NoApiKeysException,
+    KrakenApiErrorException,
+)
+from .kraken_signer import KrakenRequestSigner
+from .metrics import NULL_REQUEST_TIMER
+from .nonce import MicrosecondNonceGenerator
+from .response_cache import KrakenResponseCache
+from .single_flight import SingleFlight
+from .json_backend import json_loads as default_json_loads
+from .json_stream import iter_result_items
+from .pagination import (
+    page_window,
+    split_offset_page,
+    page_offsets,
+    unseen_rows
 )
+from .columnar import (
+    result_to_columns,
+    OHLC_COLUMNS,
+    TRADES_COLUMNS,
+    SPREAD_COLUMNS
+)
+from .validation import KRAKEN_REQUEST_VALIDATORS
 from .kraken_api_values import (
     KRAKEN_VALID_PUBLIC_ENDPOINTS,
     KRAKEN_VALID_PRIVATE_ENDPOINTS,
-    KRAKEN_ASSETS,
+    KRAKEN_JSON_BODY_ENDPOINTS,
+    KRAKEN_ADD_ORDER_BATCH_MAX,
+    KRAKEN_CANCEL_ORDER_BATCH_MAX,
     KRAKEN_ASSET_PAIRS
 )
 
@@ -25,6 +50,43 @@ DEFAULT_KRAKEN_API_DOMAIN = "https://api.kraken.com"
 DEFAULT_KRAKEN_API_VERSION = 0
 DEFAULT_KRAKEN_API_PUBLIC_ADDRESS = "public"
 DEFAULT_KRAKEN_API_PRIVATE_ADDRESS = "private"
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_URL_LENGTH = 2000
+# Concurrent pages of an offset walk. Only useful with nonce_window=True,
+# otherwise the page requests are sent one at a time anyway.
+DEFAULT_OFFSET_WORKERS = 1
+# Kraken fails a whole multi-pair request with this error when any one of its
+# pairs is unknown, e.g. delisted since KRAKEN_ASSET_PAIRS was generated
+KRAKEN_UNKNOWN_PAIR_ERROR = "EQuery:Unknown asset pair"
+# Concurrent order batches of add_orders/cancel_orders. Unless the session has
+# nonce_window=True the requests themselves are sent one at a time, and the
+# workers only overlap validation and decoding.
+DEFAULT_ORDER_BATCH_WORKERS = 4
+
+
+def chunk_pairs(pairs, base_url, max_url_length=DEFAULT_MAX_URL_LENGTH):
+    # Greedily packs pairs into the fewest comma-delimited 'pair' parameters
+    # whose encoded request URLs fit within max_url_length.
+    prefix_length = len(base_url) + len('?pair=')
+    encoded_comma_length = len(urllib.parse.quote_plus(','))
+    chunks = []
+    chunk = []
+    length = prefix_length
+    for pair in pairs:
+        pair_length = len(urllib.parse.quote_plus(pair))
+        if chunk and length + encoded_comma_length + pair_length > max_url_length:
+            chunks.append(','.join(chunk))
+            chunk = []
+            length = prefix_length
+        if chunk:
+            length += encoded_comma_length
+        chunk.append(pair)
+        length += pair_length
+    if chunk:
+        chunks.append(','.join(chunk))
+    return chunks
 
 
 class KrakenRequestManager(object):
@@ -33,22 +95,80 @@ class KrakenRequestManager(object):
                  api_domain=DEFAULT_KRAKEN_API_DOMAIN,
                  api_version=DEFAULT_KRAKEN_API_VERSION,
                  api_key=None,
-                 private_key=None):
+                 private_key=None,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=False,
+                 rate_limiter=None,
+                 nonce_generator=None,
+                 response_cache=None,
+                 coalesce_requests=False,
+                 json_loads=None,
+                 public_rate_limiter=None,
+                 metrics=None,
+                 nonce_window=False,
+                 request_timeout=None):
         self._api_domain = api_domain
         self._api_version = api_version
-        self._prev_nonce = 0
+        if nonce_generator is None:
+            nonce_generator = MicrosecondNonceGenerator()
+        self._nonce_generator = nonce_generator
         self._api_key = api_key
         self._private_key = private_key
-
-    def generate_nonce(self):
-        return int(time.time() * 1000)
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._http_session = None
+        self._rate_limiter = rate_limiter
+        self._public_rate_limiter = public_rate_limiter
+        self._metrics = metrics
+        self._signer = None
+        self._response_cache = response_cache
+        self._single_flight = SingleFlight() if coalesce_requests else None
+        self._json_loads = default_json_loads if json_loads is None else json_loads
+        # Seconds to wait on the connection and on each read, None waits forever
+        self._request_timeout = request_timeout
+        # Kraken rejects a nonce lower than one it has already seen unless the
+        # key has a nonce window, so by default the nonce is drawn and the
+        # request posted under one lock to keep them in order across threads.
+        # The lock is held for the whole round trip, so private requests are
+        # serialized behind the slowest one in flight. Keys with a nonce
+        # window can pass nonce_window=True to send them in parallel.
+        if nonce_window:
+            self._private_send_lock = contextlib.nullcontext()
+        else:
+            self._private_send_lock = threading.Lock()
+
+    def _make_http_session(self):
+        # pool_connections is the number of per-host pools kept alive and
+        # pool_maxsize the number of keep-alive connections kept per host.
+        adapter = HTTPAdapter(pool_connections=self._pool_connections,
+                              pool_maxsize=self._pool_maxsize,
+                              pool_block=self._pool_block)
+        http_session = requests.Session()
+        http_session.mount("https://", adapter)
+        http_session.mount("http://", adapter)
+        return http_session
+
+    @property
+    def http_session(self):
+        if self._http_session is None:
+            self._http_session = self._make_http_session()
+        return self._http_session
+
+    def close(self):
+        if self._http_session is not None:
+            self._http_session.close()
+            self._http_session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def get_next_nonce(self):
-        nonce = self.generate_nonce()
-        while nonce <= self._prev_nonce:
-            nonce = self.generate_nonce()
-        self._prev_nonce = nonce
-        return nonce
+        return self._nonce_generator.next_nonce()
 
     def build_url(self, pub_priv, endpoint):
         return f"{self._api_domain}/{self._api_version}/{pub_priv}/{endpoint}"
@@ -59,73 +179,235 @@ class KrakenRequestManager(object):
     def build_private_url(self, endpoint):
         return self.build_url(DEFAULT_KRAKEN_API_PRIVATE_ADDRESS, endpoint)
 
-    def _make_private_request_headers(self, url, post_data):
+    def _get_signer(self):
+        # The signer caches the decoded private key, so it is rebuilt whenever
+        # the key is replaced on the manager.
+        if self._signer is None or self._signer.private_key != self._private_key:
+            self._signer = KrakenRequestSigner(
+                self._private_key,
+                f"/{self._api_version}/{DEFAULT_KRAKEN_API_PRIVATE_ADDRESS}/"
+            )
+        return self._signer
+
+    def _encode_post_data(self, nonce, request_data):
+        post_data = {'nonce': nonce}
+        for key, value in request_data.items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = str(value).lower()
+            post_data[key] = value
+        return urllib.parse.urlencode(post_data)
+
+    def _encode_json_post_data(self, nonce, request_data):
+        post_data = {'nonce': nonce}
+        post_data.update((key, value) for key, value in request_data.items()
+                         if value is not None)
+        return json.dumps(post_data, separators=(',', ':'))
+
+    def _make_private_request_headers(self,
+                                      endpoint,
+                                      nonce,
+                                      encoded_post_data,
+                                      content_type='application/x-www-form-urlencoded'):
 
         headers = {}
         headers['API-Key'] = self._api_key
+        headers['API-Sign'] = self._get_signer().sign(endpoint,
+                                                      nonce,
+                                                      encoded_post_data)
+        headers['Content-Type'] = content_type
 
-        url_encoded_post_data = urllib.parse.urlencode(post_data)
-        nonce = post_data['nonce']
-        internal_data = (str(nonce)+url_encoded_post_data).encode()
+        return headers
 
-        private_key_b64_dec = base64.b64decode(self._private_key)
-        uri = '/'+url.lstrip(self._api_domain)
-        enc_url = uri.encode()
-        internal_sha256 = sha256(internal_data).digest()
-        msg = enc_url+internal_sha256
+    def _decode_response(self, endpoint, content):
+        payload = self._json_loads(content)
+        try:
+            return payload['result']
+        except KeyError:
+            raise KrakenApiErrorException(payload.get('error', []), endpoint)
 
-        h = hmac.new(private_key_b64_dec, msg, sha512)
-        h = base64.b64encode(h.digest())
-        h = h.decode()
-        headers['API-Sign'] = h
+    def _start_timer(self, endpoint):
+        if self._metrics is None:
+            return NULL_REQUEST_TIMER
+        return self._metrics.timer(endpoint)
 
-        return headers
+    def _fetch_public(self, endpoint, request_data, timer=NULL_REQUEST_TIMER):
+        url = self.build_public_url(endpoint)
+
+        if self._public_rate_limiter is not None:
+            self._public_rate_limiter.acquire(endpoint)
+        timer.mark('rate_limit')
+
+        response = self.http_session.get(url,
+                                         params=request_data,
+                                         timeout=self._request_timeout)
+        timer.response(response)
+
+        result = self._decode_response(endpoint, response.content)
+        timer.mark('decode')
+        return result
 
     def make_public_request(self, endpoint, request_data={}):
+        return self.make_blocking_public_request(endpoint, request_data)
+
+    def make_blocking_public_request(self, endpoint, request_data={}):
+        # Blocks on every manager, including those whose make_public_request
+        # is a coroutine, for helpers that run on their own threads
         if endpoint not in KRAKEN_VALID_PUBLIC_ENDPOINTS:
             raise InvalidPublicEndpointException(endpoint)
 
-        url = self.build_public_url(endpoint)
+        if self._response_cache is not None:
+            result = self._response_cache.get(endpoint, request_data)
+            if result is not None:
+                return result
+
+        timer = self._start_timer(endpoint)
+        try:
+            if self._single_flight is not None:
+                result = self._single_flight.do(
+                    KrakenResponseCache.make_key(endpoint, request_data),
+                    lambda: self._fetch_public(endpoint, request_data, timer)
+                )
+            else:
+                result = self._fetch_public(endpoint, request_data, timer)
+        except Exception as e:
+            timer.error(e)
+            raise
+        timer.finish()
+
+        if self._response_cache is not None:
+            self._response_cache.put(endpoint, request_data, result)
 
-        response = requests.get(url, params=request_data)
-        return response.json()['result']
+        return result
 
     def make_private_request(self, endpoint, request_data={}):
         if self._api_key is None or self._private_key is None:
             raise NoApiKeysException()
         if endpoint not in KRAKEN_VALID_PRIVATE_ENDPOINTS:
             raise InvalidPrivateEndpointException(endpoint)
-        url = self.build_private_url(endpoint)
 
-        nonce = self.get_next_nonce()
+        timer = self._start_timer(endpoint)
+        try:
+            result = self._send_private(endpoint, request_data, timer)
+        except Exception as e:
+            timer.error(e)
+            raise
+        timer.finish()
+        return result
+
+    def _send_private(self, endpoint, request_data, timer):
+        url = self.build_private_url(endpoint)
 
-        post_data = {}
-        post_data['nonce'] = nonce
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire(endpoint)
+        timer.mark('rate_limit')
 
-        headers = self._make_private_request_headers(url, post_data)
+        with self._private_send_lock:
+            nonce = self.get_next_nonce()
 
-        response = requests.post(url, headers=headers, data=post_data)
+            if endpoint in KRAKEN_JSON_BODY_ENDPOINTS:
+                encoded_post_data = self._encode_json_post_data(nonce, request_data)
+                headers = self._make_private_request_headers(endpoint,
+                                                             nonce,
+                                                             encoded_post_data,
+                                                             'application/json')
+            else:
+                encoded_post_data = self._encode_post_data(nonce, request_data)
+                headers = self._make_private_request_headers(endpoint,
+                                                             nonce,
+                                                             encoded_post_data)
+            timer.mark('sign')
+
+            response = self.http_session.post(url,
+                                              headers=headers,
+                                              data=encoded_post_data,
+                                              timeout=self._request_timeout)
+        timer.response(response, len(encoded_post_data))
 
         # TODO: REthink how results are returned, there are some cases where a valid
         # API call exists and returns a 200 status code without a result field
         # (Example is calling balance on account with no balance)
-        return response.json()['result']
+        result = self._decode_response(endpoint, response.content)
+        timer.mark('decode')
+        return result
+
+    def stream_public_request(self,
+                              endpoint,
+                              request_data={},
+                              chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+        if endpoint not in KRAKEN_VALID_PUBLIC_ENDPOINTS:
+            raise InvalidPublicEndpointException(endpoint)
+
+        url = self.build_public_url(endpoint)
+
+        if self._public_rate_limiter is not None:
+            self._public_rate_limiter.acquire(endpoint)
+
+        with self.http_session.get(url,
+                                   params=request_data,
+                                   stream=True,
+                                   timeout=self._request_timeout) as response:
+            errors = yield from iter_result_items(response.iter_content(chunk_size))
+
+        if errors:
+            raise KrakenApiErrorException(errors, endpoint)
 
 
 class KrakenSession(object):
 
+    _request_manager_class = KrakenRequestManager
+
     def __init__(self,
                  api_domain=DEFAULT_KRAKEN_API_DOMAIN,
                  api_version=DEFAULT_KRAKEN_API_VERSION,
                  api_key=None,
-                 private_key=None):
-        self._request_manager = KrakenRequestManager(
+                 private_key=None,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=False,
+                 rate_limiter=None,
+                 nonce_generator=None,
+                 response_cache=None,
+                 coalesce_requests=False,
+                 json_loads=None,
+                 public_rate_limiter=None,
+                 asset_registry=None,
+                 metrics=None,
+                 nonce_window=False,
+                 request_timeout=None):
+        self._asset_registry = asset_registry
+        self._validators = KRAKEN_REQUEST_VALIDATORS
+        if asset_registry is not None:
+            self._validators = asset_registry.compile_validators()
+        self._request_manager = self._request_manager_class(
             api_domain,
             api_version,
             api_key,
-            private_key
+            private_key,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            rate_limiter=rate_limiter,
+            nonce_generator=nonce_generator,
+            response_cache=response_cache,
+            coalesce_requests=coalesce_requests,
+            json_loads=json_loads,
+            public_rate_limiter=public_rate_limiter,
+            metrics=metrics,
+            nonce_window=nonce_window,
+            request_timeout=request_timeout
         )
 
+    def close(self):
+        self._request_manager.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def set_api_key(self, api_key):
         self._request_manager._api_key = api_key
 
@@ -141,373 +423,271 @@ class KrakenSession(object):
             except StopIteration:
                 raise InvalidKeyFileException(file_path)
 
-    def _validate_user_parameter_base(self, name, value, required):
-        if value is None:
-            if required:
-                raise MissingRequiredParameterException(name)
-            else:
-                return None
-        else:
-            return value
-
-    def _validate_user_parameter_options(self,
-                                         name,
-                                         value,
-                                         valid_options,
-                                         required):
-        base_validation = self._validate_user_parameter_base(name, value, required)
-        if base_validation is None:
-            return None
-        else:
-            if base_validation == value:
-                if value in valid_options:
-                    return value
-            raise InvalidRequestParameterOptionsException(
-                name,
-                value,
-                valid_options
+    def _validate(self, request_type, params):
+        validator = self._validators[request_type]
+        metrics = self._request_manager._metrics
+        if metrics is None:
+            return validator.endpoint, validator(**params)
+        start = time.perf_counter()
+        request_data = validator(**params)
+        metrics.record(validator.endpoint, 'validate', time.perf_counter() - start)
+        return validator.endpoint, request_data
+
+    def _public_request(self, request_type, **params):
+        endpoint, request_data = self._validate(request_type, params)
+        return self._request_manager.make_public_request(endpoint, request_data)
+
+    def _private_request(self, request_type, **params):
+        endpoint, request_data = self._validate(request_type, params)
+        return self._request_manager.make_private_request(endpoint, request_data)
+
+    def _transform(self, result, func):
+        return func(result)
+
+    def _timed_call(self, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+
+    def _stream_public_request(self, request_type, **params):
+        endpoint, request_data = self._validate(request_type, params)
+        return self._request_manager.stream_public_request(endpoint, request_data)
+
+    def _iter_pages(self, method, since, end, time_index, prefetch, *args, **kwargs):
+        # Follows the 'last' cursor of a market data endpoint page by page. With
+        # prefetch, the next page is requested while the current one is being
+        # consumed.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(method, *args, since=since, **kwargs)
+            while True:
+                rows, next_since, done = page_window(future.result(),
+                                                     since,
+                                                     end,
+                                                     time_index)
+                if not done and prefetch:
+                    future = executor.submit(method, *args, since=next_since, **kwargs)
+                yield from rows
+                if done:
+                    return
+                if not prefetch:
+                    future = executor.submit(method, *args, since=next_since, **kwargs)
+                since = next_since
+
+    def _iter_offsets(self, method, result_key, max_workers, **kwargs):
+        # Walks an 'ofs' paginated private endpoint. The first page gives the
+        # total count, the remaining offsets are then fetched max_workers at a
+        # time (the rate limiter paces them) and their rows yielded in order.
+        # Without nonce_window=True the pages are still sent one at a time in
+        # nonce order, so max_workers > 1 only overlaps their decoding.
+        rows, count = split_offset_page(method(**kwargs), result_key)
+        seen = set()
+        yield from unseen_rows(rows, seen)
+
+        offsets = iter(page_offsets(count))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = collections.deque(
+                executor.submit(method, ofs=ofs, **kwargs)
+                for ofs in itertools.islice(offsets, max_workers)
             )
-
-    def _validate_user_parameter_comma_delimited(self,
-                                                 name,
-                                                 comma_delimited_value,
-                                                 valid_options,
-                                                 required):
-        base_validation = self._validate_user_parameter_base(
-            name,
-            comma_delimited_value,
-            required
-        )
-        if base_validation is None:
-            return None
-        else:
-            if base_validation == comma_delimited_value:
-                value_list = comma_delimited_value.split(',')
-                if all(value in valid_options for value in value_list):
-                    return comma_delimited_value
-            raise InvalidRequestParameterOptionsException(
-                name,
-                comma_delimited_value,
-                valid_options
-            )
-
-    def _validate_user_parameter_timestamp(self, name, value, required):
-        base_validation = self._validate_user_parameter_base(name, value, required)
-        if base_validation is None:
-            return None
-        else:
-            if base_validation == value:
-                if isinstance(value, float) or isinstance(value, int):
-                    return value
-            raise InvalidTimestampException(name, value)
-
-    def _validate_user_parameter_integer(self, name, value, required):
-        base_validation = self._validate_user_parameter_base(name, value, required)
-        if base_validation is None:
-            return None
-        if base_validation == value:
-            if isinstance(value, int):
-                return value
-            raise InvalidRequestParameterException(name, value)
-
-    def _validate_user_parameter_boolean(self, name, value, required):
-        base_validation = self._validate_user_parameter_base(name, value, required)
-        if base_validation is None:
-            return None
-        if base_validation == value:
-            if isinstance(value, bool):
-                return value
-            raise InvalidRequestParameterException(name, value)
+            try:
+                while pending:
+                    result = pending.popleft().result()
+                    for ofs in itertools.islice(offsets, 1):
+                        pending.append(executor.submit(method, ofs=ofs, **kwargs))
+                    rows, count = split_offset_page(result, result_key)
+                    yield from unseen_rows(rows, seen)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _fan_out(self, method, pairs, max_workers=None, **kwargs):
+        # Runs method once per pair on a bounded worker pool. Results and
+        # exceptions are returned separately, keyed by pair.
+        if max_workers is None:
+            max_workers = self._request_manager._pool_maxsize
+
+        results = {}
+        errors = {}
+
+        if not pairs:
+            return {'result': results, 'error': errors}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as executor:
+            futures = {pair: executor.submit(method, pair, **kwargs)
+                       for pair in pairs}
+            for pair, future in futures.items():
+                try:
+                    results[pair] = future.result()
+                except Exception as e:
+                    errors[pair] = e
+
+        return {'result': results, 'error': errors}
 
     """
     Public market data functions
     """
 
     def get_server_time(self):
-        return self._request_manager.make_public_request("Time")
+        return self._public_request('GetServerTime')
 
     def get_system_status(self):
-        return self._request_manager.make_public_request("SystemStatus")
+        return self._public_request('GetSystemStatus')
 
     def get_asset_info(self, info=None, aclass=None):
-
-        valid_info_options = ['info']
-        valid_aclass_options = ['currency']
-
-        data = {}
-
-        try:
-            data['info'] = self._validate_user_parameter_options(
-                'info',
-                info,
-                valid_info_options,
-                False
-            )
-            data['aclass'] = self._validate_user_parameter_options(
-                'aclass',
-                aclass,
-                valid_aclass_options,
-                False
-            )
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(e.param_name,
-                                                          e.param_value,
-                                                          e.valid_values,
-                                                          'GetAssetInfo')
-
-        return self._request_manager.make_public_request('Assets', data)
+        return self._public_request('GetAssetInfo', info=info, aclass=aclass)
 
     def get_tradable_asset_pairs(self, info=None, pair=None):
-
-        valid_info_options = ['info', 'leverage', 'fees', 'margin']
-        valid_asset_pairs = KRAKEN_ASSET_PAIRS
-
-        data = {}
-
-        try:
-            data['info'] = self._validate_user_parameter_options(
-                'info',
-                info,
-                valid_info_options,
-                False
-            )
-            data['pair'] = self._validate_user_parameter_comma_delimited(
-                'pair',
-                pair,
-                valid_asset_pairs,
-                False
-            )
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(e.param_name,
-                                                          e.param_value,
-                                                          e.valid_values,
-                                                          'GetTradableAssetPairs')
-
-        return self._request_manager.make_public_request('AssetPairs', data)
+        return self._public_request('GetTradableAssetPairs', info=info, pair=pair)
 
     def get_ticker_information(self, pair):
-
-        valid_asset_pairs = KRAKEN_ASSET_PAIRS
-
-        data = {}
-
-        try:
-            data['pair'] = self._validate_user_parameter_comma_delimited(
-                'pair',
-                pair,
-                valid_asset_pairs,
-                True)
-        except MissingRequiredParameterException as e:
-            raise MissingRequiredParameterException(e.param_name,
-                                                    'GetTickerInformation')
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(e.param_name,
-                                                          e.param_value,
-                                                          e.valid_values,
-                                                          'GetTickerInformation')
-
-        return self._request_manager.make_public_request('Ticker', data)
-
-    def get_ohlc_data(self, pair, interval=None, since=None):
-
-        valid_asset_pairs = KRAKEN_ASSET_PAIRS
-        valid_time_interval = [1, 5, 15, 30, 60, 240, 1440, 10080, 21600]
-
-        data = {}
-
-        try:
-            data['pair'] = self._validate_user_parameter_options(
-                'pair',
-                pair,
-                valid_asset_pairs,
-                True
-            )
-            data['interval'] = self._validate_user_parameter_options(
-                'interval',
-                interval,
-                valid_time_interval,
-                False
-            )
-            data['since'] = self._validate_user_parameter_timestamp(
-                'since',
-                since,
-                False
-            )
-        except MissingRequiredParameterException as e:
-            raise MissingRequiredParameterException(e.param_name,
-                                                    'GetOHLCData')
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(e.param_name,
-                                                          e.param_value,
-                                                          e.valid_values,
-                                                          'GetOHLCData')
-        except InvalidTimestampException as e:
-            raise InvalidTimestampException(e.param_name,
-                                            e.param_value,
-                                            'GetOHLCData')
-
-        return self._request_manager.make_public_request("OHLC", data)
+        return self._public_request('GetTickerInformation', pair=pair)
+
+    def get_ohlc_data(self, pair, interval=None, since=None, as_array=False):
+        result = self._public_request('GetOHLCData',
+                                      pair=pair,
+                                      interval=interval,
+                                      since=since)
+        if as_array:
+            return self._transform(result, functools.partial(result_to_columns,
+                                                             columns=OHLC_COLUMNS))
+        return result
 
     def get_order_book(self, pair, count=None):
-
-        valid_asset_pairs = KRAKEN_ASSET_PAIRS
-
-        data = {}
-
+        return self._public_request('GetOrderBook', pair=pair, count=count)
+
+    def get_recent_trades(self, pair, since=None, as_array=False):
+        result = self._public_request('GetRecentTrades', pair=pair, since=since)
+        if as_array:
+            return self._transform(result, functools.partial(result_to_columns,
+                                                             columns=TRADES_COLUMNS))
+        return result
+
+    def get_recent_spread_data(self, pair, since=None, as_array=False):
+        result = self._public_request('GetRecentSpreadData', pair=pair, since=since)
+        if as_array:
+            return self._transform(result, functools.partial(result_to_columns,
+                                                             columns=SPREAD_COLUMNS))
+        return result
+
+    def stream_tradable_asset_pairs(self, info=None, pair=None):
+        return self._stream_public_request('GetTradableAssetPairs',
+                                           info=info,
+                                           pair=pair)
+
+    def stream_ohlc_data(self, pair, interval=None, since=None):
+        return self._stream_public_request('GetOHLCData',
+                                           pair=pair,
+                                           interval=interval,
+                                           since=since)
+
+    def stream_recent_trades(self, pair, since=None):
+        return self._stream_public_request('GetRecentTrades', pair=pair, since=since)
+
+    def stream_recent_spread_data(self, pair, since=None):
+        return self._stream_public_request('GetRecentSpreadData',
+                                           pair=pair,
+                                           since=since)
+
+    def iter_ohlc_data(self, pair, interval=None, start=None, end=None, prefetch=True):
+        return self._iter_pages(self.get_ohlc_data,
+                                start,
+                                end,
+                                0,
+                                prefetch,
+                                pair,
+                                interval=interval)
+
+    def iter_trades(self, pair, start=None, end=None, prefetch=True):
+        return self._iter_pages(self.get_recent_trades, start, end, 2, prefetch, pair)
+
+    def iter_spread_data(self, pair, start=None, end=None, prefetch=True):
+        return self._iter_pages(self.get_recent_spread_data,
+                                start,
+                                end,
+                                0,
+                                prefetch,
+                                pair)
+
+    def get_market_snapshot(self,
+                            pairs=None,
+                            max_url_length=DEFAULT_MAX_URL_LENGTH,
+                            max_workers=None):
+        if pairs is None:
+            pairs = KRAKEN_ASSET_PAIRS
+            if self._asset_registry is not None:
+                pairs = self._asset_registry.pair_names()
+        chunks = chunk_pairs(pairs,
+                             self._request_manager.build_public_url('Ticker'),
+                             max_url_length)
+        timed_ticker = functools.partial(self._timed_call, self._snapshot_chunk)
+        return self._transform(self._fan_out(timed_ticker, chunks, max_workers),
+                               functools.partial(_merge_snapshot_chunks,
+                                                 chunks=chunks))
+
+    def _snapshot_chunk(self, chunk):
+        # Returns the chunk's tickers and the pairs Kraken rejected, splitting
+        # the chunk until the unknown pairs are on their own
         try:
-            data['pair'] = self._validate_user_parameter_options(
-                'pair',
-                pair,
-                valid_asset_pairs,
-                True
-            )
-            data['count'] = self._validate_user_parameter_integer(
-                'count',
-                count,
-                False
-            )
-        except MissingRequiredParameterException as e:
-            raise MissingRequiredParameterException(
-                e.param_name,
-                'GetOrderBook'
-            )
-        except InvalidRequestParameterException as e:
-            raise InvalidRequestParameterException(
-                e.param_name,
-                e.param_value,
-                'GetOrderBook'
-            )
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(
-                e.param_name,
-                e.param_value,
-                e.valid_values,
-                'GetOrderBook'
-            )
-
-        return self._request_manager.make_public_request('Depth', data)
-
-    def get_recent_trades(self, pair, since=None):
-
-        valid_asset_pairs = KRAKEN_ASSET_PAIRS
-
-        data = {}
-
-        try:
-            data['pair'] = self._validate_user_parameter_options(
-                'pair',
-                pair,
-                valid_asset_pairs,
-                True
-            )
-            data['since'] = self._validate_user_parameter_timestamp(
-                'since',
-                since,
-                False
-            )
-        except MissingRequiredParameterException as e:
-            raise MissingRequiredParameterException(e.param_name,
-                                                    'GetRecentTrades')
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(e.param_name,
-                                                          e.param_value,
-                                                          e.valid_values,
-                                                          'GetRecentTrades')
-        except InvalidTimestampException as e:
-            raise InvalidTimestampException(e.param_name,
-                                            e.param_value,
-                                            'GetRecentTrades')
-
-        return self._request_manager.make_public_request('Trades', data)
-
-    def get_recent_spread_data(self, pair, since=None):
-
-        valid_asset_pairs = KRAKEN_ASSET_PAIRS
-
-        data = {}
-
-        try:
-            data['pair'] = self._validate_user_parameter_options(
-                'pair',
-                pair,
-                valid_asset_pairs,
-                True
-            )
-            data['since'] = self._validate_user_parameter_timestamp(
-                'since',
-                since,
-                False
-            )
-        except MissingRequiredParameterException as e:
-            raise MissingRequiredParameterException(e.param_name,
-                                                    'GetRecentSpreadData')
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(e.param_name,
-                                                          e.param_value,
-                                                          e.valid_values,
-                                                          'GetRecentSpreadData')
-        except InvalidTimestampException as e:
-            raise InvalidTimestampException(e.param_name,
-                                            e.param_value,
-                                            'GetRecentSpreadData')
-
-        return self._request_manager.make_public_request('Spread', data)
+            return self.get_ticker_information(chunk), {}
+        except KrakenApiErrorException as e:
+            halves = _split_rejected_chunk(chunk, e)
+            if not halves:
+                return {}, {chunk: e}
+        return _merge_chunk_parts([self._snapshot_chunk(half) for half in halves])
+
+    def get_ohlc_data_bulk(self,
+                           pairs,
+                           interval=None,
+                           since=None,
+                           max_workers=None,
+                           as_array=False):
+        return self._fan_out(self.get_ohlc_data,
+                             pairs,
+                             max_workers,
+                             interval=interval,
+                             since=since,
+                             as_array=as_array)
+
+    def get_order_book_bulk(self, pairs, count=None, max_workers=None):
+        return self._fan_out(self.get_order_book,
+                             pairs,
+                             max_workers,
+                             count=count)
+
+    def get_recent_trades_bulk(self,
+                               pairs,
+                               since=None,
+                               max_workers=None,
+                               as_array=False):
+        return self._fan_out(self.get_recent_trades,
+                             pairs,
+                             max_workers,
+                             since=since,
+                             as_array=as_array)
+
+    def get_recent_spread_data_bulk(self,
+                                    pairs,
+                                    since=None,
+                                    max_workers=None,
+                                    as_array=False):
+        return self._fan_out(self.get_recent_spread_data,
+                             pairs,
+                             max_workers,
+                             since=since,
+                             as_array=as_array)
 
     """
     Private user data functions
     """
 
     def get_account_balance(self):
-        return self._request_manager.make_private_request('Balance')
+        return self._private_request('GetAccountBalance')
 
     def get_trade_balance(self, aclass=None, asset=None):
-
-        valid_aclass_options = ['currency']
-
-        data = {}
-
-        try:
-            data['aclass'] = self._validate_user_parameter_options(
-                'aclass',
-                aclass,
-                valid_aclass_options,
-                False
-            )
-            data['asset'] = self._validate_user_parameter_options(
-                'asset',
-                asset,
-                KRAKEN_ASSETS,
-                False
-            )
-        except InvalidRequestParameterOptionsException as e:
-            raise InvalidRequestParameterOptionsException(e.param_name,
-                                                          e.param_value,
-                                                          KRAKEN_ASSETS,
-                                                          'GetTradeBalance')
-
-        return self._request_manager.make_private_request('TradeBalance', data)
+        return self._private_request('GetTradeBalance', aclass=aclass, asset=asset)
 
     def get_open_orders(self, trades=None, userref=None):
-
-        data = {}
-
-        try:
-            data['trades'] = self._validate_user_parameter_boolean(
-                'trades',
-                trades,
-                False
-            )
-            data['userref'] = self._validate_user_parameter_integer(
-                'userref',
-                userref,
-                False
-            )
-        except InvalidRequestParameterException as e:
-            raise InvalidRequestParameterException(e.param_name,
-                                                   e.param_value,
-                                                   'GetOpenOrders')
-
-        return self._request_manager.make_private_request('OpenOrders', data)
+        return self._private_request('GetOpenOrders', trades=trades, userref=userref)
 
     def get_closed_orders(self,
                           trades=None,
@@ -516,7 +696,33 @@ class KrakenSession(object):
                           end=None,
                           ofs=None,
                           closetime=None):
-        raise NotImplementedError()
+        return self._private_request('GetClosedOrders',
+                                     trades=trades,
+                                     userref=userref,
+                                     start=start,
+                                     end=end,
+                                     ofs=ofs,
+                                     closetime=closetime)
+
+    def iter_closed_orders(self,
+                           trades=None,
+                           userref=None,
+                           start=None,
+                           end=None,
+                           closetime=None,
+                           max_workers=DEFAULT_OFFSET_WORKERS):
+        # Yields every closed order matching the filters, one page of
+        # get_closed_orders at a time. Fetching pages concurrently with
+        # max_workers > 1 needs a nonce window on the API key and a session
+        # created with nonce_window=True.
+        return self._iter_offsets(self.get_closed_orders,
+                                  'closed',
+                                  max_workers,
+                                  trades=trades,
+                                  userref=userref,
+                                  start=start,
+                                  end=end,
+                                  closetime=closetime)
 
     def query_orders_info(self, txid, trades=None, userref=None):
         raise NotImplementedError()
@@ -527,7 +733,29 @@ class KrakenSession(object):
                            start=None,
                            end=None,
                            ofs=None):
-        raise NotImplementedError()
+        return self._private_request('GetTradesHistory',
+                                     type=type,
+                                     trades=trades,
+                                     start=start,
+                                     end=end,
+                                     ofs=ofs)
+
+    def iter_trades_history(self,
+                            type=None,
+                            trades=None,
+                            start=None,
+                            end=None,
+                            max_workers=DEFAULT_OFFSET_WORKERS):
+        # Yields every trade in the account history, paging through
+        # get_trades_history. max_workers > 1 only fetches pages concurrently
+        # for a key with a nonce window and a session with nonce_window=True.
+        return self._iter_offsets(self.get_trades_history,
+                                  'trades',
+                                  max_workers,
+                                  type=type,
+                                  trades=trades,
+                                  start=start,
+                                  end=end)
 
     def query_trade_info(self, txid, trades=None):
         raise NotImplementedError()
@@ -542,10 +770,35 @@ class KrakenSession(object):
                          start=None,
                          end=None,
                          ofs=None):
-        raise NotImplementedError()
-
-    def query_ledgers(self, id):
-        raise NotImplementedError()
+        return self._private_request('GetLedgersInfo',
+                                     aclass=aclass,
+                                     asset=asset,
+                                     type=type,
+                                     start=start,
+                                     end=end,
+                                     ofs=ofs)
+
+    def iter_ledgers_info(self,
+                          aclass=None,
+                          asset=None,
+                          type=None,
+                          start=None,
+                          end=None,
+                          max_workers=DEFAULT_OFFSET_WORKERS):
+        # Yields every ledger entry matching the filters, paging through
+        # get_ledgers_info. As with the other offset walks, concurrent pages
+        # (max_workers > 1) need nonce_window=True and a key that allows it.
+        return self._iter_offsets(self.get_ledgers_info,
+                                  'ledger',
+                                  max_workers,
+                                  aclass=aclass,
+                                  asset=asset,
+                                  type=type,
+                                  start=start,
+                                  end=end)
+
+    def query_ledgers(self, id, trades=None):
+        return self._private_request('QueryLedgers', id=id, trades=trades)
 
     def get_trade_volume(self, pair=None, fee_info=None):
         raise NotImplementedError()
@@ -585,16 +838,96 @@ class KrakenSession(object):
                            expiretm=None,
                            userref=None,
                            validate=None):
-        raise NotImplementedError()
+        return self._private_request('AddStandardOrder',
+                                     pair=pair,
+                                     type=type,
+                                     ordertype=ordertype,
+                                     volume=volume,
+                                     price=price,
+                                     price2=price2,
+                                     leverage=leverage,
+                                     oflags=oflags,
+                                     starttm=starttm,
+                                     expiretm=expiretm,
+                                     userref=userref,
+                                     validate=validate)
+
+    def add_order_batch(self, pair, orders, deadline=None, validate=None):
+        # Orders take the add_standard_order arguments other than pair and
+        # validate, and are checked against the same schema
+        if isinstance(orders, (list, tuple)):
+            _reject_order_fields(orders, ('pair', 'validate', 'deadline'))
+            validator = self._validators['AddStandardOrder']
+            orders = [_batch_order_fields(validator(**dict(order, pair=pair)))
+                      for order in orders]
+        return self._private_request('AddOrderBatch',
+                                     pair=pair,
+                                     orders=orders,
+                                     deadline=deadline,
+                                     validate=validate)
+
+    def _submit_order_chunk(self, chunks, index, deadline=None, validate=None):
+        pair, members = chunks[index]
+        if len(members) == 1:
+            position, order = members[0]
+            return self.add_standard_order(pair=pair, validate=validate, **order)
+        return self.add_order_batch(pair,
+                                    [order for position, order in members],
+                                    deadline=deadline,
+                                    validate=validate)
+
+    def add_orders(self,
+                   orders,
+                   deadline=None,
+                   validate=None,
+                   max_workers=DEFAULT_ORDER_BATCH_WORKERS):
+        # Places orders (add_standard_order arguments, pair included) with one
+        # AddOrderBatch per pair and KRAKEN_ADD_ORDER_BATCH_MAX orders. The
+        # batches are only sent in parallel when the session has
+        # nonce_window=True, otherwise they go out one round trip at a time in
+        # nonce order. Returns one {'result', 'error'} per order, in order.
+        _reject_order_fields(orders, ('validate', 'deadline'))
+        chunks = _order_chunks(orders, KRAKEN_ADD_ORDER_BATCH_MAX)
+        submit = functools.partial(self._submit_order_chunk,
+                                   chunks,
+                                   deadline=deadline,
+                                   validate=validate)
+        return self._transform(self._fan_out(submit,
+                                             list(range(len(chunks))),
+                                             max_workers),
+                               functools.partial(_per_order_results,
+                                                 chunks=chunks,
+                                                 count=len(orders)))
 
     def cancel_open_order(self, txid):
-        raise NotImplementedError()
+        return self._private_request('CancelOpenOrder', txid=txid)
+
+    def cancel_order_batch(self, orders):
+        return self._private_request('CancelOrderBatch', orders=orders)
+
+    def _cancel_order_chunk(self, chunks, index):
+        chunk = chunks[index]
+        if len(chunk) == 1:
+            return self.cancel_open_order(chunk[0])
+        return self.cancel_order_batch(chunk)
+
+    def cancel_orders(self, txids, max_workers=DEFAULT_ORDER_BATCH_WORKERS):
+        # Cancels up to KRAKEN_CANCEL_ORDER_BATCH_MAX orders per round trip,
+        # with round trips in parallel only under nonce_window=True. Returns
+        # {'result', 'error'} of each order's batch, keyed by txid.
+        chunks = [list(txids[i:i + KRAKEN_CANCEL_ORDER_BATCH_MAX])
+                  for i in range(0, len(txids), KRAKEN_CANCEL_ORDER_BATCH_MAX)]
+        cancel = functools.partial(self._cancel_order_chunk, chunks)
+        return self._transform(self._fan_out(cancel,
+                                             list(range(len(chunks))),
+                                             max_workers),
+                               functools.partial(_per_cancel_results, chunks=chunks))
 
     def cancel_all_open_orders(self):
         raise NotImplementedError()
 
     def cancel_all_orders_after(self, timeout):
-        raise NotImplementedError()
+        return self._private_request('CancelAllOrdersAfter', timeout=timeout)
 
     """
     Private user funding functions
@@ -626,3 +959,104 @@ class KrakenSession(object):
 
     def get_web_socket_token(self):
         raise NotImplementedError()
+
+
+def _reject_order_fields(orders, names):
+    # Arguments that apply to the whole batch can't be set order by order
+    for order in orders:
+        for name in names:
+            if name in order:
+                raise InvalidRequestParameterException(name,
+                                                       order[name],
+                                                       'AddOrderBatch')
+
+
+def _batch_order_fields(order):
+    # The JSON body of AddOrderBatch takes amounts as decimal strings
+    fields = {}
+    for name, value in order.items():
+        if name == 'pair':
+            continue
+        if name in ('volume', 'price', 'price2', 'leverage'):
+            value = str(value)
+        fields[name] = value
+    return fields
+
+
+def _order_chunks(orders, max_batch):
+    # Groups (position, order) by pair into chunks of at most max_batch
+    by_pair = {}
+    for position, order in enumerate(orders):
+        fields = {name: value for name, value in order.items() if name != 'pair'}
+        by_pair.setdefault(order.get('pair'), []).append((position, fields))
+    return [(pair, members[i:i + max_batch])
+            for pair, members in by_pair.items()
+            for i in range(0, len(members), max_batch)]
+
+
+def _per_order_results(chunk_results, chunks, count):
+    results = [None] * count
+    for index, (pair, members) in enumerate(chunks):
+        if index in chunk_results['error']:
+            error = chunk_results['error'][index]
+            for position, order in members:
+                results[position] = {'result': None, 'error': error}
+            continue
+        result = chunk_results['result'][index]
+        if len(members) == 1:
+            results[members[0][0]] = {'result': result, 'error': None}
+            continue
+        for (position, order), entry in zip(members, result.get('orders', [])):
+            if entry.get('error'):
+                error = KrakenApiErrorException([entry['error']], 'AddOrderBatch')
+                results[position] = {'result': None, 'error': error}
+            else:
+                results[position] = {'result': entry, 'error': None}
+    return results
+
+
+def _per_cancel_results(chunk_results, chunks):
+    results = {}
+    for index, chunk in enumerate(chunks):
+        outcome = {'result': chunk_results['result'].get(index),
+                   'error': chunk_results['error'].get(index)}
+        for txid in chunk:
+            results[txid] = outcome
+    return results
+
+
+def _split_rejected_chunk(chunk, error):
+    # Halves of a chunk that Kraken rejected for an unknown pair, or no halves
+    # once the chunk is a single pair. Other errors are raised as they are.
+    if KRAKEN_UNKNOWN_PAIR_ERROR not in error.errors:
+        raise error
+    pairs = chunk.split(',')
+    if len(pairs) == 1:
+        return []
+    middle = len(pairs) // 2
+    return [','.join(pairs[:middle]), ','.join(pairs[middle:])]
+
+
+def _merge_chunk_parts(parts):
+    result = {}
+    rejected = {}
+    for part_result, part_rejected in parts:
+        result.update(part_result)
+        rejected.update(part_rejected)
+    return result, rejected
+
+
+def _merge_snapshot_chunks(chunk_results, chunks):
+    merged = {}
+    rejected = {}
+    chunk_timings = []
+    for chunk in chunks:
+        timing = {'pairs': chunk.count(',') + 1, 'elapsed': None, 'error': None}
+        if chunk in chunk_results['result']:
+            (result, chunk_rejected), timing['elapsed'] = chunk_results['result'][chunk]
+            merged.update(result)
+            rejected.update(chunk_rejected)
+        else:
+            timing['error'] = chunk_results['error'][chunk]
+        chunk_timings.append(timing)
+    return {'result': merged, 'chunks': chunk_timings, 'rejected': rejected}
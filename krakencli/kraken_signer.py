@@ -0,0 +1,37 @@
+import base64
+import hmac
+from hashlib import sha256, sha512
+
+
+class KrakenRequestSigner(object):
+    """
+    Computes API-Sign headers for private requests.
+
+    The private key is decoded once into a primed HMAC object that is copied
+    for every signature, and the URI path of each endpoint is encoded once
+    and cached.
+    """
+
+    def __init__(self, private_key, uri_prefix):
+        self._private_key = private_key
+        self._uri_prefix = uri_prefix
+        self._hmac = hmac.new(base64.b64decode(private_key), digestmod=sha512)
+        self._uri_paths = {}
+
+    @property
+    def private_key(self):
+        return self._private_key
+
+    def uri_path(self, endpoint):
+        try:
+            return self._uri_paths[endpoint]
+        except KeyError:
+            path = f"{self._uri_prefix}{endpoint}".encode()
+            self._uri_paths[endpoint] = path
+            return path
+
+    def sign(self, endpoint, nonce, encoded_post_data):
+        h = self._hmac.copy()
+        h.update(self.uri_path(endpoint))
+        h.update(sha256((str(nonce) + encoded_post_data).encode()).digest())
+        return base64.b64encode(h.digest()).decode()
@@ -0,0 +1,229 @@
+import threading
+import time
+
+# Each power of two range of microseconds is split into 2**SUB_BUCKET_BITS
+# linear buckets, so recorded values are within about 3% of the true value
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+SNAPSHOT_PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p999', 0.999))
+DEFAULT_PROMETHEUS_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+DEFAULT_PROMETHEUS_PREFIX = "krakencli"
+
+
+def bucket_index(micros):
+    shift = max(0, micros.bit_length() - SUB_BUCKET_BITS - 1)
+    return shift * SUB_BUCKET_COUNT + (micros >> shift)
+
+
+def bucket_bounds(index):
+    # (lowest, highest + 1) microseconds counted by a bucket
+    if index < 2 * SUB_BUCKET_COUNT:
+        return index, index + 1
+    shift = index // SUB_BUCKET_COUNT - 1
+    mantissa = index - shift * SUB_BUCKET_COUNT
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class LatencyHistogram(object):
+    """
+    HDR style histogram of durations with log-linear microsecond buckets.
+
+    Recording is a bit_length and a dict increment, and memory grows with
+    the number of distinct buckets hit rather than the range covered.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        index = bucket_index(max(0, int(seconds * 1e6)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, quantile):
+        if not self.count:
+            return None
+        rank = quantile * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_bounds(index)[1] / 1e6, self.max)
+        return self.max
+
+    def count_at_or_below(self, seconds):
+        limit = seconds * 1e6
+        return sum(count for index, count in self.counts.items()
+                   if bucket_bounds(index)[1] <= limit)
+
+    def summary(self):
+        summary = {'count': self.count, 'sum': self.total,
+                   'min': self.min, 'max': self.max}
+        for name, quantile in SNAPSHOT_PERCENTILES:
+            summary[name] = self.percentile(quantile)
+        return summary
+
+
+class _NullRequestTimer(object):
+
+    __slots__ = ()
+
+    def mark(self, phase):
+        pass
+
+    def response(self, response, sent_bytes=0):
+        pass
+
+    def error(self, exception):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_REQUEST_TIMER = _NullRequestTimer()
+
+
+class RequestTimer(object):
+    """
+    Times the phases of one request. mark(phase) records the time since the
+    previous mark (or the start) under phase.
+    """
+
+    __slots__ = ('_metrics', '_endpoint', '_clock', '_start', '_last')
+
+    def __init__(self, metrics, endpoint, clock):
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._clock = clock
+        self._start = self._last = clock()
+
+    def mark(self, phase):
+        now = self._clock()
+        self._metrics.record(self._endpoint, phase, now - self._last)
+        self._last = now
+
+    def response(self, response, sent_bytes=0):
+        # requests reports the time until the response headers were parsed,
+        # which covers connecting and the server's processing time
+        self.mark('http')
+        elapsed = getattr(response, 'elapsed', None)
+        if elapsed is not None:
+            self._metrics.record(self._endpoint,
+                                 'http_headers',
+                                 elapsed.total_seconds())
+        self._metrics.add_bytes(self._endpoint, sent_bytes, len(response.content))
+
+    def error(self, exception):
+        self._metrics.add_error(self._endpoint, type(exception).__name__)
+
+    def finish(self):
+        self._metrics.record(self._endpoint, 'total', self._clock() - self._start)
+
+
+class KrakenMetrics(object):
+    """
+    Per endpoint and per phase request latency histograms, with byte and
+    error counts.
+
+    Pass one to a KrakenSession as metrics= to enable it. Without one, the
+    request path only makes no-op calls.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._bytes = {}
+        self._errors = {}
+
+    def timer(self, endpoint):
+        return RequestTimer(self, endpoint, self._clock)
+
+    def record(self, endpoint, phase, seconds):
+        key = (endpoint, phase)
+        with self._lock:
+            histogram = self._latencies.get(key)
+            if histogram is None:
+                histogram = self._latencies[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def add_bytes(self, endpoint, sent, received):
+        with self._lock:
+            counts = self._bytes.setdefault(endpoint, [0, 0])
+            counts[0] += sent
+            counts[1] += received
+
+    def add_error(self, endpoint, kind):
+        key = (endpoint, kind)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def histogram(self, endpoint, phase):
+        return self._latencies.get((endpoint, phase))
+
+    def reset(self):
+        with self._lock:
+            self._latencies = {}
+            self._bytes = {}
+            self._errors = {}
+
+    def snapshot(self):
+        with self._lock:
+            latency = {}
+            for (endpoint, phase), histogram in self._latencies.items():
+                latency.setdefault(endpoint, {})[phase] = histogram.summary()
+            transferred = {endpoint: {'sent': sent, 'received': received}
+                           for endpoint, (sent, received) in self._bytes.items()}
+            errors = {}
+            for (endpoint, kind), count in self._errors.items():
+                errors.setdefault(endpoint, {})[kind] = count
+        return {'latency': latency, 'bytes': transferred, 'errors': errors}
+
+    def to_prometheus(self,
+                      prefix=DEFAULT_PROMETHEUS_PREFIX,
+                      buckets=DEFAULT_PROMETHEUS_BUCKETS):
+        duration = f"{prefix}_request_duration_seconds"
+        lines = [f"# HELP {duration} Kraken API request latency by phase.",
+                 f"# TYPE {duration} histogram"]
+        with self._lock:
+            for (endpoint, phase), histogram in sorted(self._latencies.items()):
+                labels = f'endpoint="{endpoint}",phase="{phase}"'
+                for le in buckets:
+                    lines.append(f'{duration}_bucket{{{labels},le="{le}"}} '
+                                 f'{histogram.count_at_or_below(le)}')
+                lines.append(f'{duration}_bucket{{{labels},le="+Inf"}} '
+                             f'{histogram.count}')
+                lines.append(f'{duration}_sum{{{labels}}} {histogram.total}')
+                lines.append(f'{duration}_count{{{labels}}} {histogram.count}')
+
+            transferred = f"{prefix}_request_bytes_total"
+            lines.append(f"# HELP {transferred} Kraken API request bytes.")
+            lines.append(f"# TYPE {transferred} counter")
+            for endpoint, (sent, received) in sorted(self._bytes.items()):
+                lines.append(f'{transferred}{{endpoint="{endpoint}",direction="sent"}} '
+                             f'{sent}')
+                lines.append(f'{transferred}{{endpoint="{endpoint}",'
+                             f'direction="received"}} {received}')
+
+            errors = f"{prefix}_request_errors_total"
+            lines.append(f"# HELP {errors} Kraken API request errors.")
+            lines.append(f"# TYPE {errors} counter")
+            for (endpoint, kind), count in sorted(self._errors.items()):
+                lines.append(f'{errors}{{endpoint="{endpoint}",error="{kind}"}} '
+                             f'{count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,134 @@
+import zlib
+from sortedcontainers import SortedDict
+from .exceptions import InvalidOrderBookChecksumException
+
+ORDER_BOOK_CHECKSUM_DEPTH = 10
+
+
+def _checksum_field(value):
+    return value.replace('.', '').lstrip('0')
+
+
+class OrderBookSide(object):
+    """
+    One side of an order book, kept in a SortedDict ordered best first.
+
+    Prices are keyed by their float value (negated for bids so both sides
+    sort ascending), which gives O(log n) level updates and O(1) lookups of
+    a price and of the best level. The original price and volume strings
+    are kept for checksums.
+    """
+
+    __slots__ = ('_sign', '_levels')
+
+    def __init__(self, descending):
+        self._sign = -1.0 if descending else 1.0
+        # key -> (price, volume, timestamp)
+        self._levels = SortedDict()
+
+    def __len__(self):
+        return len(self._levels)
+
+    def _key(self, price):
+        return self._sign * float(price)
+
+    def best(self):
+        if not self._levels:
+            return None
+        return self._levels.peekitem(0)[1]
+
+    def get(self, price):
+        return self._levels.get(self._key(price))
+
+    def update(self, price, volume, timestamp):
+        # Sets a single level, a zero volume removes it. Returns True if the
+        # book changed.
+        key = self._key(price)
+        level = self._levels.get(key)
+        if float(volume) == 0:
+            if level is not None:
+                del self._levels[key]
+                return True
+            return False
+        if level is not None and level[1] == volume and level[2] == timestamp:
+            return False
+        self._levels[key] = (price, volume, timestamp)
+        return True
+
+    def apply_snapshot(self, levels):
+        # Applies a full snapshot as a diff, only touching levels that were
+        # added, changed or removed. Returns the number of changed levels.
+        snapshot = {self._key(price): (price, volume, timestamp)
+                    for price, volume, timestamp in levels}
+        changed = 0
+        for price in [level[0] for key, level in self._levels.items()
+                      if key not in snapshot]:
+            changed += self.update(price, "0", None)
+        for price, volume, timestamp in snapshot.values():
+            changed += self.update(price, volume, timestamp)
+        return changed
+
+    def levels(self, depth=None):
+        return list(self._levels.values()[:depth])
+
+
+class OrderBook(object):
+    """
+    Local order book maintained from successive Depth snapshots.
+    """
+
+    __slots__ = ('pair', 'asks', 'bids')
+
+    def __init__(self, pair=None):
+        self.pair = pair
+        self.asks = OrderBookSide(descending=False)
+        self.bids = OrderBookSide(descending=True)
+
+    def apply_snapshot(self, order_book):
+        # Accepts either the result of get_order_book or a single pair's
+        # {'asks': ..., 'bids': ...} entry from it.
+        if 'asks' not in order_book:
+            if self.pair is not None and self.pair in order_book:
+                order_book = order_book[self.pair]
+            else:
+                [order_book] = order_book.values()
+        changed = self.asks.apply_snapshot(order_book['asks'])
+        changed += self.bids.apply_snapshot(order_book['bids'])
+        return changed
+
+    @property
+    def best_ask(self):
+        return self.asks.best()
+
+    @property
+    def best_bid(self):
+        return self.bids.best()
+
+    @property
+    def spread(self):
+        if not self.asks or not self.bids:
+            return None
+        return float(self.asks.best()[0]) - float(self.bids.best()[0])
+
+    @property
+    def mid_price(self):
+        if not self.asks or not self.bids:
+            return None
+        return (float(self.asks.best()[0]) + float(self.bids.best()[0])) / 2
+
+    def checksum(self):
+        # Kraken's book checksum: CRC32 over the top ten asks then the top ten
+        # bids, each as price and volume with the decimal point and leading
+        # zeros removed.
+        fields = []
+        for side in (self.asks, self.bids):
+            for price, volume, timestamp in side.levels(ORDER_BOOK_CHECKSUM_DEPTH):
+                fields.append(_checksum_field(price))
+                fields.append(_checksum_field(volume))
+        return zlib.crc32(''.join(fields).encode()) & 0xffffffff
+
+    def verify_checksum(self, expected):
+        actual = self.checksum()
+        if actual != int(expected):
+            raise InvalidOrderBookChecksumException(self.pair, expected, actual)
+        return actual
@@ -0,0 +1,56 @@
+def split_page(result):
+    # A page of market data has one list of rows, keyed by the pair name Kraken
+    # uses (which may differ from the requested one), and the 'last' cursor.
+    rows = []
+    for key, value in result.items():
+        if key != 'last':
+            rows = value
+            break
+    return rows, result.get('last')
+
+
+def page_window(result, since, end, time_index):
+    """
+    Returns (rows, next_since, done) for one page of a cursor walk.
+
+    Rows at or after end are dropped, and the walk is done once a page is
+    empty, reaches end, or the cursor stops advancing.
+    """
+    rows, last = split_page(result)
+    next_since = None if last is None else int(last)
+    done = not rows or next_since is None or next_since == since
+
+    if end is not None:
+        for i, row in enumerate(rows):
+            if float(row[time_index]) >= end:
+                return rows[:i], next_since, True
+
+    return rows, next_since, done
+
+
+# Rows per page of the offset paginated private endpoints (ClosedOrders,
+# TradesHistory, Ledgers)
+KRAKEN_OFFSET_PAGE_SIZE = 50
+
+
+def split_offset_page(result, result_key):
+    # Returns ([(id, row), ...], count) for one page of an offset walk
+    return list(result.get(result_key, {}).items()), int(result.get('count', 0))
+
+
+def page_offsets(count, page_size=KRAKEN_OFFSET_PAGE_SIZE):
+    # Offsets of the pages after the first one
+    return range(page_size, count, page_size)
+
+
+def unseen_rows(rows, seen):
+    """
+    Yields the rows whose id has not been seen yet.
+
+    Pages are fetched concurrently by offset, and rows added to the account
+    during the walk shift later pages, so a row can appear on two pages.
+    """
+    for row_id, row in rows:
+        if row_id not in seen:
+            seen.add(row_id)
+            yield row_id, row
@@ -0,0 +1,71 @@
+import threading
+import time
+from .exceptions import InvalidRateLimitTierException
+from .kraken_api_values import (
+    KRAKEN_RATE_LIMIT_TIERS,
+    KRAKEN_ENDPOINT_CALL_COSTS
+)
+
+DEFAULT_KRAKEN_RATE_LIMIT_TIER = "starter"
+
+
+class KrakenRateLimiter(object):
+    """
+    Client side model of Kraken's decaying API call counter.
+
+    acquire() blocks until the endpoint's cost fits under the tier's maximum
+    counter, so callers are paced instead of being rejected by the exchange.
+    Waiting callers hold the limiter's lock, which serializes them in
+    roughly the order they arrived.
+    """
+
+    def __init__(self,
+                 tier=DEFAULT_KRAKEN_RATE_LIMIT_TIER,
+                 max_counter=None,
+                 decay_rate=None,
+                 endpoint_costs=None,
+                 clock=time.monotonic,
+                 sleep=time.sleep):
+        if tier not in KRAKEN_RATE_LIMIT_TIERS:
+            raise InvalidRateLimitTierException(tier)
+        tier_max_counter, tier_decay_rate = KRAKEN_RATE_LIMIT_TIERS[tier]
+        self._max_counter = tier_max_counter if max_counter is None else max_counter
+        self._decay_rate = tier_decay_rate if decay_rate is None else decay_rate
+        self._endpoint_costs = dict(KRAKEN_ENDPOINT_CALL_COSTS)
+        if endpoint_costs is not None:
+            self._endpoint_costs.update(endpoint_costs)
+        self._clock = clock
+        self._sleep = sleep
+        self._counter = 0.0
+        self._last_update = clock()
+        self._lock = threading.Lock()
+
+    def _decay(self, now):
+        elapsed = now - self._last_update
+        self._counter = max(0.0, self._counter - elapsed * self._decay_rate)
+        self._last_update = now
+
+    def cost(self, endpoint):
+        return self._endpoint_costs.get(endpoint, 1)
+
+    @property
+    def counter(self):
+        with self._lock:
+            self._decay(self._clock())
+            return self._counter
+
+    def acquire(self, endpoint):
+        cost = self.cost(endpoint)
+        if cost <= 0:
+            return 0.0
+
+        with self._lock:
+            self._decay(self._clock())
+            wait = (self._counter + cost - self._max_counter) / self._decay_rate
+            if wait > 0:
+                self._sleep(wait)
+                self._decay(self._clock())
+            else:
+                wait = 0.0
+            self._counter += cost
+            return wait
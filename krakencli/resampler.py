@@ -0,0 +1,188 @@
+from bisect import bisect_left
+from . import columnar
+from .columnar import make_column
+
+INTERVAL_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+    'w': 7 * 24 * 60 * 60,
+}
+
+OHLC_FIELDS = ('time', 'open', 'high', 'low', 'close', 'vwap', 'volume', 'count')
+
+
+def parse_interval(interval):
+    """
+    Returns an interval in seconds. Integers are minutes, as for
+    get_ohlc_data, and strings such as '3m', '2h' or '1d' carry their unit.
+    """
+    if isinstance(interval, int):
+        return interval * 60
+    return int(interval[:-1]) * INTERVAL_UNITS[interval[-1]]
+
+
+def _concatenate(first, second):
+    if columnar.np is not None:
+        return columnar.np.concatenate((first, second))
+    return first + second
+
+
+def _buckets(times, seconds):
+    if columnar.np is not None:
+        times = columnar.np.asarray(times).astype('int64')
+        return times - times % seconds
+    return [int(t) - int(t) % seconds for t in times]
+
+
+def _group_starts(buckets):
+    np = columnar.np
+    if np is not None:
+        if len(buckets) == 0:
+            return []
+        return np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    return [i for i in range(len(buckets)) if i == 0 or buckets[i] != buckets[i - 1]]
+
+
+def _aggregate(bucket_times, starts, opens, highs, lows, closes, volumes,
+               notionals, counts):
+    np = columnar.np
+    if np is not None:
+        ends = np.append(starts[1:], len(opens)) - 1
+        volume = np.add.reduceat(volumes, starts)
+        close = closes[ends]
+        notional = np.add.reduceat(notionals, starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = np.where(volume > 0, notional / volume, close)
+        return {
+            'time': bucket_times[starts],
+            'open': opens[starts],
+            'high': np.maximum.reduceat(highs, starts),
+            'low': np.minimum.reduceat(lows, starts),
+            'close': close,
+            'vwap': vwap,
+            'volume': volume,
+            'count': np.add.reduceat(counts, starts).astype('int32'),
+        }
+
+    bars = {field: [] for field in OHLC_FIELDS}
+    bounds = list(starts) + [len(opens)]
+    for start, end in zip(bounds, bounds[1:]):
+        volume = sum(volumes[start:end])
+        notional = sum(notionals[start:end])
+        bars['time'].append(bucket_times[start])
+        bars['open'].append(opens[start])
+        bars['high'].append(max(highs[start:end]))
+        bars['low'].append(min(lows[start:end]))
+        bars['close'].append(closes[end - 1])
+        bars['vwap'].append(notional / volume if volume > 0 else closes[end - 1])
+        bars['volume'].append(volume)
+        bars['count'].append(sum(counts[start:end]))
+    typecodes = {'time': 'q', 'count': 'i'}
+    return {field: make_column(typecodes.get(field, 'd'), values)
+            for field, values in bars.items()}
+
+
+def _notionals(prices, volumes):
+    if columnar.np is not None:
+        return prices * volumes
+    return [p * v for p, v in zip(prices, volumes)]
+
+
+def resample_ohlc(ohlc, interval):
+    """
+    Aggregates columnar OHLC bars, such as get_ohlc_data(as_array=True)
+    pages, into bars of a larger interval. Bars must be in time order.
+    """
+    seconds = parse_interval(interval)
+    bucket_times = _buckets(ohlc['time'], seconds)
+    starts = _group_starts(bucket_times)
+    if len(starts) == 0:
+        return _empty_bars()
+    return _aggregate(bucket_times,
+                      starts,
+                      ohlc['open'],
+                      ohlc['high'],
+                      ohlc['low'],
+                      ohlc['close'],
+                      ohlc['volume'],
+                      _notionals(ohlc['vwap'], ohlc['volume']),
+                      ohlc['count'])
+
+
+def resample_trades(trades, interval):
+    """
+    Builds OHLC bars from columnar trades, such as
+    get_recent_trades(as_array=True) pages. Trades must be in time order.
+    """
+    seconds = parse_interval(interval)
+    bucket_times = _buckets(trades['time'], seconds)
+    starts = _group_starts(bucket_times)
+    if len(starts) == 0:
+        return _empty_bars()
+    prices = trades['price']
+    if columnar.np is not None:
+        counts = columnar.np.ones(len(prices), dtype='int64')
+    else:
+        counts = [1] * len(prices)
+    return _aggregate(bucket_times,
+                      starts,
+                      prices,
+                      prices,
+                      prices,
+                      prices,
+                      trades['volume'],
+                      _notionals(prices, trades['volume']),
+                      counts)
+
+
+def _empty_bars():
+    typecodes = {'time': 'q', 'count': 'i'}
+    return {field: make_column(typecodes.get(field, 'd'), ()) for field in OHLC_FIELDS}
+
+
+class OHLCResampler(object):
+    """
+    Incrementally resamples a stream of 1 minute bars or trades.
+
+    update() returns the bars completed by the new input. The rows of the
+    newest, still open bucket are held back until a later row starts the next
+    bucket; current() returns that partial bar. A revised copy of an input
+    bar that was already seen replaces it.
+    """
+
+    def __init__(self, interval, source='ohlc'):
+        self._seconds = parse_interval(interval)
+        self._resample = resample_trades if source == 'trades' else resample_ohlc
+        self._source = source
+        self._pending = None
+
+    def _merge_pending(self, columns):
+        if self._pending is None or len(self._pending['time']) == 0:
+            return columns
+        if len(columns['time']) == 0:
+            return self._pending
+        if self._source == 'trades':
+            keep = len(self._pending['time'])
+        else:
+            keep = bisect_left(self._pending['time'], columns['time'][0])
+        return {name: _concatenate(self._pending[name][:keep], columns[name])
+                for name in columns}
+
+    def update(self, columns):
+        merged = self._merge_pending(columns)
+        times = merged['time']
+        if len(times) == 0:
+            return _empty_bars()
+        open_bucket = int(times[-1]) - int(times[-1]) % self._seconds
+        split = bisect_left(times, open_bucket)
+        self._pending = {name: values[split:] for name, values in merged.items()}
+        return self._resample({name: values[:split] for name, values in merged.items()},
+                              f"{self._seconds}s")
+
+    def current(self):
+        if self._pending is None or len(self._pending['time']) == 0:
+            return None
+        bars = self._resample(self._pending, f"{self._seconds}s")
+        return {name: values[0] for name, values in bars.items()}
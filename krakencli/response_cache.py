@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a cached result stays valid, endpoints not listed are never cached
+DEFAULT_RESPONSE_CACHE_TTLS = {
+    "Time": 1,
+    "SystemStatus": 30,
+    "Assets": 3600,
+    "AssetPairs": 3600,
+}
+DEFAULT_RESPONSE_CACHE_MAXSIZE = 256
+
+
+class KrakenResponseCache(object):
+    """
+    LRU cache of public request results with a time to live per endpoint.
+
+    Entries are keyed by endpoint and the request data with unset (None)
+    parameters dropped and the rest sorted, so equivalent requests share an
+    entry. Cached results are shared between callers and should be treated
+    as read-only.
+    """
+
+    def __init__(self,
+                 ttls=None,
+                 maxsize=DEFAULT_RESPONSE_CACHE_MAXSIZE,
+                 clock=time.monotonic):
+        self._ttls = dict(DEFAULT_RESPONSE_CACHE_TTLS if ttls is None else ttls)
+        self._maxsize = maxsize
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(endpoint, request_data):
+        return (endpoint, tuple(sorted((key, value)
+                                       for key, value in request_data.items()
+                                       if value is not None)))
+
+    def is_cacheable(self, endpoint):
+        return endpoint in self._ttls
+
+    def get(self, endpoint, request_data):
+        if endpoint not in self._ttls:
+            return None
+        key = self.make_key(endpoint, request_data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, endpoint, request_data, result):
+        ttl = self._ttls.get(endpoint)
+        if ttl is None:
+            return
+        key = self.make_key(endpoint, request_data)
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint=None):
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == endpoint]:
+                    del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self._maxsize,
+            }
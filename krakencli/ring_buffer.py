@@ -0,0 +1,200 @@
+import array
+import time
+from . import columnar
+from .columnar import NUMPY_DTYPES
+from .pagination import split_page
+
+
+def _zeros(typecode, capacity):
+    if columnar.np is not None:
+        return columnar.np.zeros(capacity, dtype=NUMPY_DTYPES[typecode])
+    return array.array(typecode, [0]) * capacity
+
+
+class RingBuffer(object):
+    """
+    Fixed-capacity columnar buffer that overwrites its oldest rows.
+
+    Columns are preallocated NumPy arrays (array.array without NumPy), so
+    memory use is constant no matter how many rows are appended. Columns
+    are returned oldest first.
+    """
+
+    __slots__ = ('_capacity', '_names', '_columns', '_size', '_head')
+
+    def __init__(self, capacity, columns):
+        self._capacity = capacity
+        self._names = tuple(name for name, typecode in columns)
+        self._columns = tuple(_zeros(typecode, capacity) for name, typecode in columns)
+        self._size = 0
+        self._head = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def append(self, *values):
+        head = self._head
+        for column, value in zip(self._columns, values):
+            column[head] = value
+        self._head = (head + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def clear(self):
+        self._size = 0
+        self._head = 0
+
+    def column(self, name):
+        column = self._columns[self._names.index(name)]
+        if self._size < self._capacity:
+            return column[:self._size]
+        if columnar.np is not None:
+            return columnar.np.concatenate((column[self._head:], column[:self._head]))
+        return column[self._head:] + column[:self._head]
+
+    def last(self, name):
+        if self._size == 0:
+            return None
+        return self._columns[self._names.index(name)][self._head - 1]
+
+    def mean(self, name):
+        return _mean(self.column(name))
+
+    def _filled(self, name):
+        # The occupied slots in storage order, for stats that ignore order
+        return self._columns[self._names.index(name)][:self._size]
+
+    def max(self, name):
+        return _max(self._filled(name))
+
+    def min(self, name):
+        return _min(self._filled(name))
+
+    def time_weighted_mean(self, name, now=None):
+        return _time_weighted_mean(self.column('time'), self.column(name), now)
+
+
+class BidAskRingBuffer(RingBuffer):
+
+    __slots__ = ()
+
+    def spreads(self):
+        return _subtract(self.column('ask'), self.column('bid'))
+
+    def mean_spread(self):
+        return _mean(self.spreads())
+
+    def max_spread(self):
+        return _max(_subtract(self._filled('ask'), self._filled('bid')))
+
+    def min_spread(self):
+        return _min(_subtract(self._filled('ask'), self._filled('bid')))
+
+    def time_weighted_spread(self, now=None):
+        # Each sample's spread is weighted by how long it held, the newest
+        # sample holds until now (or carries no weight if now is not given).
+        return _time_weighted_mean(self.column('time'), self.spreads(), now)
+
+
+class SpreadRingBuffer(BidAskRingBuffer):
+    """
+    Rolling window of get_recent_spread_data samples for one pair.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, capacity):
+        super().__init__(capacity, (('time', 'q'), ('bid', 'd'), ('ask', 'd')))
+
+    def ingest(self, spread_data):
+        # Pages from successive polls overlap, only samples newer than the
+        # newest one held are added.
+        rows, last = split_page(spread_data)
+        newest = self.last('time')
+        added = 0
+        for spread_time, bid, ask in rows:
+            if newest is None or spread_time > newest:
+                self.append(spread_time, float(bid), float(ask))
+                added += 1
+        return added
+
+
+class TickerRingBuffer(BidAskRingBuffer):
+    """
+    Rolling window of get_ticker_information samples for one pair.
+    """
+
+    __slots__ = ('pair',)
+
+    def __init__(self, capacity, pair=None):
+        super().__init__(capacity, (('time', 'd'),
+                                    ('ask', 'd'),
+                                    ('bid', 'd'),
+                                    ('last', 'd'),
+                                    ('volume', 'd')))
+        self.pair = pair
+
+    def ingest(self, ticker_information, timestamp=None):
+        # The ticker has no timestamp of its own, so samples are stamped with
+        # the local time they were ingested unless one is given.
+        if self.pair is not None and self.pair in ticker_information:
+            ticker = ticker_information[self.pair]
+        else:
+            [ticker] = ticker_information.values()
+        self.append(time.time() if timestamp is None else timestamp,
+                    float(ticker['a'][0]),
+                    float(ticker['b'][0]),
+                    float(ticker['c'][0]),
+                    float(ticker['v'][0]))
+        return 1
+
+
+def _subtract(left, right):
+    if columnar.np is not None:
+        return left - right
+    return array.array('d', [a - b for a, b in zip(left, right)])
+
+
+def _mean(values):
+    if len(values) == 0:
+        return None
+    if columnar.np is not None:
+        return float(values.mean())
+    return sum(values) / len(values)
+
+
+def _max(values):
+    if len(values) == 0:
+        return None
+    if columnar.np is not None:
+        return values.max().item()
+    return max(values)
+
+
+def _min(values):
+    if len(values) == 0:
+        return None
+    if columnar.np is not None:
+        return values.min().item()
+    return min(values)
+
+
+def _time_weighted_mean(times, values, now=None):
+    if len(values) == 0:
+        return None
+    end = times[-1] if now is None else now
+    if columnar.np is not None:
+        durations = columnar.np.diff(times.astype('float64'), append=end)
+        total = durations.sum()
+        if total <= 0:
+            return float(values[-1])
+        return float((values * durations).sum() / total)
+    durations = [b - a for a, b in zip(times, list(times[1:]) + [end])]
+    total = sum(durations)
+    if total <= 0:
+        return values[-1]
+    return sum(v * d for v, d in zip(values, durations)) / total
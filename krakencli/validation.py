@@ -0,0 +1,350 @@
+import abc
+from .exceptions import (
+    MissingRequiredParameterException,
+    InvalidRequestParameterException,
+    InvalidRequestParameterOptionsException,
+    InvalidTimestampException,
+)
+from .kraken_api_values import (
+    KRAKEN_ASSETS,
+    KRAKEN_ASSET_PAIRS,
+    KRAKEN_ADD_ORDER_BATCH_MAX,
+    KRAKEN_CANCEL_ORDER_BATCH_MAX
+)
+
+
+class Parameter(abc.ABC):
+
+    def __init__(self, name, required=False):
+        self.name = name
+        self.required = required
+
+    @abc.abstractmethod
+    def compile(self, request_type, option_sources):
+        # Returns check(value), which returns the value to send or raises
+        pass
+
+
+class OptionsParameter(Parameter):
+
+    def __init__(self, name, valid_options, required=False):
+        super().__init__(name, required)
+        self.valid_options = valid_options
+
+    def resolve_options(self, option_sources):
+        # A string names a source of options, so lists that change at runtime
+        # (see asset_registry) can be swapped in when the schemas are compiled
+        valid_options = self.valid_options
+        if isinstance(valid_options, str):
+            valid_options = option_sources[valid_options]
+        if isinstance(valid_options, (list, tuple)):
+            return valid_options, frozenset(valid_options)
+        return valid_options, valid_options
+
+    def compile(self, request_type, option_sources):
+        name = self.name
+        valid_options, option_index = self.resolve_options(option_sources)
+
+        def check(value):
+            try:
+                if value in option_index:
+                    return value
+            except TypeError:
+                pass
+            raise InvalidRequestParameterOptionsException(name,
+                                                          value,
+                                                          valid_options,
+                                                          request_type)
+
+        return check
+
+
+class CommaDelimitedParameter(OptionsParameter):
+
+    def compile(self, request_type, option_sources):
+        name = self.name
+        valid_options, option_index = self.resolve_options(option_sources)
+
+        def check(value):
+            if isinstance(value, str) and all(option in option_index
+                                              for option in value.split(',')):
+                return value
+            raise InvalidRequestParameterOptionsException(name,
+                                                          value,
+                                                          valid_options,
+                                                          request_type)
+
+        return check
+
+
+class TimestampParameter(Parameter):
+
+    def compile(self, request_type, option_sources):
+        name = self.name
+
+        def check(value):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            raise InvalidTimestampException(name, value, request_type)
+
+        return check
+
+
+class TypedParameter(Parameter):
+
+    value_type = object
+    # bool is a subclass of int, so numeric parameters have to rule it out
+    excluded_type = ()
+
+    def compile(self, request_type, option_sources):
+        name = self.name
+        value_type = self.value_type
+        excluded_type = self.excluded_type
+
+        def check(value):
+            if isinstance(value, value_type) and not isinstance(value,
+                                                                excluded_type):
+                return value
+            raise InvalidRequestParameterException(name, value, request_type)
+
+        return check
+
+
+class IntegerParameter(TypedParameter):
+
+    value_type = int
+    excluded_type = bool
+
+
+class BooleanParameter(TypedParameter):
+
+    value_type = bool
+
+
+class StringParameter(TypedParameter):
+
+    value_type = str
+
+
+class DecimalParameter(TypedParameter):
+
+    value_type = (str, int, float)
+    excluded_type = bool
+
+
+class OrderTimeParameter(TypedParameter):
+
+    # Unix timestamps or "+<seconds>" offsets
+    value_type = (str, int)
+    excluded_type = bool
+
+
+class OrderIdParameter(TypedParameter):
+
+    # Transaction ids or user reference ids
+    value_type = (str, int)
+    excluded_type = bool
+
+
+class ListParameter(Parameter):
+
+    def __init__(self, name, max_length, required=False):
+        super().__init__(name, required)
+        self.max_length = max_length
+
+    def compile(self, request_type, option_sources):
+        name = self.name
+        max_length = self.max_length
+
+        def check(value):
+            if isinstance(value, (list, tuple)) and 0 < len(value) <= max_length:
+                return list(value)
+            raise InvalidRequestParameterException(name, value, request_type)
+
+        return check
+
+
+class RequestValidator(object):
+    """
+    Validator compiled from a request schema.
+
+    Calling it with the user's keyword arguments returns the request data to
+    send, leaving out parameters that were not given.
+    """
+
+    def __init__(self, request_type, endpoint, parameters, option_sources=None):
+        if option_sources is None:
+            option_sources = DEFAULT_OPTION_SOURCES
+        self.request_type = request_type
+        self.endpoint = endpoint
+        self.parameters = parameters
+        self._checks = tuple((p.name,
+                              p.required,
+                              p.compile(request_type, option_sources))
+                             for p in parameters)
+
+    def __call__(self, **kwargs):
+        data = {}
+        for name, required, check in self._checks:
+            value = kwargs.get(name)
+            if value is None:
+                if required:
+                    raise MissingRequiredParameterException(name,
+                                                            self.request_type)
+            else:
+                data[name] = check(value)
+        return data
+
+
+VALID_ASSET_INFO_OPTIONS = ['info']
+VALID_ASSET_PAIRS_INFO_OPTIONS = ['info', 'leverage', 'fees', 'margin']
+VALID_ACLASS_OPTIONS = ['currency']
+VALID_OHLC_INTERVALS = [1, 5, 15, 30, 60, 240, 1440, 10080, 21600]
+VALID_ORDER_SIDES = ['buy', 'sell']
+VALID_ORDER_TYPES = [
+    'market',
+    'limit',
+    'stop-loss',
+    'take-profit',
+    'stop-loss-limit',
+    'take-profit-limit',
+    'settle-position',
+]
+VALID_ORDER_FLAGS = ['post', 'fcib', 'fciq', 'nompp', 'viqc']
+VALID_CLOSETIME_OPTIONS = ['open', 'close', 'both']
+VALID_TRADE_HISTORY_TYPES = [
+    'all',
+    'any position',
+    'closed position',
+    'closing position',
+    'no position',
+]
+VALID_LEDGER_TYPES = [
+    'all',
+    'deposit',
+    'withdrawal',
+    'trade',
+    'margin',
+    'rollover',
+    'credit',
+    'transfer',
+    'settled',
+    'staking',
+    'sale',
+]
+
+# option source name -> valid options, overridable per compile_schemas call
+DEFAULT_OPTION_SOURCES = {
+    'asset_pairs': KRAKEN_ASSET_PAIRS,
+    'assets': KRAKEN_ASSETS,
+}
+
+# request type -> (endpoint, parameters)
+KRAKEN_REQUEST_SCHEMAS = {
+    'GetServerTime': ('Time', []),
+    'GetSystemStatus': ('SystemStatus', []),
+    'GetAssetInfo': ('Assets', [
+        OptionsParameter('info', VALID_ASSET_INFO_OPTIONS),
+        OptionsParameter('aclass', VALID_ACLASS_OPTIONS),
+    ]),
+    'GetTradableAssetPairs': ('AssetPairs', [
+        OptionsParameter('info', VALID_ASSET_PAIRS_INFO_OPTIONS),
+        CommaDelimitedParameter('pair', 'asset_pairs'),
+    ]),
+    'GetTickerInformation': ('Ticker', [
+        CommaDelimitedParameter('pair', 'asset_pairs', required=True),
+    ]),
+    'GetOHLCData': ('OHLC', [
+        OptionsParameter('pair', 'asset_pairs', required=True),
+        OptionsParameter('interval', VALID_OHLC_INTERVALS),
+        TimestampParameter('since'),
+    ]),
+    'GetOrderBook': ('Depth', [
+        OptionsParameter('pair', 'asset_pairs', required=True),
+        IntegerParameter('count'),
+    ]),
+    'GetRecentTrades': ('Trades', [
+        OptionsParameter('pair', 'asset_pairs', required=True),
+        TimestampParameter('since'),
+    ]),
+    'GetRecentSpreadData': ('Spread', [
+        OptionsParameter('pair', 'asset_pairs', required=True),
+        TimestampParameter('since'),
+    ]),
+    'GetAccountBalance': ('Balance', []),
+    'GetTradeBalance': ('TradeBalance', [
+        OptionsParameter('aclass', VALID_ACLASS_OPTIONS),
+        OptionsParameter('asset', 'assets'),
+    ]),
+    'GetOpenOrders': ('OpenOrders', [
+        BooleanParameter('trades'),
+        IntegerParameter('userref'),
+    ]),
+    'GetClosedOrders': ('ClosedOrders', [
+        BooleanParameter('trades'),
+        IntegerParameter('userref'),
+        TimestampParameter('start'),
+        TimestampParameter('end'),
+        IntegerParameter('ofs'),
+        OptionsParameter('closetime', VALID_CLOSETIME_OPTIONS),
+    ]),
+    'GetTradesHistory': ('TradesHistory', [
+        OptionsParameter('type', VALID_TRADE_HISTORY_TYPES),
+        BooleanParameter('trades'),
+        TimestampParameter('start'),
+        TimestampParameter('end'),
+        IntegerParameter('ofs'),
+    ]),
+    'GetLedgersInfo': ('Ledgers', [
+        OptionsParameter('aclass', VALID_ACLASS_OPTIONS),
+        CommaDelimitedParameter('asset', 'assets'),
+        OptionsParameter('type', VALID_LEDGER_TYPES),
+        TimestampParameter('start'),
+        TimestampParameter('end'),
+        IntegerParameter('ofs'),
+    ]),
+    'AddStandardOrder': ('AddOrder', [
+        OptionsParameter('pair', 'asset_pairs', required=True),
+        OptionsParameter('type', VALID_ORDER_SIDES, required=True),
+        OptionsParameter('ordertype', VALID_ORDER_TYPES, required=True),
+        DecimalParameter('volume', required=True),
+        DecimalParameter('price'),
+        DecimalParameter('price2'),
+        DecimalParameter('leverage'),
+        CommaDelimitedParameter('oflags', VALID_ORDER_FLAGS),
+        OrderTimeParameter('starttm'),
+        OrderTimeParameter('expiretm'),
+        IntegerParameter('userref'),
+        BooleanParameter('validate'),
+    ]),
+    'AddOrderBatch': ('AddOrderBatch', [
+        OptionsParameter('pair', 'asset_pairs', required=True),
+        ListParameter('orders', KRAKEN_ADD_ORDER_BATCH_MAX, required=True),
+        StringParameter('deadline'),
+        BooleanParameter('validate'),
+    ]),
+    'CancelOpenOrder': ('CancelOrder', [
+        OrderIdParameter('txid', required=True),
+    ]),
+    'CancelAllOrdersAfter': ('CancelAllOrdersAfter', [
+        IntegerParameter('timeout', required=True),
+    ]),
+    'CancelOrderBatch': ('CancelOrderBatch', [
+        ListParameter('orders', KRAKEN_CANCEL_ORDER_BATCH_MAX, required=True),
+    ]),
+    'QueryLedgers': ('QueryLedgers', [
+        StringParameter('id', required=True),
+        BooleanParameter('trades'),
+    ]),
+}
+
+
+def compile_schemas(schemas, option_sources=None):
+    return {request_type: RequestValidator(request_type,
+                                           endpoint,
+                                           parameters,
+                                           option_sources)
+            for request_type, (endpoint, parameters) in schemas.items()}
+
+
+KRAKEN_REQUEST_VALIDATORS = compile_schemas(KRAKEN_REQUEST_SCHEMAS)
@@ -0,0 +1,31 @@
+import pytest
+from krakencli import columnar
+from krakencli.kraken_session import KrakenSession
+from tests.test_utilities import TEST_PRIVATE_KEY
+
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request, monkeypatch):
+    # Runs a test with NumPy columns and again with the array.array fallback
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(columnar, 'np', None)
+    return request.param
+
+
+@pytest.fixture
+def private_session():
+    # Builds sessions with test keys whose private requests go to post, a
+    # callable standing in for the HTTP session's post
+    sessions = []
+
+    def make(post, session_class=KrakenSession, **kwargs):
+        sess = session_class(api_key="key", private_key=TEST_PRIVATE_KEY, **kwargs)
+        sess._request_manager.http_session.post = post
+        sessions.append(sess)
+        return sess
+
+    yield make
+    for sess in sessions:
+        sess.close()
@@ -0,0 +1,148 @@
+import threading
+import urllib.parse
+from krakencli.account_store import KrakenAccountStore
+from tests.test_utilities import FakeResponse
+
+
+def ledger_entry(i, asset='XXBT', type='trade'):
+    return (f"L{i:04d}", {'refid': f"R{i}", 'time': 1000.0 + i, 'type': type,
+                          'subtype': '', 'aclass': 'currency', 'asset': asset,
+                          'amount': f"{i}.00000000", 'fee': "0.0", 'balance': "1.0"})
+
+
+def trade_entry(i, pair='XXBTZUSD'):
+    return (f"T{i:04d}", {'ordertxid': f"O{i}", 'postxid': f"P{i}", 'pair': pair,
+                          'time': 1000.0 + i, 'type': 'buy' if i % 2 else 'sell',
+                          'ordertype': 'limit', 'price': "100.0", 'cost': "1.0",
+                          'fee': "0.01", 'vol': "0.01", 'margin': "0.0",
+                          'misc': '', 'trades': ['A', 'B']})
+
+
+class FakeAccountServer(object):
+    # Serves entries newest first with Kraken's exclusive 'start' filter
+
+    def __init__(self, ledger, trades):
+        self.entries = {'Ledgers': ('ledger', ledger),
+                        'TradesHistory': ('trades', trades),
+                        'QueryLedgers': (None, ledger)}
+        self.requests = []
+
+    def __call__(self, url, headers=None, data=None, **kwargs):
+        endpoint = url.rsplit('/', 1)[-1]
+        params = dict(urllib.parse.parse_qsl(data))
+        self.requests.append((endpoint, params))
+        result_key, entries = self.entries[endpoint]
+        if result_key is None:
+            ids = params['id'].split(',')
+            return FakeResponse({entry_id: entry for entry_id, entry in entries
+                                 if entry_id in ids})
+        start = float(params.get('start', 0))
+        ofs = int(params.get('ofs', 0))
+        rows = sorted((entry for entry in entries if entry[1]['time'] > start),
+                      key=lambda entry: -entry[1]['time'])
+        return FakeResponse({result_key: dict(rows[ofs:ofs + 50]), 'count': len(rows)})
+
+
+def test_initial_and_incremental_sync(private_session):
+    ledger = [ledger_entry(i) for i in range(120)]
+    server = FakeAccountServer(ledger, [])
+    store = KrakenAccountStore(":memory:", private_session(server), batch_size=25)
+
+    assert store.sync_ledgers() == 120
+    assert len(server.requests) == 3
+    assert store.high_water_mark('ledger') == (1119.0, 'L0119')
+
+    ledger.extend(ledger_entry(i) for i in range(120, 124))
+    server.requests.clear()
+    assert store.sync_ledgers() == 4
+    assert len(server.requests) == 1
+    assert float(server.requests[0][1]['start']) == 1118.0
+    assert store.high_water_mark('ledger') == (1123.0, 'L0123')
+
+    server.requests.clear()
+    assert store.sync_ledgers() == 0
+    assert len(server.requests) == 1
+
+
+def test_sync_persists_across_instances(tmp_path, private_session):
+    path = str(tmp_path / "account.db")
+    server = FakeAccountServer([ledger_entry(i) for i in range(5)],
+                               [trade_entry(i) for i in range(7)])
+    with KrakenAccountStore(path, private_session(server)) as store:
+        assert store.sync() == {'ledger': 5, 'trades': 7}
+
+    with KrakenAccountStore(path, private_session(server)) as store:
+        assert store.sync() == {'ledger': 0, 'trades': 0}
+        assert len(store.trades()) == 7
+
+
+def test_accounts_are_separate(tmp_path, private_session):
+    path = str(tmp_path / "account.db")
+    server = FakeAccountServer([ledger_entry(i) for i in range(3)], [])
+    with KrakenAccountStore(path, private_session(server), account='main') as store:
+        store.sync_ledgers()
+        assert store.high_water_mark('ledger')[0] == 1002.0
+
+    with KrakenAccountStore(path, private_session(server), account='sub') as store:
+        assert store.high_water_mark('ledger') == (None, None)
+        assert store.ledger_entries() == []
+
+
+def test_query_helpers(private_session):
+    ledger = [ledger_entry(i, asset='XXBT') for i in range(4)]
+    ledger.extend(ledger_entry(i, asset='ZUSD', type='deposit') for i in range(4, 6))
+    trades = [trade_entry(i) for i in range(3)]
+    trades.extend(trade_entry(i, pair='XETHZUSD') for i in range(3, 5))
+    store = KrakenAccountStore(":memory:",
+                               private_session(FakeAccountServer(ledger, trades)))
+    store.sync()
+
+    assert [row['id'] for row in store.ledger_entries(asset='ZUSD')] == \
+        ['L0004', 'L0005']
+    assert [row['id'] for row in store.ledger_entries(type='trade',
+                                                      start=1001,
+                                                      end=1003)] == \
+        ['L0001', 'L0002']
+    assert store.ledger_entries(asset='XXBT')[0]['amount'] == "0.00000000"
+    assert [row['id'] for row in store.trades(pair='XETHZUSD')] == ['T0003', 'T0004']
+    assert [row['id'] for row in store.trades(type='buy')] == ['T0001', 'T0003']
+
+
+def test_fetch_ledgers(private_session):
+    ledger = [ledger_entry(i) for i in range(30)]
+    server = FakeAccountServer(ledger, [])
+    store = KrakenAccountStore(":memory:", private_session(server))
+
+    assert store.fetch_ledgers([entry_id for entry_id, entry in ledger]) == 30
+    assert [endpoint for endpoint, params in server.requests] == ['QueryLedgers'] * 2
+    assert store.high_water_mark('ledger') == (None, None)
+
+
+def test_store_shared_between_threads(tmp_path, private_session):
+    server = FakeAccountServer([ledger_entry(i) for i in range(200)],
+                               [trade_entry(i) for i in range(200)])
+    store = KrakenAccountStore(str(tmp_path / "account.db"),
+                               private_session(server),
+                               batch_size=10)
+    errors = []
+
+    def run(task):
+        try:
+            for _ in range(5):
+                task()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(task,))
+               for task in (store.sync_ledgers, store.sync_trades,
+                            store.ledger_entries, store.trades)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(store.ledger_entries()) == 200
+    assert len(store.trades()) == 200
+    assert store.high_water_mark('trades') == (1199.0, 'T0199')
+    store.close()
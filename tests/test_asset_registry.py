@@ -0,0 +1,173 @@
+import pytest
+from krakencli.asset_registry import KrakenAssetRegistry
+from krakencli.kraken_session import KrakenRequestManager, KrakenSession
+from krakencli.async_kraken_session import AsyncKrakenRequestManager
+from krakencli.kraken_api_values import KRAKEN_ASSET_PAIRS
+from krakencli.exceptions import InvalidRequestParameterOptionsException
+from tests.test_utilities import FakeClock, FakeResponse
+
+ASSET_PAIRS = {
+    'XXBTZUSD': {'altname': 'XBTUSD', 'wsname': 'XBT/USD', 'base': 'XXBT',
+                 'quote': 'ZUSD', 'pair_decimals': 1, 'lot_decimals': 8,
+                 'ordermin': '0.0001', 'fees': [[0, 0.26]]},
+    'XETHZUSD': {'altname': 'ETHUSD', 'wsname': 'ETH/USD', 'base': 'XETH',
+                 'quote': 'ZUSD', 'pair_decimals': 2, 'lot_decimals': 8,
+                 'ordermin': '0.01'},
+    'NEWCOINUSD': {'altname': 'NEWCOINUSD', 'wsname': 'NEWCOIN/USD',
+                   'base': 'NEWCOIN', 'quote': 'ZUSD', 'pair_decimals': 4,
+                   'lot_decimals': 8, 'ordermin': '1'},
+}
+ASSETS = {
+    'XXBT': {'aclass': 'currency', 'altname': 'XBT', 'decimals': 10,
+             'display_decimals': 5},
+    'ZUSD': {'aclass': 'currency', 'altname': 'USD', 'decimals': 4,
+             'display_decimals': 2},
+    'NEWCOIN': {'aclass': 'currency', 'altname': 'NEWCOIN', 'decimals': 8,
+                'display_decimals': 4},
+}
+
+
+def make_request_manager():
+    calls = []
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(url)
+        if url.endswith('AssetPairs'):
+            return FakeResponse(ASSET_PAIRS)
+        return FakeResponse(ASSETS)
+
+    manager = KrakenRequestManager()
+    manager.http_session.get = fake_get
+    return manager, calls
+
+
+def wait_for_refresh(registry):
+    thread = registry._refresh_thread
+    if thread is not None:
+        thread.join()
+
+
+def test_static_fallback_then_background_refresh():
+    manager, calls = make_request_manager()
+    registry = KrakenAssetRegistry(manager)
+
+    assert KRAKEN_ASSET_PAIRS[0] in registry.pairs
+    wait_for_refresh(registry)
+    assert len(calls) == 2
+    assert 'NEWCOINUSD' in registry.pairs
+    assert registry.loaded_at is not None
+
+
+def test_indexes():
+    manager, calls = make_request_manager()
+    registry = KrakenAssetRegistry(manager)
+    registry.refresh()
+
+    assert registry.resolve_pair('XBT/USD') == 'XXBTZUSD'
+    assert registry.resolve_pair('XBTUSD') == 'XXBTZUSD'
+    assert registry.resolve_pair('UNKNOWN') is None
+    assert registry.pair_info('ETH/USD')['pair_decimals'] == 2
+    # Only the compact fields are kept
+    assert 'fees' not in registry.pair_info('XXBTZUSD')
+    assert registry.asset_info('XXBT')['decimals'] == 10
+    assert registry.pair_for('XETH', 'ZUSD') == 'XETHZUSD'
+    assert sorted(registry.pairs_for_quote('ZUSD')) == sorted(ASSET_PAIRS)
+    assert registry.pairs_for_base('NEWCOIN') == ['NEWCOINUSD']
+    assert 'XBTUSD' in registry.pairs
+    assert 'XBT/USD' not in registry.pairs
+    assert 'USD' in registry.assets
+
+
+def test_cache_round_trip(tmp_path):
+    cache_path = str(tmp_path / "registry.json")
+    clock = FakeClock(1000.0)
+    manager, calls = make_request_manager()
+    KrakenAssetRegistry(manager, cache_path=cache_path, clock=clock).refresh()
+    assert len(calls) == 2
+
+    registry = KrakenAssetRegistry(manager, cache_path=cache_path, clock=clock)
+    assert registry.resolve_pair('NEWCOIN/USD') == 'NEWCOINUSD'
+    assert registry._refresh_thread is None
+    assert len(calls) == 2
+
+
+def test_stale_cache_refreshes_in_background(tmp_path):
+    cache_path = str(tmp_path / "registry.json")
+    clock = FakeClock(1000.0)
+    manager, calls = make_request_manager()
+    KrakenAssetRegistry(manager, cache_path=cache_path, clock=clock).refresh()
+
+    clock.now += 2 * 24 * 60 * 60
+    registry = KrakenAssetRegistry(manager, cache_path=cache_path, clock=clock)
+    assert 'NEWCOINUSD' in registry.pairs
+    wait_for_refresh(registry)
+    assert len(calls) == 4
+    assert registry.loaded_at == clock.now
+
+
+def test_corrupt_cache_falls_back(tmp_path):
+    cache_path = tmp_path / "registry.json"
+    cache_path.write_text("{not json")
+    manager, calls = make_request_manager()
+    registry = KrakenAssetRegistry(manager, cache_path=str(cache_path))
+    assert registry.load_cache() is None
+
+
+def test_session_validates_against_registry():
+    manager, calls = make_request_manager()
+    registry = KrakenAssetRegistry(manager)
+    registry.refresh()
+
+    sess = KrakenSession(asset_registry=registry)
+    sess._request_manager.http_session.get = \
+        lambda url, params=None, **kwargs: FakeResponse({'NEWCOINUSD': {}})
+    assert sess.get_ticker_information('NEWCOINUSD,XBTUSD') == {'NEWCOINUSD': {}}
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.get_ohlc_data(pair='XXBTZEUR')
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        KrakenSession().get_ohlc_data(pair='NEWCOINUSD')
+
+
+def test_refresh_with_async_request_manager():
+    manager = AsyncKrakenRequestManager()
+    manager.http_session.get = lambda url, params=None, **kwargs: FakeResponse(
+        ASSET_PAIRS if url.endswith('AssetPairs') else ASSETS)
+    registry = KrakenAssetRegistry(manager)
+    registry.refresh()
+    assert registry.resolve_pair('ETH/USD') == 'XETHZUSD'
+    manager.close()
+
+
+def test_failed_refresh_backs_off():
+    calls = []
+
+    def failing_get(url, params=None, **kwargs):
+        calls.append(url)
+        return FakeResponse(error=["EService:Unavailable"])
+
+    manager = KrakenRequestManager()
+    manager.http_session.get = failing_get
+    clock = FakeClock(1000.0)
+    registry = KrakenAssetRegistry(manager, clock=clock, retry_interval=60)
+
+    for i in range(50):
+        assert 'XXBTZUSD' in registry.pairs
+        wait_for_refresh(registry)
+    assert len(calls) == 1
+
+    clock.now += 60
+    assert 'XXBTZUSD' in registry.pairs
+    wait_for_refresh(registry)
+    assert len(calls) == 2
+    # The wait doubles after consecutive failures
+    clock.now += 60
+    assert 'XXBTZUSD' in registry.pairs
+    wait_for_refresh(registry)
+    assert len(calls) == 2
+
+    manager.http_session.get = make_request_manager()[0].http_session.get
+    clock.now += 60
+    assert 'XXBTZUSD' in registry.pairs
+    wait_for_refresh(registry)
+    assert 'NEWCOINUSD' in registry.pairs
+    assert registry._retry_wait == 0
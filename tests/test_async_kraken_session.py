@@ -0,0 +1,138 @@
+import asyncio
+import inspect
+import threading
+import pytest
+from krakencli.async_kraken_session import (
+    AsyncKrakenSession,
+    AsyncKrakenRequestManager,
+)
+from krakencli.exceptions import (
+    InvalidPublicEndpointException,
+    InvalidRequestParameterOptionsException,
+    NoApiKeysException,
+)
+from tests.test_utilities import FakeResponse
+
+
+def fake_get(url, params=None, **kwargs):
+    return FakeResponse({'url': url, 'params': params})
+
+
+def test_request_manager_class():
+    sess = AsyncKrakenSession()
+    assert isinstance(sess._request_manager, AsyncKrakenRequestManager)
+
+
+def test_public_request_bad_endpoint():
+    req_man = AsyncKrakenRequestManager()
+    with pytest.raises(InvalidPublicEndpointException):
+        asyncio.run(req_man.make_public_request("bad_request", {}))
+    req_man.close()
+
+
+def test_private_request_no_keys():
+    sess = AsyncKrakenSession()
+    with pytest.raises(NoApiKeysException):
+        asyncio.run(sess.get_account_balance())
+    sess.close()
+
+
+def test_validation_is_eager():
+    sess = AsyncKrakenSession()
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.get_ohlc_data("BADPAIR")
+    sess.close()
+
+
+def test_concurrent_requests():
+    sess = AsyncKrakenSession(pool_maxsize=4)
+    sess._request_manager.http_session.get = fake_get
+
+    async def fetch_all():
+        return await asyncio.gather(
+            sess.get_server_time(),
+            sess.get_ohlc_data('XXBTZUSD', interval=60),
+            sess.get_order_book('XETHZUSD', count=10),
+        )
+
+    server_time, ohlc_data, order_book = asyncio.run(fetch_all())
+    assert server_time['url'].endswith('/public/Time')
+    assert ohlc_data['params']['interval'] == 60
+    assert order_book['params']['pair'] == 'XETHZUSD'
+    sess.close()
+    assert sess._request_manager._executor is None
+
+
+def test_async_context_manager():
+
+    async def use_session():
+        async with AsyncKrakenSession() as sess:
+            sess._request_manager.executor
+        return sess
+
+    sess = asyncio.run(use_session())
+    assert sess._request_manager._executor is None
+
+
+def test_async_context_exit_keeps_loop_running():
+    released = []
+    release = threading.Event()
+
+    def slow_get(url, params=None, **kwargs):
+        released.append(release.wait(2))
+        return FakeResponse({})
+
+    async def unblock():
+        await asyncio.sleep(0.05)
+        release.set()
+
+    async def use_session():
+        async with AsyncKrakenSession() as sess:
+            sess._request_manager.http_session.get = slow_get
+            pending = asyncio.ensure_future(sess.get_server_time())
+            await asyncio.sleep(0.01)
+            asyncio.ensure_future(unblock())
+        return await pending
+
+    assert asyncio.run(use_session()) == {}
+    assert released == [True]
+
+
+def test_get_ohlc_data_bulk():
+    sess = AsyncKrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    bulk_data = asyncio.run(
+        sess.get_ohlc_data_bulk(['XXBTZUSD', 'BADPAIR'], max_workers=2)
+    )
+    assert list(bulk_data['result'].keys()) == ['XXBTZUSD']
+    assert isinstance(bulk_data['error']['BADPAIR'],
+                      InvalidRequestParameterOptionsException)
+    sess.close()
+
+
+def test_async_stream_recent_trades():
+    trades = [[f"{100 + i}.0", "1.0", 1000.0 + i, "b", "l", ""] for i in range(1200)]
+    threads = []
+
+    def fake_get(url, params=None, stream=False, **kwargs):
+        threads.append(threading.current_thread())
+        return FakeResponse({'XXBTZUSD': trades, 'last': "1"})
+
+    sess = AsyncKrakenSession()
+    sess._request_manager.http_session.get = fake_get
+    stream = sess.stream_recent_trades('XXBTZUSD')
+    assert inspect.isasyncgen(stream)
+
+    async def collect():
+        return [row async for key, row in stream if key == 'XXBTZUSD']
+
+    assert asyncio.run(collect()) == trades
+    assert threads[0] is not threading.main_thread()
+    sess.close()
+
+
+def test_async_stream_validates_eagerly():
+    sess = AsyncKrakenSession()
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.stream_recent_trades('FNYMN')
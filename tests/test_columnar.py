@@ -0,0 +1,95 @@
+import array
+import asyncio
+from krakencli.columnar import (
+    rows_to_columns,
+    result_to_columns,
+    OHLC_COLUMNS,
+    TRADES_COLUMNS,
+    SPREAD_COLUMNS,
+)
+from krakencli.kraken_session import KrakenSession
+from krakencli.async_kraken_session import AsyncKrakenSession
+from tests.test_utilities import FakeResponse
+
+OHLC_ROWS = [
+    [1616662740, "52591.9", "52599.9", "52591.8", "52599.9", "52599.1",
+     "0.11091626", 5],
+    [1616662800, "52600.0", "52608.7", "52600.0", "52608.7", "52603.4",
+     "0.25200000", 12],
+]
+TRADES_ROWS = [
+    ["52591.9", "0.011", 1616662740.1234, "b", "l", ""],
+    ["52590.0", "1.500", 1616662741.5678, "s", "m", ""],
+]
+SPREAD_ROWS = [
+    [1616662740, "52591.9", "52592.0"],
+]
+
+
+def test_ohlc_columns(backend):
+    columns = rows_to_columns(OHLC_ROWS, OHLC_COLUMNS)
+    assert list(columns.keys()) == [column[0] for column in OHLC_COLUMNS]
+    assert list(columns['time']) == [1616662740, 1616662800]
+    assert list(columns['vwap']) == [52599.1, 52603.4]
+    assert list(columns['count']) == [5, 12]
+    if backend == 'array':
+        assert isinstance(columns['time'], array.array)
+        assert columns['time'].typecode == 'q'
+        assert columns['count'].typecode == 'i'
+    else:
+        assert str(columns['time'].dtype) == 'int64'
+        assert str(columns['count'].dtype) == 'int32'
+
+
+def test_trades_columns(backend):
+    columns = rows_to_columns(TRADES_ROWS, TRADES_COLUMNS)
+    assert list(columns['price']) == [52591.9, 52590.0]
+    assert list(columns['time']) == [1616662740.1234, 1616662741.5678]
+    assert list(columns['buy']) == [1, 0]
+    assert list(columns['market']) == [0, 1]
+
+
+def test_empty_page(backend):
+    columns = rows_to_columns([], SPREAD_COLUMNS)
+    assert all(len(column) == 0 for column in columns.values())
+
+
+def test_result_to_columns():
+    result = result_to_columns({'XXBTZUSD': SPREAD_ROWS, 'last': 1616662740},
+                               SPREAD_COLUMNS)
+    assert result['last'] == 1616662740
+    assert list(result['XXBTZUSD']['ask']) == [52592.0]
+
+
+def fake_get(url, params=None, **kwargs):
+    if url.endswith('OHLC'):
+        return FakeResponse({'XXBTZUSD': OHLC_ROWS, 'last': 1616662800})
+    if url.endswith('Trades'):
+        return FakeResponse({'XXBTZUSD': TRADES_ROWS, 'last': "1616662741567800000"})
+    return FakeResponse({'XXBTZUSD': SPREAD_ROWS, 'last': 1616662740})
+
+
+def test_session_as_array():
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    ohlc_data = sess.get_ohlc_data('XXBTZUSD', as_array=True)
+    assert list(ohlc_data['XXBTZUSD']['close']) == [52599.9, 52608.7]
+    assert ohlc_data['last'] == 1616662800
+
+    trades = sess.get_recent_trades('XXBTZUSD', as_array=True)
+    assert list(trades['XXBTZUSD']['volume']) == [0.011, 1.5]
+
+    spread_data = sess.get_recent_spread_data('XXBTZUSD', as_array=True)
+    assert list(spread_data['XXBTZUSD']['bid']) == [52591.9]
+
+    assert sess.get_ohlc_data('XXBTZUSD')['XXBTZUSD'] == OHLC_ROWS
+
+
+def test_async_session_as_array():
+    sess = AsyncKrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    ohlc_data = asyncio.run(sess.get_ohlc_data('XXBTZUSD', as_array=True))
+    assert list(ohlc_data['XXBTZUSD']['count']) == [5, 12]
+    sess.close()
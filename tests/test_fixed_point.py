@@ -0,0 +1,107 @@
+import pytest
+from krakencli.fixed_point import (
+    decode_fixed,
+    decode_fixed_exact,
+    format_fixed,
+    decode_fixed_column,
+    format_fixed_column,
+    FixedPointCodec,
+    codecs_from_asset_pairs,
+)
+
+
+@pytest.mark.parametrize('value,decimals,expected', [
+    ("52591.9", 1, 525919),
+    ("52591.9", 3, 52591900),
+    ("0.00012345", 8, 12345),
+    ("1", 2, 100),
+    ("-0.5", 2, -50),
+    ("1.23456", 4, 12346),
+    ("1.23454", 4, 12345),
+    ("-1.23456", 4, -12346),
+    (7, 3, 7000),
+    (0.25, 2, 25),
+    (0.00005, 8, 5000),
+    (1.5e-07, 8, 15),
+    (-2e-09, 8, 0),
+    (1e16, 2, 10 ** 18),
+    (123456789.125, 2, 12345678913),
+])
+def test_decode_fixed(value, decimals, expected):
+    assert decode_fixed(value, decimals) == expected
+
+
+def test_decode_fixed_exact():
+    assert decode_fixed_exact("52000.10", 1) == 520001
+    assert decode_fixed_exact(0.00005, 8) == 5000
+    assert decode_fixed_exact(3, 2) == 300
+    with pytest.raises(ValueError):
+        decode_fixed_exact("52000.06", 1)
+    with pytest.raises(ValueError):
+        decode_fixed_exact(1e-9, 8)
+
+
+@pytest.mark.parametrize('value,decimals,expected', [
+    (525919, 1, "52591.9"),
+    (12345, 8, "0.00012345"),
+    (-50, 2, "-0.50"),
+    (42, 0, "42"),
+])
+def test_format_fixed(value, decimals, expected):
+    assert format_fixed(value, decimals) == expected
+
+
+def test_round_trip_columns(backend):
+    values = ["52591.9", "52600.0", "0.1"]
+    column = decode_fixed_column(values, 1)
+    assert list(column) == [525919, 526000, 1]
+    assert format_fixed_column(column, 1) == values
+
+
+@pytest.mark.parametrize('decimals', [0, 1, 4, 8])
+def test_columns_match_scalar_conversion(backend, decimals):
+    values = ["52591.96", "-0.5", "7", "0.00012345", "-1.23455", "99.999999999",
+              "0.0"]
+    assert list(decode_fixed_column(values, decimals)) == \
+        [decode_fixed(value, decimals) for value in values]
+    units = [525919, -50, 0, 12345, -7, 10 ** 12]
+    assert format_fixed_column(units, decimals) == \
+        [format_fixed(value, decimals) for value in units]
+    assert format_fixed_column([], decimals) == []
+    assert list(decode_fixed_column([1.5e-07, "2"], 8)) == [15, 200000000]
+
+
+def test_codec_decode_ohlc_data(backend):
+    codec = codecs_from_asset_pairs({
+        'XXBTZUSD': {'pair_decimals': 1, 'lot_decimals': 8},
+    })['XXBTZUSD']
+    ohlc_data = codec.decode_ohlc_data({
+        'XXBTZUSD': [[1616662740, "52591.9", "52599.9", "52591.8", "52599.9",
+                      "52599.12", "0.11091626", 5]],
+        'last': 1616662740,
+    })
+    columns = ohlc_data['XXBTZUSD']
+    assert list(columns['time']) == [1616662740]
+    assert list(columns['close']) == [525999]
+    assert list(columns['vwap']) == [525991]
+    assert list(columns['volume']) == [11091626]
+    assert list(columns['count']) == [5]
+    assert ohlc_data['last'] == 1616662740
+
+
+def test_codec_trades_and_spread(backend):
+    codec = FixedPointCodec(pair_decimals=5, lot_decimals=8)
+    trades = codec.decode_recent_trades({
+        'XETHZUSD': [["1750.12000", "0.50000000", 1616662740.1, "s", "l", ""]],
+    })
+    assert list(trades['XETHZUSD']['price']) == [175012000]
+    assert list(trades['XETHZUSD']['buy']) == [0]
+
+    spread_data = codec.decode_recent_spread_data({
+        'XETHZUSD': [[1616662740, "1750.10000", "1750.20000"]],
+    })
+    assert list(spread_data['XETHZUSD']['ask']) == [175020000]
+    assert codec.format_prices(spread_data['XETHZUSD']['bid']) == ["1750.10000"]
+    assert codec.format_volumes([50000000]) == ["0.50000000"]
+    assert list(codec.decode_volumes(["1.5"])) == [150000000]
+    assert list(codec.decode_prices(["1.5"])) == [150000]
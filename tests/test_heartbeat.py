@@ -0,0 +1,182 @@
+import threading
+import time
+import urllib.parse
+import pytest
+from krakencli.exceptions import NoApiKeysException
+from krakencli.heartbeat import KrakenDeadMansSwitch
+from krakencli.rate_limiter import KrakenRateLimiter
+from tests.test_utilities import FakeResponse, TEST_PRIVATE_KEY
+
+
+class FakeHeartbeatServer(object):
+
+    def __init__(self, fail=False, delays=(), hang=None):
+        self.requests = []
+        self.request_timeouts = []
+        self.fail = fail
+        self.delays = list(delays)
+        self.hang = hang
+        self.lock = threading.Lock()
+
+    def __call__(self, url, headers=None, data=None, timeout=None, **kwargs):
+        fields = dict(urllib.parse.parse_qsl(data))
+        with self.lock:
+            self.requests.append((url.rsplit('/', 1)[-1], fields))
+            self.request_timeouts.append(timeout)
+            delay = self.delays.pop(0) if self.delays else 0
+        time.sleep(delay)
+        if self.hang is not None and len(self.requests) > 1:
+            self.hang.wait()
+        if self.fail:
+            raise ConnectionError("connection reset")
+        return FakeResponse({'currentTime': "now",
+                             'triggerTime': fields.get('timeout')})
+
+    def timeouts(self):
+        with self.lock:
+            return [int(fields['timeout']) for endpoint, fields in self.requests
+                    if endpoint == 'CancelAllOrdersAfter']
+
+
+@pytest.fixture
+def make_switch(private_session):
+    def make(server, session=None, **kwargs):
+        if session is None:
+            session = private_session(server)
+        if not kwargs.get('share_session_key'):
+            kwargs.setdefault('api_key', "heartbeat")
+            kwargs.setdefault('private_key', TEST_PRIVATE_KEY)
+        switch = KrakenDeadMansSwitch(session, **kwargs)
+        switch._request_manager.http_session.post = server
+        return session, switch
+
+    return make
+
+
+def wait_for(condition, limit=2.0):
+    deadline = time.monotonic() + limit
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_cancel_all_orders_after(private_session):
+    server = FakeHeartbeatServer()
+    sess = private_session(server)
+    assert sess.cancel_all_orders_after(60)['triggerTime'] == "60"
+    assert server.requests[0][0] == 'CancelAllOrdersAfter'
+
+
+def test_beats_and_disarms_on_stop(make_switch):
+    server = FakeHeartbeatServer()
+    sess, switch = make_switch(server, timeout=60, interval=0.02)
+
+    with switch:
+        assert wait_for(lambda: switch.beats >= 3)
+        assert switch.running
+    assert not switch.running
+    timeouts = server.timeouts()
+    assert set(timeouts[:-1]) == {60}
+    assert timeouts[-1] == 0
+    assert switch.status()['last_result']['triggerTime'] == "60"
+
+
+def test_skips_rate_limiter(make_switch, private_session):
+    server = FakeHeartbeatServer()
+    blocked = threading.Event()
+    limiter = KrakenRateLimiter(max_counter=0, clock=lambda: 0,
+                                sleep=lambda seconds: blocked.wait())
+    sess = private_session(server, rate_limiter=limiter)
+    sess, switch = make_switch(server, session=sess, timeout=60, interval=0.02)
+
+    # A session call stuck on the rate limiter does not hold up the beats
+    backfill = threading.Thread(target=sess.get_account_balance)
+    backfill.start()
+    switch.start()
+    assert wait_for(lambda: switch.beats >= 3)
+    switch.stop(disarm=False)
+    blocked.set()
+    backfill.join()
+
+    assert switch._request_manager._rate_limiter is None
+    assert [endpoint for endpoint, fields in server.requests].count('Balance') == 1
+    switch.close()
+
+
+def test_separate_key_uses_own_nonces(make_switch):
+    sess, switch = make_switch(FakeHeartbeatServer())
+    assert switch._request_manager._api_key == "heartbeat"
+    assert switch._request_manager._nonce_generator is not \
+        sess._request_manager._nonce_generator
+
+
+def test_requires_separate_key(private_session):
+    sess = private_session(FakeHeartbeatServer())
+    with pytest.raises(NoApiKeysException):
+        KrakenDeadMansSwitch(sess)
+
+
+def test_shared_key_warns_and_shares_nonces(make_switch):
+    with pytest.warns(RuntimeWarning, match="nonce window"):
+        sess, switch = make_switch(FakeHeartbeatServer(), share_session_key=True)
+    assert switch._request_manager._api_key == "key"
+    assert switch._request_manager._nonce_generator is \
+        sess._request_manager._nonce_generator
+
+
+def test_beats_time_out_before_the_next_interval(make_switch):
+    server = FakeHeartbeatServer()
+    sess, switch = make_switch(server, timeout=60, interval=8)
+    switch.beat()
+    assert server.request_timeouts == [4]
+
+    sess, switch = make_switch(server, timeout=60, request_timeout=2)
+    switch.beat()
+    assert server.request_timeouts[-1] == 2
+
+
+def test_alerts_on_failure_and_expiry(make_switch):
+    alerts = []
+    server = FakeHeartbeatServer()
+    sess, switch = make_switch(server, timeout=1, interval=0.02, retry_interval=0.02,
+                               on_alert=lambda kind, details: alerts.append(kind))
+    switch.start()
+    assert wait_for(lambda: switch.beats >= 1)
+    server.fail = True
+    assert wait_for(lambda: 'expired' in alerts, limit=3.0)
+    switch.stop(disarm=False)
+
+    assert 'failed' in alerts
+    assert switch.failures >= 1
+
+
+def test_alerts_on_late_beat(make_switch):
+    alerts = []
+    server = FakeHeartbeatServer(delays=[0, 0.1])
+    sess, switch = make_switch(server, timeout=60, interval=0.02, late_tolerance=0.05,
+                               on_alert=lambda kind, details: alerts.append(
+                                   (kind, details)))
+    switch.start()
+    assert wait_for(lambda: switch.beats >= 3)
+    switch.stop(disarm=False)
+
+    late = [details for kind, details in alerts if kind == 'late']
+    assert late and late[0]['lateness'] > 0.05
+    assert switch.max_lateness > 0.05
+
+
+def test_watchdog_alerts_while_beat_hangs(make_switch):
+    alerts = []
+    release = threading.Event()
+    server = FakeHeartbeatServer(hang=release)
+    sess, switch = make_switch(server, timeout=1, interval=0.02,
+                               on_alert=lambda kind, details: alerts.append(kind))
+    switch.start()
+    try:
+        assert wait_for(lambda: 'expired' in alerts, limit=3.0)
+        assert switch.beats == 1
+        assert alerts.count('late') == 1
+        assert alerts.count('expired') == 1
+    finally:
+        release.set()
+        switch.stop(disarm=False)
@@ -0,0 +1,155 @@
+import multiprocessing
+import time
+from krakencli.history_store import ColumnarSeries, KrakenHistoryStore
+from krakencli.columnar import OHLC_COLUMNS
+
+INTERVAL = 1
+NOW = 60 * 100
+
+
+def make_bar(bar_time):
+    return [bar_time, "1.0", "2.0", "0.5", "1.5", "1.2", "3.0", 7]
+
+
+class FakeSession(object):
+
+    def __init__(self, bars, trades=()):
+        self.bars = bars
+        self.trades = list(trades)
+        self.calls = []
+
+    def iter_ohlc_data(self, pair, interval=None, start=None, end=None):
+        self.calls.append(('ohlc', start, end))
+        for bar in self.bars:
+            if (start is None or bar[0] > start) and (end is None or bar[0] < end):
+                yield bar
+
+    def iter_trades(self, pair, start=None, end=None):
+        self.calls.append(('trades', start, end))
+        for trade in self.trades:
+            if start is None or trade[2] > start:
+                yield trade
+
+
+class SlowSession(FakeSession):
+
+    def iter_ohlc_data(self, pair, interval=None, start=None, end=None):
+        for bar in super().iter_ohlc_data(pair, interval, start, end):
+            time.sleep(0.002)
+            yield bar
+
+
+def sync_worker(root, barrier):
+    store = KrakenHistoryStore(root,
+                               SlowSession([make_bar(60 * i) for i in range(1, 40)]),
+                               clock=lambda: NOW)
+    barrier.wait()
+    store.sync_ohlc('XXBTZUSD', INTERVAL)
+
+
+def test_series_append_and_read(tmp_path, backend):
+    series = ColumnarSeries(str(tmp_path / "series"), OHLC_COLUMNS)
+    assert len(series) == 0
+    assert series.last_time() is None
+    assert len(series.read()['time']) == 0
+
+    series.append([make_bar(60), make_bar(120), make_bar(180)])
+    assert len(series) == 3
+    assert series.last_time() == 180
+
+    window = series.read(start=120, end=180)
+    assert list(window['time']) == [120]
+    assert list(window['close']) == [1.5]
+    assert list(window['count']) == [7]
+
+
+def test_series_repairs_partial_write(tmp_path):
+    path = str(tmp_path / "series")
+    series = ColumnarSeries(path, OHLC_COLUMNS)
+    series.append([make_bar(60), make_bar(120)])
+    with open(series._column_path('close'), 'ab') as f:
+        f.write(b'\x00' * 3)
+    with open(series._column_path('time'), 'r+b') as f:
+        f.truncate(8)
+
+    assert len(ColumnarSeries(path, OHLC_COLUMNS)) == 1
+    assert ColumnarSeries(path, OHLC_COLUMNS).last_time() == 60
+
+
+def test_get_ohlc_fetches_only_missing_tail(tmp_path, backend):
+    session = FakeSession([make_bar(60 * i) for i in range(1, 100)])
+    store = KrakenHistoryStore(str(tmp_path), session, clock=lambda: NOW)
+
+    bars = store.get_ohlc('XXBTZUSD', INTERVAL)
+    # The bar starting a minute before NOW is still forming
+    assert list(bars['time']) == [60 * i for i in range(1, 99)]
+
+    session.bars.append(make_bar(60 * 100))
+    store._clock = lambda: NOW + 120
+    bars = store.get_ohlc('XXBTZUSD', INTERVAL)
+    assert len(bars['time']) == 100
+    assert session.calls[-1] == ('ohlc', 60 * 98, NOW + 60)
+
+    calls = len(session.calls)
+    bars = store.get_ohlc('XXBTZUSD', INTERVAL, start=600, end=1200)
+    assert list(bars['time']) == list(range(600, 1200, 60))
+    assert len(session.calls) == calls
+
+
+def test_get_trades(tmp_path):
+    trades = [["1.0", "2.0", 1000.0 + i, "b", "m", ""] for i in range(5)]
+    session = FakeSession([], trades)
+    store = KrakenHistoryStore(str(tmp_path), session)
+
+    stored = store.get_trades('XXBTZUSD')
+    assert list(stored['time']) == [1000.0 + i for i in range(5)]
+    assert list(stored['market']) == [1] * 5
+
+    session.trades.append(["1.0", "2.0", 1005.0, "s", "l", ""])
+    stored = store.get_trades('XXBTZUSD')
+    assert list(stored['buy']) == [1] * 5 + [0]
+    assert session.calls[-1] == ('trades', 1003.0, None)
+
+
+def test_sync_trades_resumes_inside_a_timestamp(tmp_path):
+    # Three fills share a timestamp and only the first two were stored before
+    # the previous sync stopped
+    trades = [["1.0", "1.0", 1000.0, "b", "m", ""],
+              ["1.0", "2.0", 1001.0, "b", "m", ""],
+              ["1.0", "3.0", 1001.0, "s", "m", ""],
+              ["1.0", "4.0", 1001.0, "b", "l", ""],
+              ["1.0", "5.0", 1002.0, "b", "m", ""]]
+    session = FakeSession([], trades)
+    store = KrakenHistoryStore(str(tmp_path), session)
+    store.trades_series('XXBTZUSD').append(trades[:3])
+
+    assert store.sync_trades('XXBTZUSD') == 2
+    stored = store.get_trades('XXBTZUSD', sync=False)
+    assert list(stored['volume']) == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert store.sync_trades('XXBTZUSD') == 0
+
+
+def test_concurrent_syncs_from_processes(tmp_path, backend):
+    barrier = multiprocessing.Barrier(3)
+    processes = [multiprocessing.Process(target=sync_worker,
+                                         args=(str(tmp_path), barrier))
+                 for x in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    series = ColumnarSeries(str(tmp_path / 'XXBTZUSD' / 'ohlc_1'), OHLC_COLUMNS)
+    assert list(series.column('time')) == [60 * i for i in range(1, 40)]
+    assert list(series.read(start=120, end=300)['time']) == [120, 180, 240]
+
+
+def test_find_and_repair_ohlc_gaps(tmp_path, backend):
+    session = FakeSession([make_bar(60 * i) for i in range(1, 10)])
+    store = KrakenHistoryStore(str(tmp_path), session, clock=lambda: NOW)
+    series = store.ohlc_series('XXBTZUSD', INTERVAL)
+    series.append([make_bar(60), make_bar(120), make_bar(300), make_bar(360)])
+
+    assert store.find_ohlc_gaps('XXBTZUSD', INTERVAL) == [(120, 300)]
+    assert store.repair_ohlc_gaps('XXBTZUSD', INTERVAL) == []
+    assert list(series.read()['time']) == [60, 120, 180, 240, 300, 360]
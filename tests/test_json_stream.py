@@ -0,0 +1,101 @@
+import json
+import pytest
+from krakencli.json_stream import iter_result_items
+from krakencli.json_backend import json_loads
+from krakencli.kraken_session import KrakenSession
+from krakencli.exceptions import KrakenApiErrorException
+from tests.test_utilities import FakeResponse
+
+OHLC_RESPONSE = {
+    'error': [],
+    'result': {
+        'XXBTZUSD': [
+            [1616662740, "52591.9", "52599.9", "52591.8", "52599.9", "52599.1",
+             "0.11091626", 5],
+            [1616662800, "52600.0", "52608.7", "52600.0", "52608.7", "52603.4",
+             "0.25200000", 12],
+        ],
+        'last': 1616662800,
+    }
+}
+
+
+def chunked(data, chunk_size):
+    return [data[i:i+chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def collect(chunks):
+    items = []
+    generator = iter_result_items(chunks)
+    while True:
+        try:
+            items.append(next(generator))
+        except StopIteration as e:
+            return items, e.value
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 64, 4096])
+def test_rows_across_chunk_boundaries(chunk_size):
+    content = json.dumps(OHLC_RESPONSE, indent=1).encode()
+    items, errors = collect(chunked(content, chunk_size))
+    expected_rows = OHLC_RESPONSE['result']['XXBTZUSD']
+    assert items == [('XXBTZUSD', row) for row in expected_rows] + \
+        [('last', 1616662800)]
+    assert errors is None
+
+
+def test_non_array_members_yielded_whole():
+    content = json.dumps({'error': [], 'result': {
+        'XXBTZUSD': {'asks': [["1.0", "2.0", 3]], 'bids': []},
+        'empty': [],
+    }}).encode()
+    items, errors = collect(chunked(content, 5))
+    assert items == [('XXBTZUSD', {'asks': [["1.0", "2.0", 3]], 'bids': []})]
+
+
+def test_multibyte_characters_split_across_chunks():
+    content = json.dumps({'error': [], 'result': {'name': ["café"]}},
+                         ensure_ascii=False).encode()
+    items, errors = collect(chunked(content, 1))
+    assert items == [('name', "café")]
+
+
+def test_error_response():
+    content = json.dumps({'error': ["EQuery:Unknown asset pair"]}).encode()
+    items, errors = collect(chunked(content, 3))
+    assert items == []
+    assert errors == ["EQuery:Unknown asset pair"]
+
+
+def test_json_backend():
+    assert json_loads(b'{"a": [1, "2"]}') == {'a': [1, "2"]}
+
+
+def test_stream_ohlc_data():
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = \
+        lambda url, params=None, **kwargs: FakeResponse(OHLC_RESPONSE['result'])
+
+    rows = [row for key, row in sess.stream_ohlc_data('XXBTZUSD') if key != 'last']
+    assert rows == OHLC_RESPONSE['result']['XXBTZUSD']
+
+
+def test_stream_error_raises():
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = \
+        lambda url, params=None, **kwargs: FakeResponse(error=["EGeneral:Bad"])
+
+    with pytest.raises(KrakenApiErrorException):
+        list(sess.stream_recent_trades('XXBTZUSD'))
+
+
+def test_request_error_raises():
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = \
+        lambda url, params=None, **kwargs: FakeResponse(
+            error=["EQuery:Unknown asset pair"])
+
+    with pytest.raises(KrakenApiErrorException) as e:
+        sess.get_recent_trades('XXBTZUSD')
+    assert e.value.errors == ["EQuery:Unknown asset pair"]
+    assert e.value.endpoint == 'Trades'
@@ -38,3 +38,27 @@ def test_private_request_bad_endpoint():
     req_man = sess._request_manager
     with pytest.raises(InvalidPrivateEndpointException):
         req_man.make_private_request("bad_priv_request", {})
+
+
+def test_http_session_reused():
+    req_man = KrakenRequestManager(pool_connections=2, pool_maxsize=8)
+    http_session = req_man.http_session
+    assert req_man.http_session is http_session
+    adapter = http_session.get_adapter(DEFAULT_KRAKEN_API_DOMAIN)
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 8
+
+
+def test_close():
+    req_man = KrakenRequestManager()
+    http_session = req_man.http_session
+    req_man.close()
+    assert req_man._http_session is None
+    assert req_man.http_session is not http_session
+    req_man.close()
+
+
+def test_context_manager():
+    with KrakenRequestManager() as req_man:
+        req_man.http_session
+    assert req_man._http_session is None
@@ -18,7 +18,8 @@ from krakencli.exceptions import (
 from tests.test_utilities import (
     lists_match,
     list_in_list,
-    dict_value_length_check
+    dict_value_length_check,
+    FakeResponse
 )
 from tests.test_defs import (
     ALL_POSSIBLE_ASSET_PAIR_KEYS,
@@ -57,6 +58,21 @@ def test_load_keys_from_file_bad():
         sess.load_keys_from_file('tests/bad_test_kraken.key')
 
 
+def test_close():
+    sess = KrakenSession(pool_maxsize=4)
+    req_man = sess._request_manager
+    assert req_man._pool_maxsize == 4
+    req_man.http_session
+    sess.close()
+    assert req_man._http_session is None
+
+
+def test_context_manager():
+    with KrakenSession() as sess:
+        sess._request_manager.http_session
+    assert sess._request_manager._http_session is None
+
+
 def test_get_server_time():
     sess = KrakenSession()
     server_time = sess.get_server_time()
@@ -338,6 +354,46 @@ def test_get_recent_spread_data_since():
     with pytest.raises(InvalidTimestampException):
         sess.get_recent_spread_data(asset_pair, since="bad")
 
+def fake_get(url, params=None, **kwargs):
+    return FakeResponse({params['pair']: [], 'last': 0})
+
+
+def test_get_ohlc_data_bulk():
+
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    bulk_data = sess.get_ohlc_data_bulk(['XXBTZUSD', 'XETHZUSD', 'BADPAIR'],
+                                        interval=60,
+                                        max_workers=2)
+    assert lists_match(bulk_data['result'].keys(), ['XXBTZUSD', 'XETHZUSD'])
+    assert lists_match(bulk_data['error'].keys(), ['BADPAIR'])
+    assert isinstance(bulk_data['error']['BADPAIR'],
+                      InvalidRequestParameterOptionsException)
+    assert 'XETHZUSD' in bulk_data['result']['XETHZUSD']
+
+
+def test_get_order_book_bulk():
+
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    bulk_data = sess.get_order_book_bulk(['XXBTZUSD', 'XETHZUSD'], count="four")
+    assert lists_match(bulk_data['error'].keys(), ['XXBTZUSD', 'XETHZUSD'])
+    assert sess.get_order_book_bulk([]) == {'result': {}, 'error': {}}
+
+
+def test_get_recent_trades_and_spread_data_bulk():
+
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    pairs = ['XXBTZUSD', 'XETHZUSD']
+    assert lists_match(sess.get_recent_trades_bulk(pairs)['result'].keys(), pairs)
+    assert lists_match(sess.get_recent_spread_data_bulk(pairs)['result'].keys(),
+                       pairs)
+
+
 def test_private_request_no_keys():
     sess = KrakenSession()
 
@@ -401,8 +457,17 @@ def test_get_closed_orders_base():
     sess = KrakenSession()
     sess.load_keys_from_file('kraken.key')
 
-    with pytest.raises(NotImplementedError):
-        sess.get_closed_orders()
+    closed_orders = sess.get_closed_orders()
+    assert lists_match(closed_orders.keys(), ['closed', 'count'])
+
+
+def test_get_closed_orders_invalid_closetime():
+
+    sess = KrakenSession()
+    sess.load_keys_from_file('kraken.key')
+
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.get_closed_orders(closetime='never')
 
 
 def test_query_orders_info_base():
@@ -419,8 +484,17 @@ def test_get_trades_history_base():
     sess = KrakenSession()
     sess.load_keys_from_file('kraken.key')
 
-    with pytest.raises(NotImplementedError):
-        sess.get_trades_history()
+    trades_history = sess.get_trades_history()
+    assert lists_match(trades_history.keys(), ['trades', 'count'])
+
+
+def test_get_trades_history_invalid_type():
+
+    sess = KrakenSession()
+    sess.load_keys_from_file('kraken.key')
+
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.get_trades_history(type='some position')
 
 
 def test_query_trade_info_base():
@@ -446,8 +520,17 @@ def test_get_ledgers_info_base():
     sess = KrakenSession()
     sess.load_keys_from_file('kraken.key')
 
-    with pytest.raises(NotImplementedError):
-        sess.get_ledgers_info()
+    ledgers_info = sess.get_ledgers_info()
+    assert lists_match(ledgers_info.keys(), ['ledger', 'count'])
+
+
+def test_get_ledgers_info_invalid_asset():
+
+    sess = KrakenSession()
+    sess.load_keys_from_file('kraken.key')
+
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.get_ledgers_info(asset='XXBT,FNYMN')
 
 
 def test_query_ledgers_base():
@@ -455,7 +538,7 @@ def test_query_ledgers_base():
     sess = KrakenSession()
     sess.load_keys_from_file('kraken.key')
 
-    with pytest.raises(NotImplementedError):
+    with pytest.raises(InvalidRequestParameterException):
         sess.query_ledgers(1)
 
 
@@ -509,8 +592,12 @@ def test_add_standard_order_base():
     sess = KrakenSession()
     sess.load_keys_from_file('kraken.key')
 
-    with pytest.raises(NotImplementedError):
+    with pytest.raises(InvalidRequestParameterOptionsException):
         sess.add_standard_order(1, 1, 1, 1)
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.add_standard_order('XXBTZUSD', 'hold', 'limit', '1.0')
+    with pytest.raises(InvalidRequestParameterException):
+        sess.add_standard_order('XXBTZUSD', 'buy', 'limit', ['1.0'])
 
 
 def test_cancel_open_order_base():
@@ -518,8 +605,8 @@ def test_cancel_open_order_base():
     sess = KrakenSession()
     sess.load_keys_from_file('kraken.key')
 
-    with pytest.raises(NotImplementedError):
-        sess.cancel_open_order(1)
+    with pytest.raises(InvalidRequestParameterException):
+        sess.cancel_open_order(1.5)
 
 
 def test_cancel_all_open_orders_base():
@@ -536,8 +623,8 @@ def test_cancel_all_orders_after_base():
     sess = KrakenSession()
     sess.load_keys_from_file('kraken.key')
 
-    with pytest.raises(NotImplementedError):
-        sess.cancel_all_orders_after(1)
+    with pytest.raises(InvalidRequestParameterException):
+        sess.cancel_all_orders_after('60')
 
 
 def test_get_deposit_method_base():
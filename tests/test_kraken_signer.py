@@ -0,0 +1,55 @@
+from krakencli.kraken_signer import KrakenRequestSigner
+from krakencli.kraken_session import KrakenRequestManager
+
+# Example values from Kraken's REST API authentication documentation
+EXAMPLE_PRIVATE_KEY = ("kQH5HW/8p1uGOVjbgWA7FunAmGO8lsSUXNsu3eow76sz84Q18fWxnyRzB"
+                       "HCd3pd5nE9qa99HAZtuZuj6F1huXg==")
+EXAMPLE_NONCE = 1616492376594
+EXAMPLE_POST_DATA = ("nonce=1616492376594&ordertype=limit&pair=XBTUSD"
+                     "&price=37500&type=buy&volume=1.25")
+EXAMPLE_SIGNATURE = ("4/dpxb3iT4tp/ZCVEwSnEsLxx0bqyhLpdfOpc6fn7OR8+UClSV5n9E6aSS8"
+                     "MPtnRfp32bAb0nmbRn6H8ndwLUQ==")
+
+
+def test_sign():
+    signer = KrakenRequestSigner(EXAMPLE_PRIVATE_KEY, "/0/private/")
+    signature = signer.sign("AddOrder", EXAMPLE_NONCE, EXAMPLE_POST_DATA)
+    assert signature == EXAMPLE_SIGNATURE
+    # The primed HMAC must not be consumed by signing
+    assert signer.sign("AddOrder", EXAMPLE_NONCE, EXAMPLE_POST_DATA) == signature
+
+
+def test_uri_path_cached():
+    signer = KrakenRequestSigner(EXAMPLE_PRIVATE_KEY, "/0/private/")
+    path = signer.uri_path("Balance")
+    assert path == b"/0/private/Balance"
+    assert signer.uri_path("Balance") is path
+
+
+def test_request_manager_signer_follows_key():
+    req_man = KrakenRequestManager(api_key="key", private_key=EXAMPLE_PRIVATE_KEY)
+    signer = req_man._get_signer()
+    assert req_man._get_signer() is signer
+    req_man._private_key = "c2Vjb25ka2V5"
+    assert req_man._get_signer() is not signer
+    assert req_man._get_signer().private_key == "c2Vjb25ka2V5"
+
+
+def test_private_request_headers():
+    req_man = KrakenRequestManager(api_key="key", private_key=EXAMPLE_PRIVATE_KEY)
+    encoded_post_data = req_man._encode_post_data(
+        EXAMPLE_NONCE,
+        {'ordertype': 'limit', 'pair': 'XBTUSD', 'price': 37500,
+         'type': 'buy', 'volume': 1.25, 'userref': None}
+    )
+    assert encoded_post_data == EXAMPLE_POST_DATA
+    headers = req_man._make_private_request_headers("AddOrder",
+                                                    EXAMPLE_NONCE,
+                                                    encoded_post_data)
+    assert headers['API-Key'] == "key"
+    assert headers['API-Sign'] == EXAMPLE_SIGNATURE
+
+
+def test_encode_post_data_booleans():
+    req_man = KrakenRequestManager()
+    assert req_man._encode_post_data(1, {'trades': True}) == "nonce=1&trades=true"
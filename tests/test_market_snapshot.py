@@ -0,0 +1,117 @@
+import asyncio
+import urllib.parse
+from krakencli.kraken_session import KrakenSession, chunk_pairs
+from krakencli.async_kraken_session import AsyncKrakenSession
+from krakencli.kraken_api_values import KRAKEN_ASSET_PAIRS
+from krakencli.exceptions import KrakenApiErrorException
+from tests.test_utilities import FakeResponse
+
+BASE_URL = "https://api.kraken.com/0/public/Ticker"
+DELISTED = KRAKEN_ASSET_PAIRS[7]
+
+
+def fake_get(url, params=None, **kwargs):
+    return FakeResponse({pair: {'c': ["1.0", "1"]}
+                         for pair in params['pair'].split(',')})
+
+
+class DelistingServer(object):
+
+    def __init__(self, error="EQuery:Unknown asset pair"):
+        self.error = error
+        self.requests = []
+
+    def __call__(self, url, params=None, **kwargs):
+        pairs = params['pair'].split(',')
+        self.requests.append(pairs)
+        if DELISTED in pairs:
+            return FakeResponse(error=[self.error])
+        return fake_get(url, params)
+
+
+def test_chunk_pairs_fit_url_length():
+    chunks = chunk_pairs(KRAKEN_ASSET_PAIRS, BASE_URL, max_url_length=500)
+    assert ','.join(chunks).split(',') == list(KRAKEN_ASSET_PAIRS)
+    for chunk in chunks:
+        url = f"{BASE_URL}?{urllib.parse.urlencode({'pair': chunk})}"
+        assert len(url) <= 500
+    # Greedy packing leaves no room for the next chunk's first pair
+    for chunk, next_chunk in zip(chunks, chunks[1:]):
+        extended = f"{chunk},{next_chunk.split(',')[0]}"
+        url = f"{BASE_URL}?{urllib.parse.urlencode({'pair': extended})}"
+        assert len(url) > 500
+
+
+def test_chunk_pairs_small_universe():
+    assert chunk_pairs(['XXBTZUSD', 'XETHZUSD'], BASE_URL) == ['XXBTZUSD,XETHZUSD']
+    assert chunk_pairs([], BASE_URL) == []
+
+
+def test_get_market_snapshot():
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    snapshot = sess.get_market_snapshot(max_url_length=400, max_workers=4)
+    assert sorted(snapshot['result'].keys()) == sorted(KRAKEN_ASSET_PAIRS)
+    assert len(snapshot['chunks']) > 1
+    assert sum(chunk['pairs'] for chunk in snapshot['chunks']) == \
+        len(KRAKEN_ASSET_PAIRS)
+    assert all(chunk['error'] is None and chunk['elapsed'] >= 0
+               for chunk in snapshot['chunks'])
+
+
+def test_get_market_snapshot_chunk_error():
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    snapshot = sess.get_market_snapshot(pairs=['XXBTZUSD', 'BADPAIR'])
+    assert snapshot['result'] == {}
+    assert snapshot['chunks'][0]['error'] is not None
+
+
+def test_get_market_snapshot_drops_unknown_pairs():
+    server = DelistingServer()
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = server
+
+    snapshot = sess.get_market_snapshot(max_url_length=400, max_workers=4)
+    assert sorted(snapshot['result'].keys()) == \
+        sorted(pair for pair in KRAKEN_ASSET_PAIRS if pair != DELISTED)
+    assert list(snapshot['rejected']) == [DELISTED]
+    assert isinstance(snapshot['rejected'][DELISTED], KrakenApiErrorException)
+    assert all(chunk['error'] is None for chunk in snapshot['chunks'])
+    # Only the failed chunk is split, once per halving
+    assert len(server.requests) <= len(snapshot['chunks']) + 2 * 8
+
+
+def test_get_market_snapshot_does_not_split_other_errors():
+    server = DelistingServer(error="EService:Unavailable")
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = server
+
+    snapshot = sess.get_market_snapshot(pairs=KRAKEN_ASSET_PAIRS[:10])
+    assert len(server.requests) == 1
+    assert snapshot['rejected'] == {}
+    assert snapshot['chunks'][0]['error'].errors == ["EService:Unavailable"]
+
+
+def test_async_get_market_snapshot():
+    sess = AsyncKrakenSession()
+    sess._request_manager.http_session.get = fake_get
+
+    snapshot = asyncio.run(sess.get_market_snapshot(pairs=['XXBTZUSD', 'XETHZUSD'],
+                                                    max_url_length=60))
+    assert sorted(snapshot['result'].keys()) == ['XETHZUSD', 'XXBTZUSD']
+    assert [chunk['pairs'] for chunk in snapshot['chunks']] == [1, 1]
+    sess.close()
+
+
+def test_async_get_market_snapshot_drops_unknown_pairs():
+    sess = AsyncKrakenSession()
+    sess._request_manager.http_session.get = DelistingServer()
+
+    snapshot = asyncio.run(sess.get_market_snapshot(pairs=KRAKEN_ASSET_PAIRS[:10]))
+    assert sorted(snapshot['result'].keys()) == \
+        sorted(pair for pair in KRAKEN_ASSET_PAIRS[:10] if pair != DELISTED)
+    assert list(snapshot['rejected']) == [DELISTED]
+    sess.close()
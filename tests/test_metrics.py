@@ -0,0 +1,121 @@
+import datetime
+import pytest
+from krakencli.kraken_session import KrakenSession
+from krakencli.metrics import (
+    KrakenMetrics,
+    LatencyHistogram,
+    bucket_index,
+    bucket_bounds,
+)
+from krakencli.exceptions import KrakenApiErrorException
+from tests.test_utilities import FakeResponse
+
+
+class TimedResponse(FakeResponse):
+
+    def __init__(self, result=None, error=None, elapsed=0.002):
+        super().__init__(result, error)
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+
+
+def test_bucket_bounds_contain_value():
+    for micros in list(range(200)) + [1000, 4095, 4096, 123456, 10 ** 9]:
+        low, high = bucket_bounds(bucket_index(micros))
+        assert low <= micros < high
+        assert high - low <= max(1, low / 32)
+
+
+def test_bucket_index_is_monotonic():
+    indexes = [bucket_index(micros) for micros in range(100000)]
+    assert indexes == sorted(indexes)
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.record(i / 1e4)
+
+    assert histogram.count == 1000
+    assert histogram.min == pytest.approx(1e-4)
+    assert histogram.max == pytest.approx(0.1)
+    assert histogram.percentile(0.5) == pytest.approx(0.05, rel=0.04)
+    assert histogram.percentile(0.99) == pytest.approx(0.099, rel=0.04)
+    assert histogram.percentile(1.0) == pytest.approx(0.1)
+    assert histogram.count_at_or_below(0.01) == pytest.approx(100, abs=4)
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_public_request_phases():
+    metrics = KrakenMetrics()
+    sess = KrakenSession(metrics=metrics)
+    sess._request_manager.http_session.get = \
+        lambda url, params=None, **kwargs: TimedResponse({'unixtime': 1})
+
+    sess.get_server_time()
+    sess.get_server_time()
+    snapshot = metrics.snapshot()
+    phases = snapshot['latency']['Time']
+    assert set(phases) == {'validate', 'rate_limit', 'http', 'http_headers',
+                           'decode', 'total'}
+    assert all(phase['count'] == 2 for phase in phases.values())
+    assert phases['http_headers']['max'] == pytest.approx(0.002)
+    assert snapshot['bytes']['Time'] == {
+        'sent': 0,
+        'received': 2 * len(TimedResponse({'unixtime': 1}).content)
+    }
+    assert snapshot['errors'] == {}
+
+
+def test_private_request_phases_and_errors(private_session):
+    metrics = KrakenMetrics()
+    responses = [FakeResponse({'ZUSD': "1.0"}),
+                 FakeResponse(error=["EAPI:Invalid nonce"])]
+    sess = private_session(lambda url, headers=None, data=None, **kwargs:
+                           responses.pop(0),
+                           metrics=metrics)
+
+    sess.get_account_balance()
+    with pytest.raises(KrakenApiErrorException):
+        sess.get_account_balance()
+
+    snapshot = metrics.snapshot()
+    assert set(snapshot['latency']['Balance']) == {'validate', 'rate_limit', 'sign',
+                                                   'http', 'decode', 'total'}
+    assert snapshot['latency']['Balance']['total']['count'] == 1
+    assert snapshot['bytes']['Balance']['sent'] > 0
+    assert snapshot['errors'] == {'Balance': {'KrakenApiErrorException': 1}}
+
+
+def test_prometheus_export():
+    metrics = KrakenMetrics()
+    metrics.record('Ticker', 'http', 0.003)
+    metrics.record('Ticker', 'http', 0.2)
+    metrics.add_bytes('Ticker', 10, 500)
+    metrics.add_error('Ticker', 'ConnectionError')
+
+    text = metrics.to_prometheus()
+    assert '# TYPE krakencli_request_duration_seconds histogram' in text
+    labels = 'endpoint="Ticker",phase="http"'
+    assert f'krakencli_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+    assert f'krakencli_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f'krakencli_request_duration_seconds_count{{{labels}}} 2' in text
+    assert 'krakencli_request_bytes_total{endpoint="Ticker",direction="received"} 500' \
+        in text
+    errors = 'krakencli_request_errors_total{endpoint="Ticker",error="ConnectionError"}'
+    assert f'{errors} 1' in text
+    assert text.endswith("\n")
+
+
+def test_disabled_metrics_record_nothing():
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = \
+        lambda url, params=None, **kwargs: FakeResponse({'unixtime': 1})
+    assert sess.get_server_time() == {'unixtime': 1}
+    assert sess._request_manager._metrics is None
+
+
+def test_reset():
+    metrics = KrakenMetrics()
+    metrics.record('Time', 'http', 0.1)
+    metrics.reset()
+    assert metrics.snapshot() == {'latency': {}, 'bytes': {}, 'errors': {}}
@@ -0,0 +1,89 @@
+import multiprocessing
+import threading
+import time
+from krakencli.nonce import (
+    CounterNonceGenerator,
+    MicrosecondNonceGenerator,
+    SharedFileNonceGenerator,
+    microseconds_now,
+)
+from krakencli.kraken_session import KrakenRequestManager
+
+NONCES_PER_WORKER = 2000
+
+
+def collect_from_threads(generator, num_threads=8):
+    results = [None] * num_threads
+
+    def worker(i):
+        results[i] = [generator.next_nonce() for x in range(NONCES_PER_WORKER)]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for nonces in results:
+        assert nonces == sorted(nonces)
+    return [nonce for nonces in results for nonce in nonces]
+
+
+def test_counter_nonce_generator_threads():
+    generator = CounterNonceGenerator()
+    nonces = collect_from_threads(generator)
+    assert len(set(nonces)) == len(nonces)
+    assert CounterNonceGenerator(start=5).next_nonce() == 5
+
+
+def test_microsecond_nonce_generator_threads():
+    before = microseconds_now()
+    generator = MicrosecondNonceGenerator()
+    nonces = collect_from_threads(generator)
+    assert len(set(nonces)) == len(nonces)
+    assert min(nonces) >= before
+
+
+def shared_file_worker(file_path, queue):
+    generator = SharedFileNonceGenerator(file_path)
+    queue.put([generator.next_nonce() for x in range(NONCES_PER_WORKER)])
+    generator.close()
+
+
+def test_shared_file_nonce_generator_processes(tmp_path):
+    file_path = str(tmp_path / "nonce")
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=shared_file_worker,
+                                         args=(file_path, queue))
+                 for x in range(4)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for process in processes]
+    for process in processes:
+        process.join()
+
+    nonces = [nonce for nonces in results for nonce in nonces]
+    assert len(set(nonces)) == len(nonces)
+
+    generator = SharedFileNonceGenerator(file_path)
+    assert generator.next_nonce() > max(nonces)
+    generator.close()
+
+
+def test_request_manager_nonce_generator():
+    generator = MicrosecondNonceGenerator()
+    req_man = KrakenRequestManager(nonce_generator=generator)
+    assert req_man._nonce_generator is generator
+    assert req_man.get_next_nonce() < req_man.get_next_nonce()
+
+
+def test_default_nonces_follow_the_clock():
+    first = KrakenRequestManager()
+    first.get_next_nonce()
+    time.sleep(0.01)
+    second = KrakenRequestManager()
+    assert isinstance(first._nonce_generator, MicrosecondNonceGenerator)
+    # An older session is not left behind by one created after it
+    second_nonce = second.get_next_nonce()
+    time.sleep(0.001)
+    assert first.get_next_nonce() > second_nonce
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import threading
+import urllib.parse
+import pytest
+from krakencli.async_kraken_session import AsyncKrakenSession
+from krakencli.kraken_signer import KrakenRequestSigner
+from krakencli.exceptions import (
+    InvalidRequestParameterException,
+    InvalidRequestParameterOptionsException,
+    KrakenApiErrorException,
+)
+from tests.test_utilities import FakeResponse, SlowNonceGenerator, TEST_PRIVATE_KEY
+
+
+class FakeOrderServer(object):
+
+    def __init__(self, reject_prices=()):
+        self.requests = []
+        self.reject_prices = reject_prices
+        self.lock = threading.Lock()
+
+    def __call__(self, url, headers=None, data=None, **kwargs):
+        endpoint = url.rsplit('/', 1)[-1]
+        if headers['Content-Type'] == 'application/json':
+            body = json.loads(data)
+        else:
+            body = dict(urllib.parse.parse_qsl(data))
+        with self.lock:
+            self.requests.append((endpoint, headers, data, body))
+        if endpoint == 'AddOrderBatch':
+            orders = []
+            for i, order in enumerate(body['orders']):
+                if order.get('price') in self.reject_prices:
+                    orders.append({'error': 'EOrder:Insufficient funds'})
+                else:
+                    orders.append({'txid': f"{body['pair']}-{i}",
+                                   'descr': {'order': order['type']}})
+            return FakeResponse({'orders': orders})
+        if endpoint == 'AddOrder':
+            return FakeResponse({'txid': [f"{body['pair']}-single"]})
+        if endpoint == 'CancelOrderBatch':
+            return FakeResponse({'count': len(body['orders'])})
+        return FakeResponse({'count': 1})
+
+
+def ladder(pair, count, start=100):
+    return [{'pair': pair, 'type': 'buy', 'ordertype': 'limit',
+             'volume': "0.1", 'price': start + i} for i in range(count)]
+
+
+def test_add_order_batch_json_body(private_session):
+    server = FakeOrderServer()
+    sess = private_session(server)
+
+    result = sess.add_order_batch('XXBTZUSD',
+                                  [{'type': 'buy', 'ordertype': 'limit',
+                                    'volume': 0.5, 'price': 100},
+                                   {'type': 'sell', 'ordertype': 'limit',
+                                    'volume': "0.5", 'price': "110.5"}],
+                                  validate=True)
+    assert len(result['orders']) == 2
+
+    endpoint, headers, data, body = server.requests[0]
+    assert endpoint == 'AddOrderBatch'
+    assert body['pair'] == 'XXBTZUSD'
+    assert body['validate'] is True
+    assert body['orders'][0] == {'type': 'buy', 'ordertype': 'limit',
+                                 'volume': "0.5", 'price': "100"}
+    signer = KrakenRequestSigner(TEST_PRIVATE_KEY, "/0/private/")
+    assert headers['API-Sign'] == signer.sign('AddOrderBatch', body['nonce'], data)
+
+
+def test_add_order_batch_validation(private_session):
+    sess = private_session(FakeOrderServer())
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        sess.add_order_batch('XXBTZUSD', [{'type': 'buy', 'ordertype': 'iceberg',
+                                           'volume': "1"}])
+    with pytest.raises(InvalidRequestParameterException):
+        sess.add_order_batch('XXBTZUSD', ladder('XXBTZUSD', 16))
+    with pytest.raises(InvalidRequestParameterException):
+        sess.add_order_batch('XXBTZUSD', [])
+
+
+def test_batch_arguments_rejected_per_order(private_session):
+    server = FakeOrderServer()
+    sess = private_session(server)
+    orders = ladder('XXBTZUSD', 2)
+    with pytest.raises(InvalidRequestParameterException):
+        sess.add_order_batch('XXBTZUSD', orders)
+    with pytest.raises(InvalidRequestParameterException):
+        sess.add_orders([dict(orders[0], validate=True)])
+    with pytest.raises(InvalidRequestParameterException):
+        sess.add_orders(orders + [dict(orders[1], deadline="+5")])
+    assert server.requests == []
+
+
+def test_add_orders_groups_by_pair(private_session):
+    server = FakeOrderServer(reject_prices=("103",))
+    sess = private_session(server)
+    orders = ladder('XXBTZUSD', 20) + ladder('XETHZUSD', 1)
+
+    results = sess.add_orders(orders, max_workers=3)
+    assert len(results) == 21
+    endpoints = sorted(endpoint for endpoint, headers, data, body in server.requests)
+    assert endpoints == ['AddOrder', 'AddOrderBatch', 'AddOrderBatch']
+    assert results[0] == {'result': {'txid': "XXBTZUSD-0",
+                                     'descr': {'order': 'buy'}},
+                          'error': None}
+    assert results[15]['result']['txid'] == "XXBTZUSD-0"
+    assert isinstance(results[3]['error'], KrakenApiErrorException)
+    assert results[20] == {'result': {'txid': ["XETHZUSD-single"]}, 'error': None}
+    nonces = [int(body['nonce']) for endpoint, headers, data, body in server.requests]
+    assert len(set(nonces)) == 3
+    assert nonces == sorted(nonces)
+
+
+def test_concurrent_batches_reach_server_in_nonce_order(private_session):
+    server = FakeOrderServer()
+    sess = private_session(server, nonce_generator=SlowNonceGenerator())
+    orders = [order for i in range(8) for order in ladder('XXBTZUSD', 2, 100 * i)]
+    orders = [dict(order, pair=pair) for order, pair in
+              zip(orders, ['XXBTZUSD', 'XETHZUSD', 'XLTCZUSD', 'XXRPZUSD'] * 4)]
+
+    sess.add_orders(orders, max_workers=8)
+    sess.cancel_orders([f"O{i}" for i in range(400)], max_workers=8)
+    nonces = [int(body['nonce']) for endpoint, headers, data, body in server.requests]
+    assert len(nonces) == 12
+    assert nonces == sorted(nonces)
+
+
+def test_nonce_window_sends_concurrently(private_session):
+    barrier = threading.Barrier(2, timeout=5)
+    server = FakeOrderServer()
+
+    def post(*args, **kwargs):
+        barrier.wait()
+        return server(*args, **kwargs)
+
+    sess = private_session(post, nonce_window=True)
+    results = sess.cancel_orders([f"O{i}" for i in range(100)], max_workers=2)
+    assert all(result['error'] is None for result in results.values())
+
+
+def test_add_orders_chunk_error_applies_to_its_orders(private_session):
+    server = FakeOrderServer()
+    sess = private_session(server)
+    orders = ladder('XXBTZUSD', 2) + ladder('NOTAPAIR', 2)
+
+    results = sess.add_orders(orders)
+    assert results[0]['error'] is None
+    assert all(isinstance(result['error'], InvalidRequestParameterOptionsException)
+               for result in results[2:])
+
+
+def test_cancel_orders_one_round_trip(private_session):
+    server = FakeOrderServer()
+    sess = private_session(server)
+    txids = [f"O{i}" for i in range(50)]
+
+    results = sess.cancel_orders(txids)
+    assert len(server.requests) == 1
+    endpoint, headers, data, body = server.requests[0]
+    assert endpoint == 'CancelOrderBatch'
+    assert body['orders'] == txids
+    assert results['O7'] == {'result': {'count': 50}, 'error': None}
+
+
+def test_cancel_orders_chunks_and_single(private_session):
+    server = FakeOrderServer()
+    sess = private_session(server)
+
+    results = sess.cancel_orders([f"O{i}" for i in range(51)])
+    assert sorted(endpoint for endpoint, headers, data, body in server.requests) == \
+        ['CancelOrder', 'CancelOrderBatch']
+    assert results['O50'] == {'result': {'count': 1}, 'error': None}
+    single = [body for endpoint, headers, data, body in server.requests
+              if endpoint == 'CancelOrder']
+    assert single[0]['txid'] == "O50"
+
+
+def test_async_add_orders_and_cancel(private_session):
+    server = FakeOrderServer()
+    sess = private_session(server, AsyncKrakenSession)
+
+    async def run():
+        placed = await sess.add_orders(ladder('XXBTZUSD', 4))
+        cancelled = await sess.cancel_orders(["A", "B"])
+        return placed, cancelled
+
+    placed, cancelled = asyncio.run(run())
+    assert [result['result']['txid'] for result in placed] == \
+        [f"XXBTZUSD-{i}" for i in range(4)]
+    assert cancelled['B'] == {'result': {'count': 2}, 'error': None}
+    sess.close()
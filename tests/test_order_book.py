@@ -0,0 +1,86 @@
+import random
+import zlib
+import pytest
+from krakencli.order_book import OrderBook, OrderBookSide
+from krakencli.exceptions import InvalidOrderBookChecksumException
+
+SNAPSHOT = {
+    'XXBTZUSD': {
+        'asks': [["52600.10000", "1.500", 1616663113],
+                 ["52601.00000", "0.250", 1616663112],
+                 ["52605.50000", "3.000", 1616663110]],
+        'bids': [["52599.90000", "0.800", 1616663113],
+                 ["52598.00000", "2.000", 1616663111]],
+    }
+}
+
+
+def test_apply_snapshot():
+    book = OrderBook('XXBTZUSD')
+    assert book.apply_snapshot(SNAPSHOT) == 5
+    assert book.best_ask == ("52600.10000", "1.500", 1616663113)
+    assert book.best_bid == ("52599.90000", "0.800", 1616663113)
+    assert book.spread == pytest.approx(0.2)
+    assert book.mid_price == pytest.approx(52600.0)
+    assert book.asks.get("52601.0") == ("52601.00000", "0.250", 1616663112)
+    assert book.bids.get(52597) is None
+
+
+def test_apply_snapshot_as_diff():
+    book = OrderBook()
+    book.apply_snapshot(SNAPSHOT)
+    assert book.apply_snapshot(SNAPSHOT['XXBTZUSD']) == 0
+
+    book.apply_snapshot({
+        'asks': [["52600.10000", "1.000", 1616663120],
+                 ["52605.50000", "3.000", 1616663110]],
+        'bids': [["52599.95000", "0.100", 1616663121],
+                 ["52599.90000", "0.800", 1616663113],
+                 ["52598.00000", "2.000", 1616663111]],
+    })
+    assert book.asks.levels() == [("52600.10000", "1.000", 1616663120),
+                                  ("52605.50000", "3.000", 1616663110)]
+    assert book.best_bid == ("52599.95000", "0.100", 1616663121)
+    assert len(book.bids) == 3
+
+
+def test_side_update():
+    side = OrderBookSide(descending=True)
+    assert side.best() is None
+    assert side.update("10.0", "1.0", 1)
+    assert side.update("12.0", "1.0", 1)
+    assert side.update("11.0", "1.0", 1)
+    assert [level[0] for level in side.levels()] == ["12.0", "11.0", "10.0"]
+    assert not side.update("9.0", "0.0", 1)
+    assert side.update("12.0", "0.0", 2)
+    assert side.best()[0] == "11.0"
+
+
+def test_side_stays_sorted_under_many_updates():
+    side = OrderBookSide(descending=False)
+    rng = random.Random(7)
+    prices = {}
+    for i in range(2000):
+        price = f"{rng.randrange(10000, 12000) / 10:.1f}"
+        volume = rng.choice(["0", "1.0", "2.5"])
+        side.update(price, volume, i)
+        if volume == "0":
+            prices.pop(price, None)
+        else:
+            prices[price] = volume
+    expected = sorted(prices, key=float)
+    assert [level[0] for level in side.levels()] == expected
+    assert [level[0] for level in side.levels(10)] == expected[:10]
+    assert side.best()[0] == expected[0]
+
+
+def test_checksum():
+    book = OrderBook('XXBTZUSD')
+    book.apply_snapshot(SNAPSHOT)
+    expected = zlib.crc32(b"5260010000" b"1500" b"5260100000" b"250"
+                          b"5260550000" b"3000" b"5259990000" b"800"
+                          b"5259800000" b"2000")
+    assert book.checksum() == expected
+    assert book.verify_checksum(expected) == expected
+    with pytest.raises(InvalidOrderBookChecksumException):
+        book.verify_checksum(expected + 1)
@@ -0,0 +1,158 @@
+import threading
+import urllib.parse
+import pytest
+from krakencli.kraken_signer import KrakenRequestSigner
+from krakencli.order_entry import KrakenOrderEntry
+from krakencli.exceptions import (
+    NoApiKeysException,
+    InvalidRequestParameterException,
+    InvalidRequestParameterOptionsException,
+)
+from tests.test_utilities import FakeResponse, SlowNonceGenerator, TEST_PRIVATE_KEY
+
+PAIR_INFO = {'altname': 'XBTUSD', 'pair_decimals': 1, 'lot_decimals': 8,
+             'ordermin': '0.0001'}
+
+
+class FakeExchange(object):
+
+    def __init__(self):
+        self.gets = []
+        self.posts = []
+
+    def get(self, url, params=None, **kwargs):
+        self.gets.append((url, params))
+        if url.endswith('AssetPairs'):
+            return FakeResponse({'XXBTZUSD': PAIR_INFO})
+        return FakeResponse({'unixtime': 0})
+
+    def post(self, url, headers=None, data=None, **kwargs):
+        self.posts.append((url, headers, data))
+        if url.endswith('Balance'):
+            return FakeResponse({'ZUSD': "1.0"})
+        return FakeResponse({'descr': {'order': 'ok'}, 'txid': ['OABC']})
+
+    def close(self):
+        pass
+
+
+def make_order_entry(private_session, session_kwargs={}, **kwargs):
+    exchange = FakeExchange()
+    sess = private_session(exchange.post, **session_kwargs)
+    sess._request_manager.http_session.get = exchange.get
+    sess._request_manager._make_http_session = lambda: exchange
+    return sess, exchange, KrakenOrderEntry(sess, **kwargs)
+
+
+def test_submit_limit_order(private_session):
+    sess, exchange, entry = make_order_entry(private_session)
+
+    order = entry.submit('XXBTZUSD', 'buy', 'limit', 0.5, price=30000.1,
+                         oflags='post')
+    assert order['result']['txid'] == ['OABC']
+    assert set(order['timings']) == {'prepare', 'sign', 'send', 'decode', 'total'}
+    assert all(value >= 0 for value in order['timings'].values())
+
+    url, headers, data = exchange.posts[0]
+    assert url == "https://api.kraken.com/0/private/AddOrder"
+    fields = dict(urllib.parse.parse_qsl(data))
+    assert fields['volume'] == "0.50000000"
+    assert fields['price'] == "30000.1"
+    assert fields['oflags'] == "post"
+    assert data.startswith(f"nonce={fields['nonce']}&")
+    signer = KrakenRequestSigner(TEST_PRIVATE_KEY, "/0/private/")
+    assert headers['API-Sign'] == signer.sign('AddOrder', fields['nonce'], data)
+
+
+def test_template_is_prepared_once(private_session):
+    sess, exchange, entry = make_order_entry(private_session)
+
+    template = entry.prepare('XXBTZUSD', 'sell', 'limit')
+    for price in ("30000", "30001.50"):
+        entry.submit('XXBTZUSD', 'sell', 'limit', "0.001", price=price)
+    assert entry.prepare('XXBTZUSD', 'sell', 'limit') is template
+    assert len([url for url, params in exchange.gets
+                if url.endswith('AssetPairs')]) == 1
+    prices = [dict(urllib.parse.parse_qsl(data))['price']
+              for url, headers, data in exchange.posts]
+    assert prices == ["30000.0", "30001.5"]
+    nonces = [int(dict(urllib.parse.parse_qsl(data))['nonce'])
+              for url, headers, data in exchange.posts]
+    assert nonces[0] < nonces[1]
+
+
+def test_relative_price_passes_through(private_session):
+    sess, exchange, entry = make_order_entry(private_session)
+    entry.submit('XXBTZUSD', 'buy', 'stop-loss-limit', "0.01", price="+1.5",
+                 price2="#2%")
+    fields = dict(urllib.parse.parse_qsl(exchange.posts[0][2]))
+    assert fields['price'] == "+1.5"
+    assert fields['price2'] == "#2%"
+
+
+def test_validation(private_session):
+    sess, exchange, entry = make_order_entry(private_session)
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        entry.submit('XXBTZUSD', 'buy', 'iceberg', "1")
+    with pytest.raises(InvalidRequestParameterException):
+        entry.submit('XXBTZUSD', 'buy', 'limit', "0.00001", price=1)
+    with pytest.raises(InvalidRequestParameterException):
+        entry.prepare('XXBTZUSD', 'buy', 'limit', price="1")
+    assert exchange.posts == []
+
+    sess.set_api_key(None)
+    with pytest.raises(NoApiKeysException):
+        entry.prepare('XXBTZUSD', 'sell', 'market')
+
+
+def test_warm_and_dedicated_connection(private_session):
+    sess, exchange, entry = make_order_entry(private_session)
+    entry.warm()
+    assert exchange.gets == [("https://api.kraken.com/0/public/Time", None)]
+
+    shared = KrakenOrderEntry(sess, dedicated_connection=False)
+    assert shared.http_session is sess._request_manager.http_session
+
+
+def test_float_volumes(private_session):
+    sess, exchange, entry = make_order_entry(private_session)
+    entry.submit('XXBTZUSD', 'buy', 'limit', 0.00015, price=100)
+    entry.submit('XXBTZUSD', 'buy', 'limit', 1e-4, price=100)
+    volumes = [dict(urllib.parse.parse_qsl(data))['volume']
+               for url, headers, data in exchange.posts]
+    assert volumes == ["0.00015000", "0.00010000"]
+    with pytest.raises(InvalidRequestParameterException):
+        entry.submit('XXBTZUSD', 'buy', 'limit', 0.00005, price=100)
+
+
+@pytest.mark.parametrize('price', ["52000.06", 52000.06, "52000.15"])
+def test_excess_price_precision_is_rejected(price, private_session):
+    sess, exchange, entry = make_order_entry(private_session)
+    with pytest.raises(InvalidRequestParameterException):
+        entry.submit('XXBTZUSD', 'buy', 'limit', "0.01", price=price)
+    with pytest.raises(InvalidRequestParameterException):
+        entry.submit('XXBTZUSD', 'buy', 'limit', "0.000100001", price=52000)
+    assert exchange.posts == []
+
+
+def test_orders_and_session_requests_reach_server_in_nonce_order(private_session):
+    sess, exchange, entry = make_order_entry(
+        private_session, {'nonce_generator': SlowNonceGenerator()})
+    entry.prepare('XXBTZUSD', 'buy', 'limit')
+
+    def balances():
+        for i in range(5):
+            sess.get_account_balance()
+
+    threads = [threading.Thread(target=balances) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for i in range(5):
+        entry.submit('XXBTZUSD', 'buy', 'limit', "0.01", price=100 + i)
+    for thread in threads:
+        thread.join()
+
+    nonces = [int(dict(urllib.parse.parse_qsl(data))['nonce'])
+              for url, headers, data in exchange.posts]
+    assert len(nonces) == 20
+    assert nonces == sorted(nonces)
@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import urllib.parse
+from krakencli.pagination import (
+    split_page,
+    page_window,
+    split_offset_page,
+    page_offsets,
+    unseen_rows
+)
+from krakencli.kraken_session import KrakenSession
+from krakencli.async_kraken_session import AsyncKrakenSession
+from krakencli.rate_limiter import KrakenRateLimiter
+from tests.test_utilities import FakeResponse
+
+TRADES = [[f"{100 + i}.0", "1.0", 1000.0 + i, "b", "l", ""] for i in range(25)]
+PAGE_SIZE = 10
+
+
+class FakeTradesServer(object):
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, url, params=None, **kwargs):
+        since = params.get('since', 0)
+        self.requests.append(since)
+        if since > 1e12:
+            since = since / 1e9
+        rows = [trade for trade in TRADES if trade[2] > since][:PAGE_SIZE]
+        last = rows[-1][2] if rows else since
+        return FakeResponse({'XXBTZUSD': rows, 'last': str(int(last * 1e9))})
+
+
+LEDGER = [(f"L{i:04d}", {'time': 2000.0 - i, 'asset': 'XXBT'}) for i in range(137)]
+
+
+class FakeLedgerServer(object):
+
+    def __init__(self, ledger=LEDGER):
+        self.ledger = ledger
+        self.offsets = []
+        self.nonces = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url, headers=None, data=None, **kwargs):
+        params = dict(urllib.parse.parse_qsl(data))
+        ofs = int(params.get('ofs', 0))
+        with self.lock:
+            self.offsets.append(ofs)
+            self.nonces.append(int(params['nonce']))
+        return FakeResponse({'ledger': dict(self.ledger[ofs:ofs + 50]),
+                             'count': len(self.ledger)})
+
+
+def test_split_page():
+    assert split_page({'XXBTZUSD': [[1]], 'last': 5}) == ([[1]], 5)
+    assert split_page({'last': 5}) == ([], 5)
+
+
+def test_page_window():
+    rows = [[1, "a"], [2, "b"], [3, "c"]]
+    assert page_window({'X': rows, 'last': 3}, None, None, 0) == (rows, 3, False)
+    assert page_window({'X': rows, 'last': 3}, 3, None, 0) == (rows, 3, True)
+    assert page_window({'X': rows, 'last': 3}, None, 2, 0) == (rows[:1], 3, True)
+    assert page_window({'X': [], 'last': 3}, 1, None, 0) == ([], 3, True)
+
+
+def test_iter_trades():
+    server = FakeTradesServer()
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = server
+
+    trades = list(sess.iter_trades('XXBTZUSD', start=999))
+    assert trades == TRADES
+    assert len(server.requests) == 4
+
+
+def test_iter_trades_end():
+    server = FakeTradesServer()
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = server
+
+    trades = list(sess.iter_trades('XXBTZUSD', start=1002, end=1015, prefetch=False))
+    assert [trade[2] for trade in trades] == [1000.0 + i for i in range(3, 15)]
+    assert len(server.requests) == 2
+
+
+def test_iter_trades_respects_public_rate_limiter():
+    server = FakeTradesServer()
+    sleeps = []
+    limiter = KrakenRateLimiter(max_counter=1,
+                                decay_rate=1,
+                                clock=lambda: 0,
+                                sleep=sleeps.append)
+    sess = KrakenSession(public_rate_limiter=limiter)
+    sess._request_manager.http_session.get = server
+
+    list(sess.iter_trades('XXBTZUSD', start=999))
+    assert len(sleeps) == 3
+
+
+def test_iter_ohlc_data():
+    bars = [[60 * i, "1", "1", "1", "1", "1", "1", 1] for i in range(1, 8)]
+
+    def fake_get(url, params=None, **kwargs):
+        since = params.get('since', 0)
+        rows = [bar for bar in bars if bar[0] > since][:3]
+        return FakeResponse({'XXBTZUSD': rows, 'last': rows[-1][0] if rows else since})
+
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = fake_get
+    assert list(sess.iter_ohlc_data('XXBTZUSD', interval=1)) == bars
+
+
+def test_async_iter_trades():
+    server = FakeTradesServer()
+    sess = AsyncKrakenSession()
+    sess._request_manager.http_session.get = server
+
+    async def collect():
+        return [trade async for trade in sess.iter_trades('XXBTZUSD', start=999)]
+
+    assert asyncio.run(collect()) == TRADES
+    sess.close()
+
+
+def test_split_offset_page():
+    assert split_offset_page({'closed': {'A': 1}, 'count': 3}, 'closed') == \
+        ([('A', 1)], 3)
+    assert split_offset_page({}, 'closed') == ([], 0)
+
+
+def test_page_offsets():
+    assert list(page_offsets(137)) == [50, 100]
+    assert list(page_offsets(50)) == []
+    assert list(page_offsets(0)) == []
+
+
+def test_unseen_rows():
+    seen = set()
+    assert list(unseen_rows([('A', 1), ('B', 2)], seen)) == [('A', 1), ('B', 2)]
+    assert list(unseen_rows([('B', 2), ('C', 3)], seen)) == [('C', 3)]
+
+
+def test_iter_ledgers_info(private_session):
+    server = FakeLedgerServer()
+    sess = private_session(server)
+
+    assert list(sess.iter_ledgers_info(max_workers=2)) == LEDGER
+    assert sorted(server.offsets) == [0, 50, 100]
+
+
+def test_iter_ledgers_info_pages_reach_server_in_nonce_order(private_session):
+    server = FakeLedgerServer([(f"L{i:04d}", {'time': i}) for i in range(500)])
+    sess = private_session(server)
+
+    assert len(list(sess.iter_ledgers_info(max_workers=4))) == 500
+    assert len(server.nonces) == 10
+    assert server.nonces == sorted(server.nonces)
+
+
+def test_iter_closed_orders_single_page(private_session):
+    def fake_post(url, headers=None, data=None, **kwargs):
+        return FakeResponse({'closed': {'O1': {'status': 'closed'}}, 'count': 1})
+
+    sess = private_session(fake_post)
+    assert list(sess.iter_closed_orders()) == [('O1', {'status': 'closed'})]
+
+
+def test_iter_trades_history_skips_shifted_rows(private_session):
+    trades = [(f"T{i}", {'time': i}) for i in range(60)]
+    calls = []
+
+    def fake_post(url, headers=None, data=None, **kwargs):
+        ofs = int(dict(urllib.parse.parse_qsl(data)).get('ofs', 0))
+        calls.append(ofs)
+        # A new trade lands after the first page, shifting later pages by one
+        rows = trades if not ofs else [("T-new", {'time': 99})] + trades
+        return FakeResponse({'trades': dict(rows[ofs:ofs + 50]), 'count': len(rows)})
+
+    sess = private_session(fake_post)
+    assert list(sess.iter_trades_history()) == trades
+
+
+def test_iter_ledgers_info_uses_rate_limiter(private_session):
+    server = FakeLedgerServer()
+    sleeps = []
+    limiter = KrakenRateLimiter(max_counter=2,
+                                decay_rate=1,
+                                clock=lambda: 0,
+                                sleep=sleeps.append)
+    sess = private_session(server)
+    sess._request_manager._rate_limiter = limiter
+
+    assert len(list(sess.iter_ledgers_info())) == len(LEDGER)
+    assert len(sleeps) == 2
+
+
+def test_async_iter_ledgers_info(private_session):
+    server = FakeLedgerServer()
+    sess = private_session(server, AsyncKrakenSession)
+
+    async def collect():
+        return [row async for row in sess.iter_ledgers_info(max_workers=2)]
+
+    assert asyncio.run(collect()) == LEDGER
+    assert sorted(server.offsets) == [0, 50, 100]
+    sess.close()
@@ -0,0 +1,65 @@
+import pytest
+from krakencli.rate_limiter import KrakenRateLimiter
+from krakencli.kraken_session import KrakenSession
+from krakencli.exceptions import InvalidRateLimitTierException
+from tests.test_utilities import FakeClock
+
+
+def make_limiter(**kwargs):
+    clock = FakeClock()
+    limiter = KrakenRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+    return limiter, clock
+
+
+def test_bad_tier():
+    with pytest.raises(InvalidRateLimitTierException):
+        KrakenRateLimiter(tier='unknown')
+
+
+def test_endpoint_costs():
+    limiter, clock = make_limiter(endpoint_costs={'Balance': 3})
+    assert limiter.cost('Ledgers') == 2
+    assert limiter.cost('TradesHistory') == 2
+    assert limiter.cost('AddOrder') == 0
+    assert limiter.cost('OpenOrders') == 1
+    assert limiter.cost('Balance') == 3
+
+
+def test_acquire_within_limit_does_not_wait():
+    limiter, clock = make_limiter(tier='starter')
+    for i in range(15):
+        assert limiter.acquire('Balance') == 0
+    assert clock.sleeps == []
+    assert limiter.counter == 15
+
+
+def test_acquire_paces_when_full():
+    limiter, clock = make_limiter(tier='pro')
+    for i in range(10):
+        limiter.acquire('Ledgers')
+    wait = limiter.acquire('TradesHistory')
+    assert wait == pytest.approx(2.0)
+    assert clock.sleeps == [pytest.approx(2.0)]
+    assert limiter.counter == pytest.approx(20)
+
+
+def test_counter_decays():
+    limiter, clock = make_limiter(tier='intermediate')
+    limiter.acquire('Ledgers')
+    clock.now += 2
+    assert limiter.counter == pytest.approx(1.0)
+    clock.now += 10
+    assert limiter.counter == 0
+
+
+def test_free_endpoints_never_wait():
+    limiter, clock = make_limiter(max_counter=1, decay_rate=1)
+    limiter.acquire('Balance')
+    assert limiter.acquire('AddOrder') == 0
+    assert clock.sleeps == []
+
+
+def test_session_uses_rate_limiter():
+    limiter, clock = make_limiter()
+    sess = KrakenSession(rate_limiter=limiter)
+    assert sess._request_manager._rate_limiter is limiter
@@ -0,0 +1,87 @@
+import pytest
+from krakencli.columnar import rows_to_columns, OHLC_COLUMNS, TRADES_COLUMNS
+from krakencli.resampler import (
+    parse_interval,
+    resample_ohlc,
+    resample_trades,
+    OHLCResampler,
+)
+
+
+def make_bars(count, start=0):
+    rows = []
+    for i in range(start, start + count):
+        price = 100.0 + i
+        rows.append([60 * i, str(price), str(price + 2), str(price - 1),
+                     str(price + 1), str(price + 0.5), "2.0", 3])
+    return rows_to_columns(rows, OHLC_COLUMNS)
+
+
+def test_parse_interval():
+    assert parse_interval(5) == 300
+    assert parse_interval('3m') == 180
+    assert parse_interval('2h') == 7200
+    assert parse_interval('45s') == 45
+
+
+def test_resample_ohlc(backend):
+    bars = resample_ohlc(make_bars(7), '3m')
+    assert list(bars['time']) == [0, 180, 360]
+    assert list(bars['open']) == [100.0, 103.0, 106.0]
+    assert list(bars['high']) == [104.0, 107.0, 108.0]
+    assert list(bars['low']) == [99.0, 102.0, 105.0]
+    assert list(bars['close']) == [103.0, 106.0, 107.0]
+    assert list(bars['volume']) == [6.0, 6.0, 2.0]
+    assert list(bars['count']) == [9, 9, 3]
+    assert list(bars['vwap']) == pytest.approx([101.5, 104.5, 106.5])
+
+
+def test_resample_empty(backend):
+    bars = resample_ohlc(make_bars(0), 5)
+    assert len(bars['time']) == 0
+
+
+def test_resample_trades(backend):
+    trades = rows_to_columns([["10.0", "1.0", 0.5, "b", "l", ""],
+                              ["12.0", "3.0", 30.0, "s", "l", ""],
+                              ["11.0", "1.0", 61.0, "b", "m", ""]],
+                             TRADES_COLUMNS)
+    bars = resample_trades(trades, 1)
+    assert list(bars['time']) == [0, 60]
+    assert list(bars['open']) == [10.0, 11.0]
+    assert list(bars['high']) == [12.0, 11.0]
+    assert list(bars['close']) == [12.0, 11.0]
+    assert list(bars['volume']) == [4.0, 1.0]
+    assert list(bars['vwap']) == pytest.approx([11.5, 11.0])
+    assert list(bars['count']) == [2, 1]
+
+
+def test_incremental_matches_batch(backend):
+    resampler = OHLCResampler('3m')
+    completed = [resampler.update(make_bars(4)),
+                 resampler.update(make_bars(3, start=4))]
+    assert [list(bars['time']) for bars in completed] == [[0], [180]]
+    assert list(completed[1]['close']) == [106.0]
+
+    current = resampler.current()
+    assert current['time'] == 360
+    assert current['close'] == 107.0
+
+    # A revised copy of the open bar replaces the held back one
+    revised = make_bars(1, start=6)
+    revised['close'][0] = 110.0
+    assert len(resampler.update(revised)['time']) == 0
+    assert resampler.current()['close'] == 110.0
+    assert resampler.current()['count'] == 3
+
+
+def test_incremental_trades(backend):
+    resampler = OHLCResampler(1, source='trades')
+    first = rows_to_columns([["10.0", "1.0", 1.0, "b", "l", ""]], TRADES_COLUMNS)
+    second = rows_to_columns([["11.0", "1.0", 2.0, "b", "l", ""],
+                              ["12.0", "1.0", 65.0, "b", "l", ""]], TRADES_COLUMNS)
+    assert len(resampler.update(first)['time']) == 0
+    bars = resampler.update(second)
+    assert list(bars['count']) == [2]
+    assert list(bars['close']) == [11.0]
+    assert resampler.current()['open'] == 12.0
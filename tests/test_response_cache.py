@@ -0,0 +1,68 @@
+from krakencli.response_cache import KrakenResponseCache
+from krakencli.kraken_session import KrakenSession
+from tests.test_utilities import FakeClock, FakeResponse
+
+
+def test_make_key_normalizes_params():
+    key1 = KrakenResponseCache.make_key('AssetPairs', {'pair': 'XXBTZUSD',
+                                                       'info': None})
+    key2 = KrakenResponseCache.make_key('AssetPairs', {'pair': 'XXBTZUSD'})
+    assert key1 == key2
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = KrakenResponseCache(ttls={'Assets': 10}, clock=clock)
+    assert cache.get('Assets', {}) is None
+    cache.put('Assets', {}, {'XXBT': {}})
+    assert cache.get('Assets', {}) == {'XXBT': {}}
+    clock.now = 10
+    assert cache.get('Assets', {}) is None
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'size': 0, 'maxsize': 256}
+
+
+def test_uncached_endpoints():
+    cache = KrakenResponseCache()
+    cache.put('Ticker', {'pair': 'XXBTZUSD'}, {})
+    assert cache.get('Ticker', {'pair': 'XXBTZUSD'}) is None
+    assert not cache.is_cacheable('Ticker')
+    assert cache.misses == 0
+
+
+def test_lru_eviction():
+    cache = KrakenResponseCache(ttls={'AssetPairs': 60}, maxsize=2)
+    cache.put('AssetPairs', {'pair': 'A'}, {'A': 1})
+    cache.put('AssetPairs', {'pair': 'B'}, {'B': 1})
+    cache.get('AssetPairs', {'pair': 'A'})
+    cache.put('AssetPairs', {'pair': 'C'}, {'C': 1})
+    assert len(cache) == 2
+    assert cache.get('AssetPairs', {'pair': 'B'}) is None
+    assert cache.get('AssetPairs', {'pair': 'A'}) == {'A': 1}
+
+
+def test_invalidate():
+    cache = KrakenResponseCache()
+    cache.put('Assets', {}, {})
+    cache.put('AssetPairs', {}, {})
+    cache.invalidate('Assets')
+    assert cache.get('Assets', {}) is None
+    assert cache.get('AssetPairs', {}) == {}
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_session_serves_from_cache():
+    calls = []
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(url)
+        return FakeResponse({'XXBT': {}})
+
+    cache = KrakenResponseCache()
+    sess = KrakenSession(response_cache=cache)
+    sess._request_manager.http_session.get = fake_get
+
+    assert sess.get_asset_info() == {'XXBT': {}}
+    assert sess.get_asset_info() == {'XXBT': {}}
+    assert len(calls) == 1
+    assert cache.hits == 1
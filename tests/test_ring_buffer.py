@@ -0,0 +1,60 @@
+import pytest
+from krakencli.ring_buffer import RingBuffer, SpreadRingBuffer, TickerRingBuffer
+
+
+def test_ring_buffer_wraps(backend):
+    buffer = RingBuffer(3, (('time', 'q'), ('value', 'd')))
+    assert len(buffer) == 0
+    assert buffer.last('time') is None
+    assert buffer.mean('value') is None
+    assert buffer.max('value') is None
+    assert buffer.min('time') is None
+
+    for i in range(5):
+        buffer.append(i, i * 1.5)
+    assert len(buffer) == 3
+    assert list(buffer.column('time')) == [2, 3, 4]
+    assert buffer.last('value') == 6.0
+    assert buffer.mean('value') == pytest.approx(4.5)
+    assert buffer.max('value') == 6.0
+    assert buffer.min('time') == 2
+    assert type(buffer.min('time')) is int
+    assert type(buffer.max('value')) is float
+
+    buffer.clear()
+    assert len(buffer.column('time')) == 0
+
+
+def test_spread_ring_buffer(backend):
+    buffer = SpreadRingBuffer(4)
+    spread_data = {'XXBTZUSD': [[100, "10.0", "10.5"],
+                                [102, "10.0", "11.0"],
+                                [106, "10.0", "10.2"]],
+                   'last': 106}
+    assert buffer.ingest(spread_data) == 3
+    assert buffer.ingest(spread_data) == 0
+    assert buffer.ingest({'XXBTZUSD': [[106, "1", "2"], [107, "9.0", "10.0"]],
+                          'last': 107}) == 1
+
+    assert list(buffer.spreads()) == pytest.approx([0.5, 1.0, 0.2, 1.0])
+    assert buffer.mean_spread() == pytest.approx(0.675)
+    assert buffer.max_spread() == pytest.approx(1.0)
+    assert buffer.min_spread() == pytest.approx(0.2)
+    # 0.5 for 2s, 1.0 for 4s, 0.2 for 1s, 1.0 for 3s
+    assert buffer.time_weighted_spread(now=110) == pytest.approx(8.2 / 10)
+    assert buffer.time_weighted_spread() == pytest.approx(5.2 / 7)
+
+
+def test_ticker_ring_buffer(backend):
+    buffer = TickerRingBuffer(2, pair='XXBTZUSD')
+    ticker = {'XXBTZUSD': {'a': ["101.0", "1", "1.000"],
+                           'b': ["100.0", "2", "2.000"],
+                           'c': ["100.5", "0.1"],
+                           'v': ["1500.0", "3000.0"]}}
+    buffer.ingest(ticker, timestamp=1.0)
+    buffer.ingest(ticker, timestamp=2.0)
+    buffer.ingest(ticker)
+    assert len(buffer) == 2
+    assert buffer.mean('last') == pytest.approx(100.5)
+    assert buffer.mean_spread() == pytest.approx(1.0)
+    assert buffer.last('volume') == 1500.0
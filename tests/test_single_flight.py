@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+import pytest
+from krakencli.single_flight import SingleFlight, AsyncSingleFlight
+from krakencli.kraken_session import KrakenSession
+from krakencli.async_kraken_session import AsyncKrakenSession
+from tests.test_utilities import FakeResponse
+
+
+class CountingGet(object):
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url, params=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return FakeResponse({'pair': params['pair']})
+
+
+def run_threads(func, num_threads=8):
+    results = [None] * num_threads
+
+    def worker(i):
+        results[i] = func()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_shares_result():
+    single_flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    results = run_threads(lambda: single_flight.do('key', slow))
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert single_flight._calls == {}
+
+
+def test_single_flight_shares_error():
+    single_flight = SingleFlight()
+
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        single_flight.do('key', fail)
+    assert single_flight.do('key', lambda: 5) == 5
+
+
+def test_session_coalesces_requests():
+    counting_get = CountingGet()
+    sess = KrakenSession(coalesce_requests=True)
+    sess._request_manager.http_session.get = counting_get
+
+    results = run_threads(lambda: sess.get_order_book('XXBTZUSD'))
+    assert counting_get.calls == 1
+    assert all(result == {'pair': 'XXBTZUSD'} for result in results)
+
+    sess.get_order_book('XETHZUSD')
+    assert counting_get.calls == 2
+
+
+def test_session_does_not_coalesce_by_default():
+    counting_get = CountingGet(delay=0.05)
+    sess = KrakenSession()
+    sess._request_manager.http_session.get = counting_get
+
+    run_threads(lambda: sess.get_order_book('XXBTZUSD'), num_threads=4)
+    assert counting_get.calls == 4
+
+
+def test_async_single_flight():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def run():
+        return await asyncio.gather(*[single_flight.do('key', slow)
+                                      for x in range(5)])
+
+    assert asyncio.run(run()) == ['result'] * 5
+    assert len(calls) == 1
+    assert single_flight._tasks == {}
+
+
+def test_async_session_coalesces_requests():
+    counting_get = CountingGet()
+    sess = AsyncKrakenSession(coalesce_requests=True)
+    sess._request_manager.http_session.get = counting_get
+
+    async def run():
+        return await asyncio.gather(*[sess.get_recent_trades('XXBTZUSD')
+                                      for x in range(6)])
+
+    results = asyncio.run(run())
+    assert counting_get.calls == 1
+    assert all(result == {'pair': 'XXBTZUSD'} for result in results)
+    sess.close()
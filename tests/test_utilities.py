@@ -1,3 +1,11 @@
+import base64
+import json
+import time
+from krakencli.nonce import MicrosecondNonceGenerator
+
+TEST_PRIVATE_KEY = base64.b64encode(b"secret").decode()
+
+
 def lists_match(list1, list2):
     return sorted(list1) == sorted(list2)
 
@@ -6,7 +14,53 @@ def list_in_list(list1, list2):
     return all(e in list2 for e in list2)
 
 
+class FakeClock(object):
+    # A manual clock, sleep() advances it instead of blocking
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class SlowNonceGenerator(MicrosecondNonceGenerator):
+    # Yields after each nonce so other senders get a chance to overtake it
+
+    def next_nonce(self):
+        nonce = super().next_nonce()
+        time.sleep(0.002 * (nonce % 3))
+        return nonce
+
+
 def dict_value_length_check(key, dict, comp_dict):
     print(dict[key])
     print(comp_dict[key])
     return len(dict[key]) == comp_dict[key]
+
+
+class FakeResponse(object):
+
+    def __init__(self, result=None, error=None):
+        payload = {'error': [] if error is None else error}
+        if result is not None:
+            payload['result'] = result
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i+chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
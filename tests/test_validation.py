@@ -0,0 +1,102 @@
+import pytest
+from krakencli.validation import (
+    KRAKEN_REQUEST_SCHEMAS,
+    KRAKEN_REQUEST_VALIDATORS,
+    Parameter,
+    OptionsParameter,
+    CommaDelimitedParameter,
+    RequestValidator,
+)
+from krakencli.exceptions import (
+    InvalidRequestParameterException,
+    InvalidRequestParameterOptionsException,
+    MissingRequiredParameterException,
+    InvalidTimestampException,
+)
+from krakencli.kraken_api_values import (
+    KRAKEN_VALID_PUBLIC_ENDPOINTS,
+    KRAKEN_VALID_PRIVATE_ENDPOINTS,
+)
+
+
+def test_schema_endpoints_are_valid():
+    valid_endpoints = KRAKEN_VALID_PUBLIC_ENDPOINTS + KRAKEN_VALID_PRIVATE_ENDPOINTS
+    for endpoint, parameters in KRAKEN_REQUEST_SCHEMAS.values():
+        assert endpoint in valid_endpoints
+
+
+def test_validator_drops_missing_parameters():
+    validator = KRAKEN_REQUEST_VALIDATORS['GetOHLCData']
+    assert validator.endpoint == 'OHLC'
+    assert validator(pair='XXBTZUSD') == {'pair': 'XXBTZUSD'}
+    assert validator(pair='XXBTZUSD', interval=60, since=1.5) == {
+        'pair': 'XXBTZUSD',
+        'interval': 60,
+        'since': 1.5,
+    }
+
+
+def test_missing_required_parameter():
+    with pytest.raises(MissingRequiredParameterException) as e:
+        KRAKEN_REQUEST_VALIDATORS['GetOrderBook'](pair=None)
+    assert e.value.param_name == 'pair'
+    assert e.value.request_type == 'GetOrderBook'
+
+
+def test_invalid_options():
+    with pytest.raises(InvalidRequestParameterOptionsException) as e:
+        KRAKEN_REQUEST_VALIDATORS['GetOHLCData'](pair='XXBTZUSD', interval=49)
+    assert e.value.param_name == 'interval'
+    assert e.value.request_type == 'GetOHLCData'
+    assert 60 in e.value.valid_values
+
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        KRAKEN_REQUEST_VALIDATORS['GetOHLCData'](pair=['XXBTZUSD'])
+
+
+def test_invalid_comma_delimited():
+    validator = KRAKEN_REQUEST_VALIDATORS['GetTickerInformation']
+    assert validator(pair='XXBTZUSD,XETHZUSD') == {'pair': 'XXBTZUSD,XETHZUSD'}
+    with pytest.raises(InvalidRequestParameterOptionsException) as e:
+        validator(pair='XXBTZUSD,BADPAIR')
+    assert e.value.request_type == 'GetTickerInformation'
+    with pytest.raises(InvalidRequestParameterOptionsException):
+        validator(pair=5)
+
+
+def test_invalid_timestamp():
+    with pytest.raises(InvalidTimestampException) as e:
+        KRAKEN_REQUEST_VALIDATORS['GetRecentTrades'](pair='XXBTZUSD', since="bad")
+    assert e.value.request_type == 'GetRecentTrades'
+
+
+def test_invalid_typed_parameters():
+    with pytest.raises(InvalidRequestParameterException) as e:
+        KRAKEN_REQUEST_VALIDATORS['GetOrderBook'](pair='XXBTZUSD', count="four")
+    assert e.value.request_type == 'GetOrderBook'
+    with pytest.raises(InvalidRequestParameterException):
+        KRAKEN_REQUEST_VALIDATORS['GetOpenOrders'](trades="yes")
+
+
+def test_numeric_parameters_reject_bools():
+    with pytest.raises(InvalidRequestParameterException):
+        KRAKEN_REQUEST_VALIDATORS['GetOrderBook'](pair='XXBTZUSD', count=True)
+    with pytest.raises(InvalidTimestampException):
+        KRAKEN_REQUEST_VALIDATORS['GetRecentTrades'](pair='XXBTZUSD', since=False)
+    assert KRAKEN_REQUEST_VALIDATORS['GetOpenOrders'](trades=True) == {
+        'trades': True,
+    }
+
+
+def test_parameter_requires_compile():
+    with pytest.raises(TypeError):
+        Parameter('name')
+
+
+def test_custom_validator():
+    validator = RequestValidator('Custom', 'Ticker', [
+        OptionsParameter('side', ['buy', 'sell'], required=True),
+        CommaDelimitedParameter('flags', ['post', 'fciq']),
+    ])
+    assert validator(side='buy', flags='post,fciq') == {'side': 'buy',
+                                                        'flags': 'post,fciq'}